@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+
+import stat
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cpu_power
+import fan_monitor
+import sysfs
+from sysfs_fixture import build_machine
+
+BENCH_ITERATIONS = 200
+BENCH_SUBPROCESS_ITERATIONS = 20
+PROC_SELF_IO = "/proc/self/io"
+
+FAKE_NEKROCTL = """#!{python}
+import sys
+state = {state!r}
+args = sys.argv[1:]
+if args[:2] == ["fan", "set"] and len(args) == 4:
+    with open(state, "w") as f:
+        f.write(args[2] + "," + args[3])
+elif args[:2] == ["fan", "get"]:
+    try:
+        print(open(state).read().strip())
+    except OSError:
+        print("0,0")
+elif args[:2] == ["fan", "auto"]:
+    with open(state, "w") as f:
+        f.write("0,0")
+else:
+    sys.exit(1)
+"""
+
+FAKE_NVIDIA_SMI = """#!/bin/sh
+echo 55
+"""
+
+
+def read_syscalls() -> Tuple[int, int]:
+    try:
+        with open(PROC_SELF_IO) as f:
+            values = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(values["syscr"]), int(values["syscw"])
+    except (FileNotFoundError, PermissionError, OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def _syscall_overhead() -> Tuple[int, int]:
+    first = read_syscalls()
+    second = read_syscalls()
+    return second[0] - first[0], second[1] - first[1]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn: Callable, iterations: int) -> Dict[str, float]:
+    fn()
+    overhead = _syscall_overhead()
+    samples = []
+    before = read_syscalls()
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    after = read_syscalls()
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "p50_us": round(_percentile(samples, 50), 1),
+        "p95_us": round(_percentile(samples, 95), 1),
+        "p99_us": round(_percentile(samples, 99), 1),
+        "max_us": round(samples[-1], 1),
+        "syscr": round(max(0, after[0] - before[0] - overhead[0]) / iterations, 2),
+        "syscw": round(max(0, after[1] - before[1] - overhead[1]) / iterations, 2),
+    }
+
+
+def run_cases(cases: List[Tuple[str, Callable, bool]], iterations: int = BENCH_ITERATIONS,
+              only: Optional[str] = None) -> List[Dict]:
+    results = []
+    for name, fn, spawns in cases:
+        if only and only not in name:
+            continue
+        count = min(iterations, BENCH_SUBPROCESS_ITERATIONS) if spawns else iterations
+        results.append({"name": name, **measure(fn, count)})
+    return results
+
+
+def cpu_power_cases() -> List[Tuple[str, Callable, bool]]:
+    governor = cpu_power.get_current_governor()
+    epp = cpu_power.get_current_epp()
+    turbo = cpu_power.get_turbo_enabled()
+    pl1 = cpu_power.get_rapl_pl1_watts() or cpu_power.RAPL_PL1_MIN_W
+    pl2 = cpu_power.get_rapl_pl2_watts() or cpu_power.RAPL_PL2_MIN_W
+    max_freq = cpu_power.get_cpu_max_freq_mhz() or cpu_power.CPU_FREQ_MAX_MHZ
+    tau = cpu_power.get_rapl_time_window_s() or 28
+    config = {
+        "cpu_governor": governor, "cpu_turbo_enabled": turbo, "cpu_epp": epp,
+        "cpu_rapl_pl1_w": pl1, "cpu_rapl_pl2_w": pl2, "cpu_max_freq_mhz": max_freq,
+    }
+    return [
+        ("cpu_power.set_governor", lambda: cpu_power.set_governor(governor), False),
+        ("cpu_power.set_epp", lambda: cpu_power.set_epp(epp, sync_profile=False), False),
+        ("cpu_power.set_turbo", lambda: cpu_power.set_turbo(turbo), False),
+        ("cpu_power.set_rapl_pl1", lambda: cpu_power.set_rapl_pl1(pl1), False),
+        ("cpu_power.set_rapl_pl2", lambda: cpu_power.set_rapl_pl2(pl2), False),
+        ("cpu_power.set_rapl_time_window", lambda: cpu_power.set_rapl_time_window(tau), False),
+        ("cpu_power.set_cpu_max_freq", lambda: cpu_power.set_cpu_max_freq(max_freq), False),
+        ("cpu_power.apply_cpu_power", lambda: cpu_power.apply_cpu_power(config, sync_profile=False), False),
+    ]
+
+
+def run_cpu_power_cases(iterations: int = BENCH_ITERATIONS, only: Optional[str] = None) -> List[Dict]:
+    snapshot = cpu_power.snapshot_cpu_power()
+    try:
+        return run_cases(cpu_power_cases(), iterations, only)
+    finally:
+        cpu_power.apply_cpu_power(snapshot, sync_profile=False)
+
+
+def sensor_cases(monitor: fan_monitor.FanMonitor) -> List[Tuple[str, Callable, bool]]:
+    return [
+        ("FanMonitor.get_fan_speeds", monitor.get_fan_speeds, False),
+        ("FanMonitor.get_temps", monitor.get_temps, False),
+        ("FanMonitor.get_cpu_gpu_temps", monitor.get_cpu_gpu_temps, bool(monitor._nvidia_smi)),
+        ("FanMonitor._get_nvidia_gpu_temp", monitor._get_nvidia_gpu_temp, bool(monitor._nvidia_smi)),
+    ]
+
+
+def _write_script(path: Path, content: str) -> str:
+    path.write_text(content)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return str(path)
+
+
+def build_fake_actuators(root: Path) -> Tuple[str, str]:
+    bin_dir = root / "bin"
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    nekroctl = _write_script(bin_dir / "nekroctl",
+                             FAKE_NEKROCTL.format(python=sys.executable, state=str(root / "fan_state")))
+    nvidia_smi = _write_script(bin_dir / "nvidia-smi", FAKE_NVIDIA_SMI)
+    return nekroctl, nvidia_smi
+
+
+def use_fake_sysfs(root: Path, cpus: int = 8, p_cores: int = 0) -> None:
+    build_machine(root, cpus=cpus, p_cores=p_cores)
+    sysfs.set_root(root)
+    cpu_power.refresh_sysfs_caches()
+
+
+def format_results(results: List[Dict]) -> str:
+    lines = [f"{'Caminho':<36} {'n':>4} {'p50 µs':>9} {'p95 µs':>9} {'p99 µs':>9} "
+             f"{'max µs':>9} {'syscr':>6} {'syscw':>6}"]
+    for r in results:
+        lines.append(f"{r['name']:<36} {r['iterations']:>4} {r['p50_us']:>9} {r['p95_us']:>9} "
+                     f"{r['p99_us']:>9} {r['max_us']:>9} {r['syscr']:>6} {r['syscw']:>6}")
+    return "\n".join(lines)
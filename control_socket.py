@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import queue
+import select
+import selectors
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+CONTROL_SOCKET = Path("/var/run/fan-aggressor.sock")
+CONTROL_TIMEOUT_S = 1.0
+MAX_LINE_BYTES = 1 << 20
+SEND_TIMEOUT_S = 0.1
+WORKER_QUEUE_SIZE = 16
+PEERCRED = struct.Struct("3i")
+
+
+def _encode(message: Dict) -> bytes:
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def _peer_uid(conn: socket.socket) -> Optional[int]:
+    try:
+        _, uid, _ = PEERCRED.unpack(conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, PEERCRED.size))
+        return uid
+    except (AttributeError, OSError, struct.error):
+        return None
+
+
+class _Client:
+    def __init__(self, conn: socket.socket):
+        self.conn = conn
+        self.uid = _peer_uid(conn)
+        self.buffer = b""
+        self.subscribed = False
+        self.send_lock = threading.Lock()
+
+
+class ControlServer:
+    def __init__(self, path: Path = CONTROL_SOCKET):
+        self.path = path
+        self.handlers: Dict[str, Tuple[Callable[[Dict], Dict], bool, bool]] = {}
+        self._clients: Dict[int, _Client] = {}
+        self._lock = threading.Lock()
+        self._state: Optional[Dict] = None
+        self._listener: Optional[socket.socket] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r, self._wake_w = -1, -1
+        self._thread: Optional[threading.Thread] = None
+        self._jobs: queue.Queue = queue.Queue(WORKER_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+
+    def register(self, cmd: str, handler: Callable[[Dict], Dict], privileged: bool = False,
+                 blocking: bool = False):
+        self.handlers[cmd] = (handler, privileged, blocking)
+
+    @property
+    def has_subscribers(self) -> bool:
+        with self._lock:
+            return any(client.subscribed for client in self._clients.values())
+
+    def start(self) -> bool:
+        try:
+            if self.path.exists():
+                self.path.unlink()
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(str(self.path))
+            os.chmod(self.path, 0o666)
+            listener.listen(8)
+            listener.setblocking(False)
+        except OSError:
+            return False
+        self._listener = listener
+        self._wake_r, self._wake_w = os.pipe()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(listener, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._thread = threading.Thread(target=self._serve, name="fan-aggressor-control", daemon=True)
+        self._thread.start()
+        self._worker = threading.Thread(target=self._work, name="fan-aggressor-control-worker", daemon=True)
+        self._worker.start()
+        return True
+
+    def stop(self):
+        if self._thread is None:
+            return
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+        self._thread.join(timeout=2)
+        self._thread = None
+        try:
+            self._jobs.put_nowait(None)
+        except queue.Full:
+            pass
+        self._worker.join(timeout=2)
+        self._worker = None
+        with self._lock:
+            for client in self._clients.values():
+                client.conn.close()
+            self._clients.clear()
+        self._selector.close()
+        self._listener.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    def publish(self, state: Dict):
+        data = _encode({"event": "state", "state": state})
+        with self._lock:
+            self._state = state
+            subscribers = [client for client in self._clients.values() if client.subscribed]
+        for client in subscribers:
+            self._send(client, data, skip_if_busy=True)
+
+    def _send(self, client: _Client, data: bytes, timeout: float = SEND_TIMEOUT_S, skip_if_busy: bool = False):
+        deadline = time.monotonic() + timeout
+        if skip_if_busy:
+            locked = client.send_lock.acquire(blocking=False)
+        else:
+            locked = client.send_lock.acquire(timeout=timeout)
+        if not locked:
+            if not skip_if_busy:
+                self._drop(client)
+            return
+        try:
+            sent = self._send_locked(client, data, deadline, skip_if_busy)
+        finally:
+            client.send_lock.release()
+        if not sent:
+            self._drop(client)
+
+    def _send_locked(self, client: _Client, data: bytes, deadline: float, skip_if_busy: bool) -> bool:
+        view = memoryview(data)
+        while True:
+            try:
+                view = view[client.conn.send(view, socket.MSG_DONTWAIT):]
+            except BlockingIOError:
+                if skip_if_busy and len(view) == len(data):
+                    return True
+            except OSError:
+                return False
+            if not view:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                select.select([], [client.conn], [], remaining)
+            except (OSError, ValueError):
+                return False
+
+    def _drop(self, client: _Client):
+        with self._lock:
+            if self._clients.pop(client.conn.fileno(), None) is None:
+                return
+        try:
+            self._selector.unregister(client.conn)
+        except (KeyError, ValueError, OSError):
+            pass
+        client.conn.close()
+
+    def _serve(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.fileobj == self._wake_r:
+                    return
+                if key.fileobj is self._listener:
+                    self._accept()
+                else:
+                    self._read(key.data)
+
+    def _accept(self):
+        try:
+            conn, _ = self._listener.accept()
+        except OSError:
+            return
+        client = _Client(conn)
+        with self._lock:
+            self._clients[conn.fileno()] = client
+        self._selector.register(conn, selectors.EVENT_READ, client)
+
+    def _read(self, client: _Client):
+        try:
+            chunk = client.conn.recv(65536)
+        except OSError:
+            chunk = b""
+        if not chunk:
+            self._drop(client)
+            return
+        client.buffer += chunk
+        if len(client.buffer) > MAX_LINE_BYTES:
+            self._drop(client)
+            return
+        while b"\n" in client.buffer:
+            line, client.buffer = client.buffer.split(b"\n", 1)
+            if line.strip():
+                reply = self._dispatch(client, line)
+                if reply is not None:
+                    self._send(client, _encode(reply), CONTROL_TIMEOUT_S)
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            client, cmd, handler, request = job
+            self._send(client, _encode(self._run(cmd, handler, request)), CONTROL_TIMEOUT_S)
+
+    def _dispatch(self, client: _Client, line: bytes) -> Optional[Dict]:
+        try:
+            request = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {"ok": False, "error": "invalid json"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "invalid request"}
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            return {"ok": True, "cmd": cmd}
+        if cmd in ("get", "subscribe"):
+            with self._lock:
+                state = self._state
+                if cmd == "subscribe":
+                    client.subscribed = True
+            return {"ok": True, "cmd": cmd, "state": state}
+        if cmd not in self.handlers:
+            return {"ok": False, "cmd": cmd, "error": "unknown command"}
+        handler, privileged, blocking = self.handlers[cmd]
+        if privileged and client.uid != 0:
+            return {"ok": False, "cmd": cmd, "error": "permission denied"}
+        if not blocking:
+            return self._run(cmd, handler, request)
+        try:
+            self._jobs.put_nowait((client, cmd, handler, request))
+        except queue.Full:
+            return {"ok": False, "cmd": cmd, "error": "busy"}
+        return None
+
+    def _run(self, cmd: str, handler: Callable[[Dict], Dict], request: Dict) -> Dict:
+        try:
+            reply = handler(request)
+        except Exception as e:
+            return {"ok": False, "cmd": cmd, "error": str(e)}
+        return {"ok": True, "cmd": cmd, **(reply or {})}
+
+
+def _connect(path: Path, timeout: float) -> socket.socket:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(str(path))
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def _read_lines(conn: socket.socket) -> Iterator[Dict]:
+    buffer = b""
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            return
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            try:
+                message = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(message, dict):
+                yield message
+
+
+def request(cmd: str, path: Path = CONTROL_SOCKET, timeout: float = CONTROL_TIMEOUT_S, **params) -> Optional[Dict]:
+    try:
+        conn = _connect(path, timeout)
+    except OSError:
+        return None
+    try:
+        conn.sendall(_encode({"cmd": cmd, **params}))
+        for message in _read_lines(conn):
+            if "event" not in message:
+                return message
+    except OSError:
+        pass
+    finally:
+        conn.close()
+    return None
+
+
+class Subscription:
+    def __init__(self, path: Path = CONTROL_SOCKET, timeout: float = CONTROL_TIMEOUT_S):
+        self.conn = _connect(path, timeout)
+        self.state: Optional[Dict] = None
+        try:
+            self.conn.sendall(_encode({"cmd": "subscribe"}))
+            self._lines = _read_lines(self.conn)
+            reply = next(self._lines, None)
+            while reply is not None and "event" in reply:
+                self.state = reply.get("state")
+                reply = next(self._lines, None)
+        except OSError:
+            self.conn.close()
+            raise
+        if not reply or not reply.get("ok"):
+            self.conn.close()
+            raise ConnectionError("subscribe rejected")
+        if self.state is None:
+            self.state = reply.get("state")
+
+    def settimeout(self, timeout: Optional[float]):
+        self.conn.settimeout(timeout)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for message in self._lines:
+            if message.get("event") == "state":
+                self.state = message.get("state")
+                yield self.state
+
+    def close(self):
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
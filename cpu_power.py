@@ -6,20 +6,29 @@ import os
 import re
 import tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from sysfs import resolve
 
 SCALING_GOVERNOR = "cpufreq/scaling_governor"
 AVAILABLE_GOVERNORS = "cpufreq/scaling_available_governors"
 EPP_PREF = "cpufreq/energy_performance_preference"
 EPP_AVAILABLE = "cpufreq/energy_performance_available_preferences"
 NO_TURBO = "/sys/devices/system/cpu/intel_pstate/no_turbo"
+INTEL_PSTATE_STATUS = "/sys/devices/system/cpu/intel_pstate/status"
+INTEL_PSTATE_MAX_PERF = "/sys/devices/system/cpu/intel_pstate/max_perf_pct"
+INTEL_PSTATE_MIN_PERF = "/sys/devices/system/cpu/intel_pstate/min_perf_pct"
+SCALING_DRIVER = "cpufreq/scaling_driver"
 CPU_BASE = "/sys/devices/system/cpu"
 PLATFORM_PROFILE = "/sys/firmware/acpi/platform_profile"
 
+POWERCAP_BASE = "/sys/class/powercap"
 RAPL_PL1_PATH = "/sys/class/powercap/intel-rapl:0/constraint_0_power_limit_uw"
 RAPL_PL2_PATH = "/sys/class/powercap/intel-rapl:0/constraint_1_power_limit_uw"
 SCALING_MAX_FREQ_ATTR = "cpufreq/scaling_max_freq"
 CPUINFO_MAX_FREQ = "cpufreq/cpuinfo_max_freq"
+CPU_CAPACITY = "cpu_capacity"
+CLUSTER_ID = "topology/cluster_id"
 
 RAPL_PL1_MIN_W = 15
 RAPL_PL1_MAX_W = 200
@@ -27,6 +36,14 @@ RAPL_PL2_MIN_W = 20
 RAPL_PL2_MAX_W = 250
 CPU_FREQ_MIN_MHZ = 800
 CPU_FREQ_MAX_MHZ = 5500
+RAPL_DOMAIN_MIN_W = 1
+RAPL_TAU_MIN_S = 0.001
+RAPL_TAU_MAX_S = 448.0
+RAPL_LONG_TERM = "long_term"
+RAPL_SHORT_TERM = "short_term"
+HYBRID_CAPACITY_RATIO = 0.85
+CLUSTER_PERFORMANCE = "p"
+CLUSTER_EFFICIENCY = "e"
 
 EPP_TO_PROFILE = {
     "power": "quiet",
@@ -36,23 +53,62 @@ EPP_TO_PROFILE = {
     "default": "balanced",
 }
 
+POWER_PROFILES = {
+    "deepsleep": {
+        "cpu_governor": "powersave", "cpu_turbo_enabled": False, "cpu_epp": "power",
+        "cpu_platform_profile": "low-power",
+        "cpu_rapl_pl1_w": 15, "cpu_rapl_pl2_w": 20, "cpu_max_freq_mhz": 2000,
+        "cpu_rapl_pl1_tau_s": 28,
+        "cpu_cluster_epp": None, "cpu_cluster_max_freq_mhz": None,
+    },
+    "stealth": {
+        "cpu_governor": "powersave", "cpu_turbo_enabled": False, "cpu_epp": "power",
+        "cpu_platform_profile": "",
+        "cpu_rapl_pl1_w": 25, "cpu_rapl_pl2_w": 35, "cpu_max_freq_mhz": 3200,
+        "cpu_rapl_pl1_tau_s": 28,
+        "cpu_cluster_epp": None, "cpu_cluster_max_freq_mhz": None,
+    },
+    "cruise": {
+        "cpu_governor": "powersave", "cpu_turbo_enabled": True, "cpu_epp": "balance_power",
+        "cpu_platform_profile": "",
+        "cpu_rapl_pl1_w": 45, "cpu_rapl_pl2_w": 65, "cpu_max_freq_mhz": 4400,
+        "cpu_rapl_pl1_tau_s": 56,
+        "cpu_cluster_epp": {"e": "power"}, "cpu_cluster_max_freq_mhz": None,
+    },
+    "boost": {
+        "cpu_governor": "powersave", "cpu_turbo_enabled": True, "cpu_epp": "balance_performance",
+        "cpu_platform_profile": "",
+        "cpu_rapl_pl1_w": 65, "cpu_rapl_pl2_w": 100, "cpu_max_freq_mhz": 5300,
+        "cpu_rapl_pl1_tau_s": 56,
+        "cpu_cluster_epp": {"e": "balance_power"}, "cpu_cluster_max_freq_mhz": None,
+    },
+    "nitro": {
+        "cpu_governor": "performance", "cpu_turbo_enabled": True, "cpu_epp": "performance",
+        "cpu_platform_profile": "",
+        "cpu_rapl_pl1_w": 125, "cpu_rapl_pl2_w": 157, "cpu_max_freq_mhz": 5500,
+        "cpu_rapl_pl1_tau_s": 28,
+        "cpu_cluster_epp": None, "cpu_cluster_max_freq_mhz": None,
+    },
+}
+PROFILE_ORDER = ["deepsleep", "stealth", "cruise", "boost", "nitro"]
+
 KB_PER_ZONE = "/sys/devices/platform/acer-wmi/four_zoned_kb/per_zone_mode"
 KB_FOUR_MODE = "/sys/devices/platform/acer-wmi/four_zoned_kb/four_zone_mode"
 BACKLIGHT_TIMEOUT = "/sys/devices/platform/acer-wmi/predator_sense/backlight_timeout"
-KB_STATE_FILE = str(Path.home() / ".config" / "fan-aggressor" / "kb_state.json")
-_PER_ZONE_RE = re.compile(r"^\d+(,\d+){4}$")
+KB_STATE_FILE = "/var/lib/fan-aggressor/kb_state.json"
+_PER_ZONE_RE = re.compile(r"^[0-9a-fA-F]+(,[0-9a-fA-F]+){3},\d+$")
 
 
 def _cpu_dirs() -> List[Path]:
     return sorted(
         Path(p).parent.parent
-        for p in glob.glob(f"{CPU_BASE}/cpu[0-9]*/cpufreq/scaling_governor")
+        for p in glob.glob(resolve(f"{CPU_BASE}/cpu[0-9]*/cpufreq/scaling_governor"))
     )
 
 
 def _read_sysfs(path: str) -> Optional[str]:
     try:
-        with open(path) as f:
+        with open(resolve(path)) as f:
             return f.read().strip()
     except (FileNotFoundError, PermissionError, OSError):
         return None
@@ -60,13 +116,71 @@ def _read_sysfs(path: str) -> Optional[str]:
 
 def _write_sysfs(path: str, value: str) -> bool:
     try:
-        with open(path, "w") as f:
+        with open(resolve(path), "w") as f:
             f.write(value)
         return True
     except (FileNotFoundError, PermissionError, OSError):
         return False
 
 
+_cpu_clusters: Optional[Dict[str, List[Path]]] = None
+
+
+def _safe_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_sysfs_int(path: str) -> Optional[int]:
+    val = _read_sysfs(path)
+    try:
+        return int(val) if val is not None else None
+    except ValueError:
+        return None
+
+
+def get_cpu_clusters(refresh: bool = False) -> Dict[str, List[Path]]:
+    global _cpu_clusters
+    if _cpu_clusters is not None and not refresh:
+        return _cpu_clusters
+
+    cpus = _cpu_dirs()
+    capacity = {cpu: _read_sysfs_int(str(cpu / CPU_CAPACITY)) for cpu in cpus}
+    if cpus and all(v for v in capacity.values()):
+        metric = capacity
+    else:
+        metric = {cpu: _read_sysfs_int(str(cpu / CPUINFO_MAX_FREQ)) or 0 for cpu in cpus}
+
+    cluster_ids = {cpu: _read_sysfs(str(cpu / CLUSTER_ID)) for cpu in cpus}
+    if len(set(cluster_ids.values())) <= 1:
+        cluster_ids = {cpu: None for cpu in cpus}
+    groups: Dict[str, List[Path]] = {}
+    for cpu in cpus:
+        cluster_id = cluster_ids[cpu]
+        key = cluster_id if cluster_id not in (None, "-1") else cpu.name
+        groups.setdefault(key, []).append(cpu)
+
+    top = max(metric.values(), default=0)
+    clusters: Dict[str, List[Path]] = {}
+    for members in groups.values():
+        group_metric = max(metric[cpu] for cpu in members)
+        if top and group_metric < top * HYBRID_CAPACITY_RATIO:
+            kind = CLUSTER_EFFICIENCY
+        else:
+            kind = CLUSTER_PERFORMANCE
+        clusters.setdefault(kind, []).extend(members)
+    _cpu_clusters = {kind: sorted(members) for kind, members in clusters.items()}
+    return _cpu_clusters
+
+
+def _cluster_dirs(cluster: Optional[str]) -> List[Path]:
+    if cluster is None:
+        return _cpu_dirs()
+    return get_cpu_clusters().get(cluster, [])
+
+
 def get_available_governors() -> List[str]:
     result = _read_sysfs(f"{CPU_BASE}/cpu0/{AVAILABLE_GOVERNORS}")
     return result.split() if result else []
@@ -92,21 +206,24 @@ def get_available_epp() -> List[str]:
     return result.split() if result else []
 
 
-def get_current_epp() -> str:
-    return _read_sysfs(f"{CPU_BASE}/cpu0/{EPP_PREF}") or "unknown"
+def get_current_epp(cluster: str = None) -> str:
+    if cluster is None:
+        return _read_sysfs(f"{CPU_BASE}/cpu0/{EPP_PREF}") or "unknown"
+    dirs = _cluster_dirs(cluster)
+    return (_read_sysfs(str(dirs[0] / EPP_PREF)) if dirs else None) or "unknown"
 
 
-def set_epp(pref: str, platform_profile: str = None) -> bool:
+def set_epp(pref: str, platform_profile: str = None, cluster: str = None, sync_profile: bool = True) -> bool:
     available = get_available_epp()
     if available and pref not in available:
         return False
 
     profile = platform_profile or EPP_TO_PROFILE.get(pref)
-    if profile:
+    if profile and cluster is None and sync_profile:
         _write_sysfs(PLATFORM_PROFILE, profile)
 
     success = True
-    for cpu in _cpu_dirs():
+    for cpu in _cluster_dirs(cluster):
         if not _write_sysfs(str(cpu / EPP_PREF), pref):
             success = False
     return success
@@ -125,6 +242,10 @@ def get_platform_profile() -> str:
     return _read_sysfs(PLATFORM_PROFILE) or "unknown"
 
 
+def set_platform_profile(profile: str) -> bool:
+    return _write_sysfs(PLATFORM_PROFILE, profile)
+
+
 def get_rapl_pl1_watts() -> Optional[int]:
     val = _read_sysfs(RAPL_PL1_PATH)
     if val is None:
@@ -136,6 +257,9 @@ def get_rapl_pl1_watts() -> Optional[int]:
 
 
 def set_rapl_pl1(watts: int) -> bool:
+    watts = _safe_int(watts)
+    if watts is None:
+        return False
     watts = max(RAPL_PL1_MIN_W, min(RAPL_PL1_MAX_W, watts))
     return _write_sysfs(RAPL_PL1_PATH, str(watts * 1_000_000))
 
@@ -151,13 +275,147 @@ def get_rapl_pl2_watts() -> Optional[int]:
 
 
 def set_rapl_pl2(watts: int) -> bool:
+    watts = _safe_int(watts)
+    if watts is None:
+        return False
     watts = max(RAPL_PL2_MIN_W, min(RAPL_PL2_MAX_W, watts))
     return _write_sysfs(RAPL_PL2_PATH, str(watts * 1_000_000))
 
 
-def get_cpu_max_freq_mhz() -> Optional[int]:
+_rapl_zones: Optional[Dict[str, dict]] = None
+
+
+def _rapl_domain_name(name: str) -> str:
+    if name.startswith("package-"):
+        return "package"
+    return name
+
+
+def discover_rapl_zones(refresh: bool = False) -> Dict[str, dict]:
+    global _rapl_zones
+    if _rapl_zones is not None and not refresh:
+        return _rapl_zones
+    zones = {}
+    paths = (sorted(glob.glob(resolve(f"{POWERCAP_BASE}/intel-rapl:*")))
+             + sorted(glob.glob(resolve(f"{POWERCAP_BASE}/intel-rapl-mmio:*"))))
+    for zone in paths:
+        name = _read_sysfs(f"{zone}/name")
+        if not name:
+            continue
+        constraints = {}
+        index = 0
+        while True:
+            cname = _read_sysfs(f"{zone}/constraint_{index}_name")
+            if cname is None:
+                break
+            constraints[cname] = index
+            index += 1
+        zones[os.path.basename(zone)] = {
+            "name": _rapl_domain_name(name),
+            "path": zone,
+            "constraints": constraints,
+            "subdomain": os.path.basename(zone).count(":") > 1,
+        }
+    _rapl_zones = zones
+    return zones
+
+
+def _rapl_domain_zones(domain: str) -> List[dict]:
+    zones = discover_rapl_zones()
+    if domain in zones:
+        return [zones[domain]]
+    return [zone for zone in zones.values() if zone["name"] == domain]
+
+
+def _rapl_constraint_path(zone: dict, constraint: str, attr: str) -> Optional[str]:
+    if constraint not in zone["constraints"]:
+        return None
+    return f"{zone['path']}/constraint_{zone['constraints'][constraint]}_{attr}"
+
+
+def _rapl_domain_paths(domain: str, constraint: str, attr: str) -> List[str]:
+    paths = [_rapl_constraint_path(zone, constraint, attr) for zone in _rapl_domain_zones(domain)]
+    return [path for path in paths if path]
+
+
+def get_rapl_limit_watts(domain: str, constraint: str = RAPL_LONG_TERM) -> Optional[int]:
+    paths = _rapl_domain_paths(domain, constraint, "power_limit_uw")
+    val = _read_sysfs(paths[0]) if paths else None
+    if val is None:
+        return None
+    try:
+        return int(val) // 1_000_000
+    except (ValueError, TypeError):
+        return None
+
+
+def set_rapl_limit(domain: str, watts: int, constraint: str = RAPL_LONG_TERM) -> bool:
+    watts = _safe_int(watts)
+    zones = [zone for zone in _rapl_domain_zones(domain) if constraint in zone["constraints"]]
+    if not zones or watts is None:
+        return False
+    success = True
+    for zone in zones:
+        upper = RAPL_PL2_MAX_W
+        hw_max = _read_sysfs(_rapl_constraint_path(zone, constraint, "max_power_uw"))
+        try:
+            if hw_max and int(hw_max) > 0:
+                upper = min(upper, int(hw_max) // 1_000_000)
+        except (ValueError, TypeError):
+            pass
+        clamped = max(RAPL_DOMAIN_MIN_W, min(upper, watts))
+        if not _write_sysfs(_rapl_constraint_path(zone, constraint, "power_limit_uw"), str(clamped * 1_000_000)):
+            success = False
+    return success
+
+
+def get_rapl_time_window_s(domain: str = "package", constraint: str = RAPL_LONG_TERM) -> Optional[float]:
+    paths = _rapl_domain_paths(domain, constraint, "time_window_us")
+    val = _read_sysfs(paths[0]) if paths else None
+    if val is None:
+        return None
+    try:
+        return int(val) / 1_000_000
+    except (ValueError, TypeError):
+        return None
+
+
+def set_rapl_time_window(seconds: float, domain: str = "package", constraint: str = RAPL_LONG_TERM) -> bool:
+    paths = _rapl_domain_paths(domain, constraint, "time_window_us")
+    try:
+        seconds = float(seconds)
+    except (TypeError, ValueError):
+        return False
+    if not paths:
+        return False
+    seconds = max(RAPL_TAU_MIN_S, min(RAPL_TAU_MAX_S, seconds))
+    return all([_write_sysfs(path, str(int(seconds * 1_000_000))) for path in paths])
+
+
+def get_rapl_domain_limits() -> Dict[str, Dict[str, Optional[int]]]:
+    return {
+        zone_id: {c: get_rapl_limit_watts(zone_id, c) for c in zone["constraints"]}
+        for zone_id, zone in discover_rapl_zones().items()
+    }
+
+
+def set_rapl_domain_limits(limits: Dict[str, object]) -> bool:
+    success = True
+    if not isinstance(limits, dict):
+        return False
+    for domain, value in limits.items():
+        per_constraint = value if isinstance(value, dict) else {RAPL_LONG_TERM: value}
+        for constraint, watts in per_constraint.items():
+            if watts is None:
+                continue
+            if not set_rapl_limit(domain, watts, constraint):
+                success = False
+    return success
+
+
+def get_cpu_max_freq_mhz(cluster: str = None) -> Optional[int]:
     best = None
-    for cpu in _cpu_dirs():
+    for cpu in _cluster_dirs(cluster):
         val = _read_sysfs(str(cpu / SCALING_MAX_FREQ_ATTR))
         if val is None:
             continue
@@ -167,12 +425,18 @@ def get_cpu_max_freq_mhz() -> Optional[int]:
                 best = mhz
         except (ValueError, TypeError):
             continue
+    if cluster is None and _intel_pstate_global_limits():
+        pct = _read_sysfs_int(INTEL_PSTATE_MAX_PERF)
+        hw_max = get_cpu_hw_max_freq_mhz()
+        if pct is not None and hw_max:
+            capped = hw_max * pct // 100
+            best = capped if best is None else min(best, capped)
     return best
 
 
-def get_cpu_hw_max_freq_mhz() -> Optional[int]:
+def get_cpu_hw_max_freq_mhz(cluster: str = None) -> Optional[int]:
     best = None
-    for cpu in _cpu_dirs():
+    for cpu in _cluster_dirs(cluster):
         val = _read_sysfs(str(cpu / CPUINFO_MAX_FREQ))
         if val is None:
             continue
@@ -185,11 +449,61 @@ def get_cpu_hw_max_freq_mhz() -> Optional[int]:
     return best
 
 
-def set_cpu_max_freq(mhz: int) -> bool:
+def get_cpufreq_driver() -> str:
+    return _read_sysfs(f"{CPU_BASE}/cpu0/{SCALING_DRIVER}") or "unknown"
+
+
+def _intel_pstate_global_limits() -> bool:
+    if _read_sysfs(INTEL_PSTATE_STATUS) not in ("active", "passive"):
+        return False
+    return len(get_cpu_clusters()) == 1
+
+
+def get_freq_cap_mechanism() -> str:
+    return "intel_pstate max_perf_pct" if _intel_pstate_global_limits() else "per-cpu scaling_max_freq"
+
+
+_pstate_hw_max_mhz: Optional[int] = None
+
+
+def _set_max_perf_pct(mhz: int) -> bool:
+    global _pstate_hw_max_mhz
+    if _pstate_hw_max_mhz is None:
+        _pstate_hw_max_mhz = get_cpu_hw_max_freq_mhz()
+    hw_max = _pstate_hw_max_mhz
+    if not hw_max:
+        return False
+    pct = max(1, min(100, -(-mhz * 100 // hw_max)))
+    min_pct = _read_sysfs_int(INTEL_PSTATE_MIN_PERF)
+    if min_pct is not None and min_pct > pct:
+        _write_sysfs(INTEL_PSTATE_MIN_PERF, str(pct))
+    if not _write_sysfs(INTEL_PSTATE_MAX_PERF, str(pct)):
+        return False
+
+    target_khz = min(mhz, hw_max) * 1000
+    for cpu in _cpu_dirs():
+        cur = _read_sysfs_int(str(cpu / SCALING_MAX_FREQ_ATTR))
+        if cur is not None and cur < target_khz - 100_000:
+            hw_khz = _read_sysfs(str(cpu / CPUINFO_MAX_FREQ))
+            if hw_khz:
+                _write_sysfs(str(cpu / SCALING_MAX_FREQ_ATTR), hw_khz)
+    return True
+
+
+def refresh_sysfs_caches() -> None:
+    global _pstate_hw_max_mhz
+    _pstate_hw_max_mhz = None
+    discover_rapl_zones(refresh=True)
+    get_cpu_clusters(refresh=True)
+
+
+def set_cpu_max_freq(mhz: int, cluster: str = None) -> bool:
     mhz = max(CPU_FREQ_MIN_MHZ, min(CPU_FREQ_MAX_MHZ, mhz))
+    if cluster is None and _intel_pstate_global_limits() and _set_max_perf_pct(mhz):
+        return True
     khz = str(mhz * 1000)
     success = True
-    for cpu in _cpu_dirs():
+    for cpu in _cluster_dirs(cluster):
         if not _write_sysfs(str(cpu / SCALING_MAX_FREQ_ATTR), khz):
             success = False
     return success
@@ -203,8 +517,8 @@ def get_kb_state() -> Optional[dict]:
     return {"per_zone_mode": per_zone, "four_zone_mode": four_mode}
 
 
-def save_kb_state() -> bool:
-    state = get_kb_state()
+def save_kb_state(state: Optional[dict] = None) -> bool:
+    state = state or get_kb_state()
     if not state:
         return False
     path = Path(KB_STATE_FILE)
@@ -239,8 +553,8 @@ def reset_kb_brightness() -> None:
         _write_sysfs(KB_PER_ZONE, ",".join(parts[:4] + ["0"]))
 
 
-def restore_kb_state() -> bool:
-    state = load_kb_state()
+def restore_kb_state(state: Optional[dict] = None) -> bool:
+    state = state or load_kb_state()
     if not state:
         return False
     per_zone = state.get("per_zone_mode", "")
@@ -249,7 +563,73 @@ def restore_kb_state() -> bool:
     return False
 
 
-def apply_cpu_power(config: dict) -> None:
+def detect_power_profile(governor: str, turbo: bool, epp: str, platform_profile: str) -> Optional[str]:
+    if governor == "powersave" and not turbo and epp == "power":
+        return "deepsleep" if platform_profile == "low-power" else "stealth"
+    profile_map = {
+        ("powersave", True, "balance_power"): "cruise",
+        ("powersave", True, "balance_performance"): "boost",
+        ("performance", True, "performance"): "nitro",
+    }
+    return profile_map.get((governor, turbo, epp))
+
+
+def get_active_power_profile() -> Optional[str]:
+    return detect_power_profile(
+        get_current_governor(), get_turbo_enabled(),
+        get_current_epp(), get_platform_profile(),
+    )
+
+
+def get_cpu_power_status() -> dict:
+    governor = get_current_governor()
+    turbo = get_turbo_enabled()
+    epp = get_current_epp()
+    platform_profile = get_platform_profile()
+    return {
+        "governors": get_available_governors(),
+        "epps": get_available_epp(),
+        "governor": governor,
+        "turbo": turbo,
+        "epp": epp,
+        "platform_profile": platform_profile,
+        "pl1_w": get_rapl_pl1_watts(),
+        "pl2_w": get_rapl_pl2_watts(),
+        "max_freq_mhz": get_cpu_max_freq_mhz(),
+        "profile": detect_power_profile(governor, turbo, epp, platform_profile),
+    }
+
+
+def snapshot_cpu_power() -> dict:
+    def known(value):
+        return None if value == "unknown" else value
+
+    no_turbo = _read_sysfs(NO_TURBO)
+    cluster_freq, cluster_epp = {}, {}
+    clusters = get_cpu_clusters()
+    for cluster in sorted(clusters) if len(clusters) > 1 else []:
+        mhz = get_cpu_max_freq_mhz(cluster)
+        if mhz is not None:
+            cluster_freq[cluster] = mhz
+        epp = known(get_current_epp(cluster))
+        if epp:
+            cluster_epp[cluster] = epp
+    return {
+        "cpu_governor": known(get_current_governor()),
+        "cpu_turbo_enabled": no_turbo == "0" if no_turbo is not None else None,
+        "cpu_epp": known(get_current_epp()),
+        "cpu_platform_profile": known(get_platform_profile()),
+        "cpu_rapl_pl1_w": get_rapl_pl1_watts(),
+        "cpu_rapl_pl2_w": get_rapl_pl2_watts(),
+        "cpu_rapl_pl1_tau_s": get_rapl_time_window_s(constraint=RAPL_LONG_TERM),
+        "cpu_rapl_pl2_tau_s": get_rapl_time_window_s(constraint=RAPL_SHORT_TERM),
+        "cpu_max_freq_mhz": None if cluster_freq else get_cpu_max_freq_mhz(),
+        "cpu_cluster_max_freq_mhz": cluster_freq or None,
+        "cpu_cluster_epp": cluster_epp or None,
+    }
+
+
+def apply_cpu_power(config: dict, sync_profile: bool = True) -> None:
     governor = config.get("cpu_governor")
     if governor:
         set_governor(governor)
@@ -261,7 +641,7 @@ def apply_cpu_power(config: dict) -> None:
     epp = config.get("cpu_epp")
     if epp:
         pp = config.get("cpu_platform_profile") or None
-        set_epp(epp, platform_profile=pp)
+        set_epp(epp, platform_profile=pp, sync_profile=sync_profile)
 
     pl1 = config.get("cpu_rapl_pl1_w")
     if pl1 is not None:
@@ -271,6 +651,24 @@ def apply_cpu_power(config: dict) -> None:
     if pl2 is not None:
         set_rapl_pl2(pl2)
 
+    pl1_tau = config.get("cpu_rapl_pl1_tau_s")
+    if pl1_tau is not None:
+        set_rapl_time_window(pl1_tau, constraint=RAPL_LONG_TERM)
+
+    pl2_tau = config.get("cpu_rapl_pl2_tau_s")
+    if pl2_tau is not None:
+        set_rapl_time_window(pl2_tau, constraint=RAPL_SHORT_TERM)
+
+    domain_limits = config.get("cpu_rapl_domain_limits")
+    if domain_limits:
+        set_rapl_domain_limits(domain_limits)
+
     max_freq = config.get("cpu_max_freq_mhz")
     if max_freq is not None:
         set_cpu_max_freq(max_freq)
+
+    for cluster, mhz in (config.get("cpu_cluster_max_freq_mhz") or {}).items():
+        set_cpu_max_freq(mhz, cluster=cluster)
+
+    for cluster, pref in (config.get("cpu_cluster_epp") or {}).items():
+        set_epp(pref, cluster=cluster)
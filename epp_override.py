@@ -5,55 +5,28 @@ import time
 import signal
 from pathlib import Path
 
-PLATFORM_PROFILE = Path("/sys/firmware/acpi/platform_profile")
-EPP_CPU0 = Path("/sys/devices/system/cpu/cpu0/cpufreq/energy_performance_preference")
-NO_TURBO = Path("/sys/devices/system/cpu/intel_pstate/no_turbo")
-CPU_BASE = Path("/sys/devices/system/cpu")
-RAPL_PL1 = Path("/sys/class/powercap/intel-rapl:0/constraint_0_power_limit_uw")
-RAPL_PL2 = Path("/sys/class/powercap/intel-rapl:0/constraint_1_power_limit_uw")
+for _p in [str(Path(__file__).parent), "/usr/local/lib/fan-aggressor"]:
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from control_socket import request as control_request
+from power_arbiter import (
+    PROFILE_TO_EPP, PROFILE_TURBO, PROFILE_GOVERNOR, PROFILE_RAPL, PROFILE_MAX_FREQ_MHZ,
+    BATTERY_RAPL_CAP, BATTERY_MAX_FREQ_MHZ,
+)
+from power_source import PowerSourceMonitor
+from sysfs import resolve
+
+PLATFORM_PROFILE = Path(resolve("/sys/firmware/acpi/platform_profile"))
+EPP_CPU0 = Path(resolve("/sys/devices/system/cpu/cpu0/cpufreq/energy_performance_preference"))
+NO_TURBO = Path(resolve("/sys/devices/system/cpu/intel_pstate/no_turbo"))
+CPU_BASE = Path(resolve("/sys/devices/system/cpu"))
+RAPL_PL1 = Path(resolve("/sys/class/powercap/intel-rapl:0/constraint_0_power_limit_uw"))
+RAPL_PL2 = Path(resolve("/sys/class/powercap/intel-rapl:0/constraint_1_power_limit_uw"))
 SCALING_MAX_FREQ = "cpufreq/scaling_max_freq"
 
-PROFILE_TO_EPP = {
-    "low-power": "power",
-    "quiet": "power",
-    "balanced": "balance_power",
-    "balanced-performance": "balance_performance",
-    "performance": "performance",
-}
-
-PROFILE_TURBO = {
-    "low-power": False,
-    "quiet": False,
-    "balanced": True,
-    "balanced-performance": True,
-    "performance": True,
-}
-
-PROFILE_GOVERNOR = {
-    "low-power": "powersave",
-    "quiet": "powersave",
-    "balanced": "powersave",
-    "balanced-performance": "powersave",
-    "performance": "performance",
-}
-
-PROFILE_RAPL = {
-    "low-power": (15, 20),
-    "quiet": (25, 35),
-    "balanced": (45, 65),
-    "balanced-performance": (65, 100),
-    "performance": (125, 157),
-}
-
-PROFILE_MAX_FREQ_MHZ = {
-    "low-power": 2000,
-    "quiet": 3200,
-    "balanced": 4400,
-    "balanced-performance": 5300,
-    "performance": 5500,
-}
-
 SCALING_GOVERNOR = "cpufreq/scaling_governor"
+PING_TIMEOUT_S = 0.2
 
 
 def read_profile() -> str:
@@ -162,6 +135,11 @@ def set_max_freq(mhz: int) -> bool:
     return success
 
 
+def daemon_owns_power() -> bool:
+    reply = control_request("ping", timeout=PING_TIMEOUT_S)
+    return bool(reply and reply.get("ok"))
+
+
 def main():
     running = True
 
@@ -173,23 +151,43 @@ def main():
     signal.signal(signal.SIGINT, stop)
 
     last_profile = ""
+    last_source = None
     last_log = {}
+    delegated = False
+    monitor = PowerSourceMonitor()
     print("EPP Override iniciado")
 
     while running:
+        if daemon_owns_power():
+            if not delegated:
+                print("fan-aggressor ativo: perfis de plataforma aplicados pelo árbitro do daemon")
+                delegated = True
+            last_profile = ""
+            monitor.wait(1)
+            continue
+        if delegated:
+            print("fan-aggressor parado: retomando controle dos perfis")
+            delegated = False
+
         profile = read_profile()
         if not profile:
-            time.sleep(1)
+            monitor.wait(1)
             continue
+        source = monitor.current
 
         expected_epp = PROFILE_TO_EPP.get(profile)
         expected_turbo = PROFILE_TURBO.get(profile)
         expected_gov = PROFILE_GOVERNOR.get(profile)
         expected_rapl = PROFILE_RAPL.get(profile)
         expected_freq = PROFILE_MAX_FREQ_MHZ.get(profile)
+        if source == "battery":
+            if expected_rapl:
+                expected_rapl = tuple(min(w, cap) for w, cap in zip(expected_rapl, BATTERY_RAPL_CAP))
+            if expected_freq:
+                expected_freq = min(expected_freq, BATTERY_MAX_FREQ_MHZ)
 
         if expected_epp or expected_turbo is not None or expected_gov:
-            profile_changed = profile != last_profile
+            profile_changed = profile != last_profile or source != last_source
             if profile_changed:
                 time.sleep(0.3)
 
@@ -234,7 +232,7 @@ def main():
 
             current_state = (current_gov, current_epp, current_turbo, current_rapl, current_freq)
             if changed:
-                print(f"[{profile}] {', '.join(changed)}")
+                print(f"[{profile}{'/bateria' if source == 'battery' else ''}] {', '.join(changed)}")
                 last_log[profile] = current_state
             elif profile_changed and last_log.get(profile) != current_state:
                 turbo_state = "ON" if current_turbo else "OFF"
@@ -243,8 +241,10 @@ def main():
                 last_log[profile] = current_state
 
         last_profile = profile
-        time.sleep(1)
+        last_source = source
+        monitor.wait(1)
 
+    monitor.close()
     print("EPP Override finalizado")
 
 
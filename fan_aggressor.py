@@ -8,6 +8,7 @@ import fcntl
 import argparse
 import signal
 import subprocess
+import threading
 from pathlib import Path
 from typing import Dict, Optional
 
@@ -15,15 +16,38 @@ for _p in [str(Path(__file__).parent), "/usr/local/lib/fan-aggressor"]:
     if _p not in sys.path:
         sys.path.insert(0, _p)
 
-from fan_monitor import FanMonitor, rpm_to_percent as rpm_to_duty
+from fan_monitor import FanMonitor, ThrottleMonitor, rpm_to_percent as rpm_to_duty
 from cpu_power import (
-    apply_cpu_power, get_current_governor, get_turbo_enabled,
-    get_current_epp
+    get_current_governor, get_turbo_enabled,
+    get_current_epp, get_rapl_pl1_watts, get_rapl_pl2_watts,
+    get_rapl_time_window_s, get_rapl_domain_limits, discover_rapl_zones,
+    get_cpu_clusters, get_cpu_max_freq_mhz, get_cpu_hw_max_freq_mhz,
+    get_cpufreq_driver, get_freq_cap_mechanism, POWER_PROFILES, PROFILE_ORDER,
+    get_active_power_profile, detect_power_profile, get_cpu_power_status,
+    RAPL_LONG_TERM, RAPL_SHORT_TERM,
+)
+from power_monitor import PowerMonitor
+from power_budget import ThermalBudget, NoiseCap, BUDGET_MODES
+from process_rules import ProcessRules
+from pressure import PressureEscalator, read_pressure
+from power_source import PowerSourceMonitor, POWER_SOURCES, read_ac_online
+from scorecard import ProfileScorecard, CpuSampler, SCORECARD_FILE
+from control_socket import ControlServer, request as control_request
+from history import History, HISTORY_POINTS
+from kb_guard import KeyboardGuard
+from power_arbiter import (
+    PowerArbiter, CONFIG_SOURCE, PLATFORM_SOURCE, BUDGET_SOURCE, NOISE_CAP_SOURCE, BENCH_SOURCE, CPU_POWER_KEYS,
+    PRIORITY_USER, PRIORITY_BUDGET, PRIORITY_NOISE_CAP, PRIORITY_MAX, config_settings,
 )
 
 CONFIG_FILE = Path("/etc/fan-aggressor/config.json")
 PID_FILE = "/var/run/fan-aggressor.pid"
 STATE_FILE = Path("/var/run/fan-aggressor.state")
+TELEMETRY_FILE = Path("/var/run/fan-aggressor.telemetry")
+TELEMETRY_MAX_AGE = 5
+STATUS_SCHEMA = 1
+STATUS_TIMEOUT_S = 0.5
+STATUS_CPU_POWER_KEYS = ("governor", "turbo", "epp", "platform_profile", "pl1_w", "pl2_w", "max_freq_mhz", "profile")
 
 ALLOWED_NEKROCTL_DIRS = [
     "/usr/local/bin",
@@ -42,6 +66,19 @@ SUBPROCESS_TIMEOUT = 5
 MAX_FAN_FAILURES = 3
 MIN_SANE_TEMP = 5
 MAX_SANE_TEMP = 115
+FEEDFORWARD_HOLD_S = 5.0
+FEEDFORWARD_RELEASE_RATIO = 0.8
+THROTTLE_HOLD_S = 10.0
+RELOAD_TIMEOUT_S = 5.0
+RELOAD_MIN_INTERVAL_S = 3.0
+TICK_TIMEOUT_S = 5.0
+POWER_DRIFT_INTERVAL_S = 10.0
+SOURCE_FAN_KEYS = (
+    "cpu_fan_offset", "gpu_fan_offset", "cpu_fan_fixed_offset", "gpu_fan_fixed_offset",
+    "hybrid_mode", "temp_threshold_engage", "temp_threshold_disengage", "fan_duty_cap",
+    "power_feedforward_w", "power_feedforward_duty", "power_budget_mode",
+    "power_budget_target_temp", "power_budget_target_duty", "power_budget_max_w",
+)
 
 
 def _is_nekroctl_path_allowed(path: str) -> bool:
@@ -126,6 +163,14 @@ def write_state(active: bool, cpu_offset: int = 0, gpu_offset: int = 0, base_cpu
         pass
 
 
+def read_state() -> Optional[Dict]:
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, PermissionError, OSError):
+        return None
+
+
 def clear_state():
     try:
         if STATE_FILE.exists():
@@ -134,6 +179,83 @@ def clear_state():
         pass
 
 
+def write_telemetry(telemetry: Dict):
+    try:
+        tmp_path = TELEMETRY_FILE.with_suffix(".tmp")
+        fd = os.open(str(tmp_path), os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(telemetry, f)
+        os.replace(tmp_path, TELEMETRY_FILE)
+    except (PermissionError, OSError):
+        pass
+
+
+def read_telemetry() -> Optional[Dict]:
+    try:
+        with open(TELEMETRY_FILE) as f:
+            telemetry = json.load(f)
+        if time.time() - telemetry.get("time", 0) > TELEMETRY_MAX_AGE:
+            return None
+        return telemetry
+    except (FileNotFoundError, json.JSONDecodeError, PermissionError, OSError, AttributeError):
+        return None
+
+
+def status_document(source: str, config: Dict, temps: Dict, speeds: Dict, fan_state: Optional[Dict],
+                    cpu_power: Dict, power: Optional[Dict], power_source: Optional[str],
+                    throttle: Optional[Dict], rule_profile: Optional[str], psi_profile: Optional[str],
+                    duties: tuple = (None, None)) -> Dict:
+    valid = [t for t in (temps.get("cpu"), temps.get("gpu")) if t is not None]
+    fan_state = fan_state or {}
+    return {
+        "schema": STATUS_SCHEMA,
+        "source": source,
+        "time": round(time.time(), 3),
+        "daemon": source == "daemon",
+        "enabled": bool(config.get("enabled", True)),
+        "hybrid_mode": bool(config.get("hybrid_mode", True)),
+        "fan_mode": fan_state.get("mode", "boost") if fan_state.get("active") else "auto",
+        "offsets": {
+            "cpu": config.get("cpu_fan_offset", 0),
+            "gpu": config.get("gpu_fan_offset", 0),
+            "cpu_fixed": config.get("cpu_fan_fixed_offset", 0),
+            "gpu_fixed": config.get("gpu_fan_fixed_offset", 0),
+        },
+        "thresholds": {
+            "engage": config.get("temp_threshold_engage", 70),
+            "disengage": config.get("temp_threshold_disengage", 65),
+        },
+        "temps": {"cpu": temps.get("cpu"), "gpu": temps.get("gpu"), "max": max(valid) if valid else None},
+        "fans": {
+            "fan1_rpm": speeds.get("fan1"),
+            "fan2_rpm": speeds.get("fan2"),
+            "cpu_duty": duties[0],
+            "gpu_duty": duties[1],
+        },
+        "cpu_power": {key: cpu_power.get(key) for key in STATUS_CPU_POWER_KEYS},
+        "power": {name: {"now": watts.get("now"), "avg": watts.get("avg")} for name, watts in (power or {}).items()},
+        "power_source": power_source,
+        "throttle": throttle or None,
+        "rule_profile": rule_profile,
+        "psi_profile": psi_profile,
+    }
+
+
+def daemon_status() -> Optional[Dict]:
+    reply = control_request("status", timeout=STATUS_TIMEOUT_S)
+    if reply and reply.get("ok") and reply.get("status"):
+        return reply["status"]
+    return None
+
+
+def clear_telemetry():
+    try:
+        if TELEMETRY_FILE.exists():
+            TELEMETRY_FILE.unlink()
+    except PermissionError:
+        pass
+
+
 def get_fan_speed(nekroctl: str) -> tuple:
     try:
         result = subprocess.run([nekroctl, "fan", "get"],
@@ -166,7 +288,9 @@ class FanAggressor:
     def __init__(self, config_path: Path = CONFIG_FILE):
         self.config_path = config_path
         self.config = self._load_config()
+        self.file_config = self.config
         self.monitor = FanMonitor()
+        self.power_monitor = PowerMonitor()
         self.running = False
         self.last_cpu = -1
         self.last_gpu = -1
@@ -181,8 +305,56 @@ class FanAggressor:
         self.fixed_anchor_cpu = 0
         self.fixed_anchor_gpu = 0
         self.fixed_anchor_temp = 0
+        self.is_prespinning = False
+        self.prespin_duty = 0
+        self.prespin_until = 0.0
+        self.last_power = {}
+        self.throttle_monitor = ThrottleMonitor()
+        self.last_throttle = {}
+        self.throttle_extra = 0
+        self.throttle_until = 0.0
+        self.scorecard: Optional[ProfileScorecard] = None
+        self.cpu_sampler: Optional[CpuSampler] = None
+        self.last_record: Optional[float] = None
         self.nekroctl_path = _find_nekroctl(self.config)
         self.nekroctl_missing_logged = False
+        self.power_budget = ThermalBudget()
+        self.noise_cap = NoiseCap()
+        self.process_rules = ProcessRules()
+        self._rules_key = None
+        self.pressure_escalator = PressureEscalator()
+        self.power_source: Optional[PowerSourceMonitor] = None
+        self.control = ControlServer()
+        self.control.register("history", self._history_request)
+        self.control.register("reload", self._reload_request, blocking=True)
+        self.control.register("apply", self._apply_request, privileged=True, blocking=True)
+        self.control.register("status", self._status_request)
+        self.control.register("power", self._power_request)
+        self.control.register("power-intent", self._power_intent_request, privileged=True, blocking=True)
+        self.control.register("stats-reset", self._stats_reset_request, privileged=True)
+        self.arbiter = PowerArbiter()
+        self.tick_cond = threading.Condition()
+        self.ticks_started = 0
+        self.ticks_arbitrated = 0
+        self.next_power_check = 0.0
+        self._source_base: Optional[Dict] = None
+        self._source_key: Optional[str] = None
+        self._source_config: Optional[Dict] = None
+        self.reload_requested = False
+        self.reload_done = threading.Event()
+        self.reload_lock = threading.Lock()
+        self.last_reload_ms: Optional[float] = None
+        self.last_reload_error: Optional[str] = None
+        self.last_reload_at = -RELOAD_MIN_INTERVAL_S
+        self._config_key = None
+        self._wake_r: Optional[int] = None
+        self._wake_w: Optional[int] = None
+        self.history = History()
+        self.last_speeds: Dict[str, int] = {}
+        self.last_temps: Optional[Dict[str, Optional[float]]] = None
+        self.last_cpu_power: Optional[tuple] = None
+        self.last_cpu_power_status: Dict = {}
+        self.last_status: Optional[Dict] = None
 
     def _load_config(self) -> Dict:
         default = {
@@ -202,8 +374,33 @@ class FanAggressor:
             "cpu_rapl_pl1_w": None,
             "cpu_rapl_pl2_w": None,
             "cpu_max_freq_mhz": None,
+            "cpu_rapl_pl1_tau_s": None,
+            "cpu_rapl_pl2_tau_s": None,
+            "cpu_rapl_domain_limits": None,
+            "cpu_cluster_max_freq_mhz": None,
+            "cpu_cluster_epp": None,
             "cpu_fan_fixed_offset": 0,
-            "gpu_fan_fixed_offset": 0
+            "gpu_fan_fixed_offset": 0,
+            "power_budget_mode": "off",
+            "power_budget_target_temp": 85,
+            "power_budget_target_duty": 70,
+            "power_budget_max_w": None,
+            "fan_duty_cap": 0,
+            "power_feedforward_w": 0,
+            "power_feedforward_duty": 50,
+            "profile_rules": [],
+            "profile_rules_default": None,
+            "profile_rules_debounce_s": 3.0,
+            "psi_escalation": False,
+            "psi_escalate_pct": 40,
+            "psi_relax_pct": 10,
+            "psi_dwell_s": 30,
+            "psi_max_profile": "nitro",
+            "power_source_profiles": {},
+            "power_source_fan_config": {},
+            "throttle_boost": False,
+            "throttle_offset_step": 5,
+            "throttle_offset_max": 20
         }
         if self.config_path.exists():
             try:
@@ -304,8 +501,107 @@ class FanAggressor:
             except (TypeError, ValueError):
                 config["cpu_max_freq_mhz"] = None
 
+        for tau_key in ("cpu_rapl_pl1_tau_s", "cpu_rapl_pl2_tau_s"):
+            tau = config.get(tau_key)
+            if tau is not None:
+                try:
+                    config[tau_key] = max(0.001, min(448.0, float(tau)))
+                except (TypeError, ValueError):
+                    config[tau_key] = None
+
+        config["cpu_rapl_domain_limits"] = self._sanitize_domain_limits(config.get("cpu_rapl_domain_limits"))
+
+        cluster_freq = config.get("cpu_cluster_max_freq_mhz")
+        if isinstance(cluster_freq, dict):
+            cluster_freq = {str(c): max(800, min(5500, self._safe_int(mhz, 5500)))
+                            for c, mhz in cluster_freq.items()}
+        config["cpu_cluster_max_freq_mhz"] = cluster_freq or None
+
+        cluster_epp = config.get("cpu_cluster_epp")
+        if isinstance(cluster_epp, dict):
+            cluster_epp = {str(c): pref for c, pref in cluster_epp.items() if isinstance(pref, str) and pref}
+        config["cpu_cluster_epp"] = cluster_epp or None
+
+        budget_mode = config.get("power_budget_mode", "off")
+        if budget_mode not in BUDGET_MODES:
+            budget_mode = "off"
+        config["power_budget_mode"] = budget_mode
+        config["power_budget_target_temp"] = max(50, min(100, self._safe_int(config.get("power_budget_target_temp"), 85)))
+        config["power_budget_target_duty"] = max(10, min(100, self._safe_int(config.get("power_budget_target_duty"), 70)))
+        budget_max = config.get("power_budget_max_w")
+        if budget_max is not None:
+            try:
+                config["power_budget_max_w"] = max(15, min(200, int(budget_max)))
+            except (TypeError, ValueError):
+                config["power_budget_max_w"] = None
+
+        config["fan_duty_cap"] = max(0, min(100, self._safe_int(config.get("fan_duty_cap"), 0)))
+        config["power_feedforward_w"] = max(0, min(250, self._safe_int(config.get("power_feedforward_w"), 0)))
+        config["power_feedforward_duty"] = max(0, min(100, self._safe_int(config.get("power_feedforward_duty"), 50)))
+
+        rules = config.get("profile_rules")
+        if not isinstance(rules, list):
+            rules = []
+        config["profile_rules"] = [
+            r for r in rules
+            if isinstance(r, dict) and r.get("profile") in POWER_PROFILES and (r.get("match") or r.get("cgroup"))
+        ]
+        if config.get("profile_rules_default") not in POWER_PROFILES:
+            config["profile_rules_default"] = None
+        try:
+            debounce = float(config.get("profile_rules_debounce_s", 3.0))
+        except (TypeError, ValueError):
+            debounce = 3.0
+        config["profile_rules_debounce_s"] = max(0.0, min(60.0, debounce))
+
+        config["psi_escalation"] = bool(config.get("psi_escalation", False))
+        escalate = max(1, min(100, self._safe_int(config.get("psi_escalate_pct"), 40)))
+        relax = max(0, min(100, self._safe_int(config.get("psi_relax_pct"), 10)))
+        if relax >= escalate:
+            relax = max(0, escalate - 10)
+        config["psi_escalate_pct"] = escalate
+        config["psi_relax_pct"] = relax
+        config["psi_dwell_s"] = max(5, min(600, self._safe_int(config.get("psi_dwell_s"), 30)))
+        if config.get("psi_max_profile") not in POWER_PROFILES:
+            config["psi_max_profile"] = "nitro"
+
+        config["throttle_boost"] = bool(config.get("throttle_boost", False))
+        config["throttle_offset_step"] = max(0, min(50, self._safe_int(config.get("throttle_offset_step"), 5)))
+        config["throttle_offset_max"] = max(0, min(100, self._safe_int(config.get("throttle_offset_max"), 20)))
+
+        profiles = config.get("power_source_profiles")
+        if not isinstance(profiles, dict):
+            profiles = {}
+        config["power_source_profiles"] = {
+            source: profile for source, profile in profiles.items()
+            if source in POWER_SOURCES and profile in POWER_PROFILES
+        }
+        fan_config = config.get("power_source_fan_config")
+        if not isinstance(fan_config, dict):
+            fan_config = {}
+        config["power_source_fan_config"] = {
+            source: {k: v for k, v in values.items() if k in SOURCE_FAN_KEYS}
+            for source, values in fan_config.items()
+            if source in POWER_SOURCES and isinstance(values, dict)
+        }
+
         return config
 
+    def _sanitize_domain_limits(self, limits) -> Optional[Dict]:
+        if not isinstance(limits, dict):
+            return None
+        sanitized = {}
+        for domain, value in limits.items():
+            per_constraint = value if isinstance(value, dict) else {"long_term": value}
+            clean = {}
+            for constraint, watts in per_constraint.items():
+                watts = self._safe_int(watts, 0)
+                if watts > 0:
+                    clean[str(constraint)] = min(250, watts)
+            if clean:
+                sanitized[str(domain)] = clean
+        return sanitized or None
+
     def _save_config(self):
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
         tmp_path = self.config_path.with_suffix(".tmp")
@@ -331,11 +627,18 @@ class FanAggressor:
         if self.nekroctl_path:
             set_fan_auto(self.nekroctl_path)
 
-    def status(self):
+    def status(self, as_json: bool = False):
+        if as_json:
+            print(json.dumps(self.status_json(), indent=2))
+            return
         speeds = self.monitor.get_fan_speeds()
         temps = self.monitor.get_temps()
         fan_cpu, fan_gpu = (None, None)
-        if self.nekroctl_path:
+        reply = control_request("status", timeout=STATUS_TIMEOUT_S)
+        if reply and reply.get("ok") and reply.get("status"):
+            fans = reply["status"]["fans"]
+            fan_cpu, fan_gpu = fans["cpu_duty"] or 0, fans["gpu_duty"] or 0
+        elif self.nekroctl_path:
             fan_cpu, fan_gpu = get_fan_speed(self.nekroctl_path)
 
         print(f"Status: {'ATIVO' if self.config['enabled'] else 'INATIVO'}")
@@ -355,9 +658,11 @@ class FanAggressor:
             print(f"\nThresholds (modo hibrido):")
             print(f"  Ativar boost: >= {self.config.get('temp_threshold_engage', 70)}°C")
             print(f"  Voltar auto:  <  {self.config.get('temp_threshold_disengage', 65)}°C")
+            if self.config.get("power_feedforward_w", 0) > 0:
+                print(f"  Pre-spin: pacote >= {self.config['power_feedforward_w']}W -> fans {self.config.get('power_feedforward_duty', 50)}%")
 
         if fan_cpu is not None and fan_gpu is not None:
-            print(f"\nDuty atual (nekroctl):")
+            print(f"\nDuty atual ({'daemon' if reply and reply.get('ok') else 'nekroctl'}):")
             print(f"  CPU: {fan_cpu}% {'(auto)' if fan_cpu == 0 else ''}")
             print(f"  GPU: {fan_gpu}% {'(auto)' if fan_gpu == 0 else ''}")
 
@@ -372,6 +677,45 @@ class FanAggressor:
         print(f"  Governor: {get_current_governor()}")
         print(f"  Turbo Boost: {'ON' if get_turbo_enabled() else 'OFF'}")
         print(f"  EPP: {get_current_epp()}")
+        print(f"  Driver: {get_cpufreq_driver()} (limite de freq via {get_freq_cap_mechanism()})")
+        print(f"  Perfil ativo: {get_active_power_profile() or 'personalizado'}")
+        telemetry = read_telemetry()
+        throttle = telemetry.get("throttle") if telemetry else None
+        if throttle:
+            print(f"  Throttle térmico: {throttle.get('events_per_s', 0)} eventos/s, "
+                  f"{throttle.get('throttled_ms', 0)} ms no último ciclo")
+        ac = read_ac_online()
+        if ac is not None:
+            source = "ac" if ac else "battery"
+            profile = self.config.get("power_source_profiles", {}).get(source)
+            print(f"  Fonte de energia: {'AC' if ac else 'bateria'}"
+                  + (f" (perfil {profile})" if profile else ""))
+        rules = self.config.get("profile_rules") or []
+        if rules or self.config.get("profile_rules_default"):
+            rule_profile = telemetry.get("rule_profile") if telemetry else None
+            print(f"  Regras de processo: {len(rules)} regra(s), "
+                  f"perfil por regra: {rule_profile or 'nenhum'}")
+        if self.config.get("psi_escalation"):
+            psi_profile = telemetry.get("psi_profile") if telemetry else None
+            cpu_psi = (read_pressure("cpu") or {}).get("some_avg10")
+            print(f"  PSI: cpu some avg10 {cpu_psi if cpu_psi is not None else 'N/A'}%, "
+                  f"escalado para {psi_profile or 'nenhum'}")
+        clusters = get_cpu_clusters()
+        if len(clusters) > 1:
+            for cluster, cpus in sorted(clusters.items()):
+                hw_max = get_cpu_hw_max_freq_mhz(cluster)
+                cur_max = get_cpu_max_freq_mhz(cluster)
+                print(f"  Cluster {cluster.upper()} ({len(cpus)} CPUs): max {cur_max}/{hw_max} MHz")
+        self._print_power_status(telemetry)
+        budget_mode = self.config.get("power_budget_mode", "off")
+        if budget_mode != "off":
+            target = (f"{self.config.get('power_budget_target_temp')}°C" if budget_mode == "temp"
+                      else f"fan {self.config.get('power_budget_target_duty')}%")
+            pl1 = get_rapl_pl1_watts()
+            print(f"  Power budget: alvo {target}, PL1 atual {pl1 if pl1 is not None else 'N/A'}W")
+        duty_cap = self.config.get("fan_duty_cap", 0)
+        if 0 < duty_cap < 100:
+            print(f"  Noise cap: fans <= {duty_cap}%")
 
         if temps:
             cg = self.monitor.get_cpu_gpu_temps()
@@ -409,17 +753,608 @@ class FanAggressor:
                 else:
                     print("\nCurva fixa: temperatura indisponível")
 
+    def _print_power_status(self, telemetry: Optional[Dict]):
+        power = telemetry.get("power") if telemetry else None
+        if power is None and self.power_monitor.available:
+            self.power_monitor.sample()
+            time.sleep(0.25)
+            power = self.power_monitor.sample()
+        pl1 = get_rapl_pl1_watts()
+        pl2 = get_rapl_pl2_watts()
+        if pl1 is not None or pl2 is not None:
+            print(f"  PL1/PL2: {pl1 if pl1 is not None else 'N/A'}W / {pl2 if pl2 is not None else 'N/A'}W")
+        tau1 = get_rapl_time_window_s(constraint=RAPL_LONG_TERM)
+        tau2 = get_rapl_time_window_s(constraint=RAPL_SHORT_TERM)
+        if tau1 is not None or tau2 is not None:
+            fmt = lambda t: f"{t:g}s" if t is not None else "N/A"
+            print(f"  Tau PL1/PL2: {fmt(tau1)} / {fmt(tau2)}")
+        zones = discover_rapl_zones()
+        for zone_id, limits in get_rapl_domain_limits().items():
+            if zones[zone_id]["name"] == "package":
+                continue
+            parts = [f"{c}={w}W" for c, w in limits.items() if w]
+            if parts:
+                print(f"  Limite {zones[zone_id]['name']} ({zone_id}): {', '.join(parts)}")
+        if not power:
+            if self.power_monitor.available:
+                print("  Potência: indisponível (energy_uj requer root)")
+            return
+        for name, watts in power.items():
+            print(f"  Potência {name}: {watts['now']:.1f}W (média {watts['avg']:.1f}W)")
+        package = power.get("package")
+        if package and pl1 is not None and package["avg"] >= pl1 * 0.95:
+            print(f"  -> Limitado pelo PL1 ({package['avg']:.0f}W >= {pl1}W)")
+        elif package and pl2 is not None and package["now"] >= pl2 * 0.95:
+            print(f"  -> Limitado pelo PL2 ({package['now']:.0f}W >= {pl2}W)")
+
+    def _cpu_power_config(self) -> Dict:
+        overrides = self.process_rules.overrides() or self.pressure_escalator.overrides()
+        if not overrides:
+            return self.config
+        return {**self.config, **overrides}
+
     def _get_cpu_power_state(self) -> tuple:
+        config = self._cpu_power_config()
         return (
-            self.config.get("cpu_governor"),
-            self.config.get("cpu_turbo_enabled"),
-            self.config.get("cpu_epp"),
-            self.config.get("cpu_platform_profile", ""),
-            self.config.get("cpu_rapl_pl1_w"),
-            self.config.get("cpu_rapl_pl2_w"),
-            self.config.get("cpu_max_freq_mhz"),
+            config.get("cpu_governor"),
+            config.get("cpu_turbo_enabled"),
+            config.get("cpu_epp"),
+            config.get("cpu_platform_profile", ""),
+            config.get("cpu_rapl_pl1_w"),
+            config.get("cpu_rapl_pl2_w"),
+            config.get("cpu_max_freq_mhz"),
+            config.get("cpu_rapl_pl1_tau_s"),
+            config.get("cpu_rapl_pl2_tau_s"),
+            json.dumps(config.get("cpu_rapl_domain_limits"), sort_keys=True),
+            json.dumps(config.get("cpu_cluster_max_freq_mhz"), sort_keys=True),
+            json.dumps(config.get("cpu_cluster_epp"), sort_keys=True),
         )
 
+    def _update_process_rules(self):
+        rules_key = json.dumps([
+            self.config.get("profile_rules"),
+            self.config.get("profile_rules_default"),
+            self.config.get("profile_rules_debounce_s"),
+        ], sort_keys=True)
+        if rules_key != self._rules_key:
+            self._rules_key = rules_key
+            self.process_rules.configure(self.config)
+            if self.process_rules.enabled:
+                print(f"Regras de processo: {len(self.process_rules.rules)} regra(s), "
+                      f"padrão={self.process_rules.default or 'config'}, via {self.process_rules.watcher.mode}")
+        if self.process_rules.update():
+            profile = self.process_rules.active_profile
+            if profile is None:
+                print("Regras de processo: nenhuma regra ativa, voltando ao perfil do config")
+            elif self.process_rules.match_reason:
+                print(f"Regras de processo: '{self.process_rules.match_reason}' -> {profile}")
+            else:
+                print(f"Regras de processo: nenhum processo casado -> {profile} (padrão)")
+
+    def _apply_power_source(self, config: Dict) -> Dict:
+        source = self.power_source.current if self.power_source else None
+        if source is None:
+            return config
+        if config is self._source_base and source == self._source_key:
+            return self._source_config
+        self._source_base, self._source_key = config, source
+        self._source_config = self._merge_power_source(config, source)
+        return self._source_config
+
+    def _merge_power_source(self, config: Dict, source: str) -> Dict:
+        profile = config["power_source_profiles"].get(source)
+        fan_config = config["power_source_fan_config"].get(source)
+        if not profile and not fan_config:
+            return config
+        merged = dict(config)
+        if profile:
+            merged.update(POWER_PROFILES[profile])
+        if fan_config:
+            merged.update(fan_config)
+        return self._sanitize_config(merged)
+
+    def _collect_state(self, speeds: Dict[str, int], fan_state: Optional[Dict]) -> Dict:
+        temps = self.last_temps
+        valid = [t for t in temps.values() if t is not None]
+        return {
+            "time": time.time(),
+            "config": self.file_config,
+            "temps": {"cpu": temps.get("cpu"), "gpu": temps.get("gpu"), "max": max(valid) if valid else None},
+            "fan_speeds": speeds,
+            "fan_state": fan_state,
+            "power": self.last_power,
+            "cpu_power": self.last_cpu_power_status,
+            "rule_profile": self.process_rules.active_profile,
+            "psi_profile": self.pressure_escalator.level,
+            "power_source": self.power_source.current if self.power_source else None,
+            "throttle": self.last_throttle,
+        }
+
+    def _status_request(self, request: Dict) -> Dict:
+        return {"status": self.last_status}
+
+    def status_json(self) -> Dict:
+        status = daemon_status()
+        if status:
+            return status
+        telemetry = read_telemetry() or {}
+        ac = read_ac_online()
+        return status_document(
+            "direct", self.config, self.monitor.get_cpu_gpu_temps(allow_spawn=False), self.monitor.get_fan_speeds(),
+            read_state(), get_cpu_power_status(), telemetry.get("power"),
+            None if ac is None else ("ac" if ac else "battery"), telemetry.get("throttle"),
+            telemetry.get("rule_profile"), telemetry.get("psi_profile"),
+        )
+
+    def _history_request(self, request: Dict) -> Dict:
+        return self.history.query(float(request.get("window_s", 3600)), int(request.get("points", HISTORY_POINTS)))
+
+    def _publish_state(self):
+        subscribed = self.control.has_subscribers
+        if self.last_temps is None:
+            self.last_temps = self.monitor.get_cpu_gpu_temps(allow_spawn=subscribed)
+        speeds = self.last_speeds = self.monitor.get_fan_speeds()
+        self.last_cpu_power_status = get_cpu_power_status()
+        fan_state = read_state()
+        self.history.record({
+            "cpu_temp": self.last_temps.get("cpu"),
+            "gpu_temp": self.last_temps.get("gpu"),
+            "fan1_rpm": speeds.get("fan1"),
+            "fan2_rpm": speeds.get("fan2"),
+            "cpu_duty": self.last_cpu if self.last_cpu >= 0 else None,
+            "gpu_duty": self.last_gpu if self.last_gpu >= 0 else None,
+            "package_w": (self.last_power.get("package") or {}).get("now"),
+        })
+        self.last_status = status_document(
+            "daemon", self.file_config, self.last_temps, speeds, fan_state, self.last_cpu_power_status,
+            self.last_power, self.power_source.current if self.power_source else None,
+            self.last_throttle, self.process_rules.active_profile, self.pressure_escalator.level,
+            (self.last_cpu if self.last_cpu >= 0 else None, self.last_gpu if self.last_gpu >= 0 else None),
+        )
+        if subscribed:
+            self.control.publish(self._collect_state(speeds, fan_state))
+
+    def _config_stat(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_ino, st.st_size
+
+    def _wake(self):
+        if self._wake_w is None:
+            return
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def _drain_wake(self):
+        try:
+            while os.read(self._wake_r, 64):
+                pass
+        except OSError:
+            pass
+
+    def _reload_request(self, request: Dict) -> Dict:
+        with self.reload_lock:
+            now = time.monotonic()
+            wait = self.last_reload_at + RELOAD_MIN_INTERVAL_S - now
+            if wait > 0:
+                raise RuntimeError(f"reload recente, tente novamente em {wait:.0f}s")
+            self.last_reload_at = now
+            self.reload_done.clear()
+            self.reload_requested = True
+        self._wake()
+        done = self.reload_done.wait(RELOAD_TIMEOUT_S)
+        if not done:
+            raise TimeoutError("reload não concluído")
+        if self.last_reload_error:
+            raise RuntimeError(self.last_reload_error)
+        return {"ms": self.last_reload_ms}
+
+    def _reload(self):
+        start = time.perf_counter()
+        self.reload_requested = False
+        self.last_reload_error = None
+        try:
+            self._config_key = self._config_stat()
+            self.file_config = self._load_config()
+            self.config = self._apply_power_source(self.file_config)
+            monitor, throttle_monitor = FanMonitor(), ThrottleMonitor()
+            self.throttle_monitor.close()
+            self.monitor, self.throttle_monitor = monitor, throttle_monitor
+            self.nekroctl_path = _find_nekroctl(self.config)
+            self.nekroctl_missing_logged = False
+            self._rules_key = None
+            self.arbiter.invalidate()
+            self.arbiter.submit(PLATFORM_SOURCE, None)
+            self.last_cpu_power = None
+            if self.nekroctl_path and self.last_cpu >= 0 and self.last_gpu >= 0:
+                if not set_fan_speed(self.nekroctl_path, self.last_cpu, self.last_gpu):
+                    self.fan_failures += 1
+            self.last_reload_ms = round((time.perf_counter() - start) * 1000, 1)
+            state = "boost ativo" if self.is_boosting else ("fixed offset" if self.is_fixed_offset_active else "auto")
+            print(f"Configuração recarregada em {self.last_reload_ms} ms ({state} preservado)")
+        except Exception as e:
+            self.last_reload_error = f"falha ao recarregar: {e}"
+            print(f"Erro ao recarregar configuração: {e}")
+        finally:
+            self.reload_done.set()
+
+    def _await_tick(self) -> list:
+        mark = self.arbiter.journal_seq
+        with self.tick_cond:
+            need = self.ticks_started + 1
+            self._wake()
+            if not self.tick_cond.wait_for(lambda: self.ticks_arbitrated >= need, TICK_TIMEOUT_S):
+                raise TimeoutError("daemon não concluiu o ciclo")
+        return self.arbiter.journal_since(mark)
+
+    def _apply_request(self, request: Dict) -> Dict:
+        self.arbiter.submit(PLATFORM_SOURCE, None)
+        self.next_power_check = 0.0
+        return {"written": self._await_tick()}
+
+    def _power_request(self, request: Dict) -> Dict:
+        return self.arbiter.describe()
+
+    def _power_intent_request(self, request: Dict) -> Dict:
+        source = request.get("source")
+        settings = request.get("settings")
+        priority = request.get("priority", PRIORITY_USER)
+        if not isinstance(source, str) or not source or source in (CONFIG_SOURCE, BUDGET_SOURCE, NOISE_CAP_SOURCE):
+            raise ValueError("source inválida")
+        if settings is not None and not isinstance(settings, dict):
+            raise ValueError("settings deve ser um objeto")
+        unknown = sorted(set(settings or {}) - set(CPU_POWER_KEYS))
+        if unknown:
+            raise ValueError(f"chaves não permitidas: {', '.join(unknown)}")
+        if not isinstance(priority, int) or not 0 <= priority <= PRIORITY_MAX:
+            raise ValueError(f"prioridade deve estar entre 0 e {PRIORITY_MAX}")
+        self.arbiter.submit(source, settings, priority)
+        return {"written": self._await_tick()}
+
+    def _apply_power(self):
+        written = self.arbiter.apply()
+        if written:
+            sources = sorted({entry["source"] for entry in written})
+            changes = ", ".join(f"{entry['key'][4:]}={entry['new']}" + ("" if entry["ok"] else " (falha)")
+                                for entry in written)
+            print(f"CPU Power [{'/'.join(sources)}]: {changes}")
+
+    def _modulate(self):
+        self.arbiter.submit(BUDGET_SOURCE, self.power_budget.settings(), PRIORITY_BUDGET)
+        self.arbiter.submit(NOISE_CAP_SOURCE, self.noise_cap.settings(), PRIORITY_NOISE_CAP)
+        if self.arbiter.dirty:
+            self._apply_power()
+
+    def _arbitrate(self):
+        self.arbiter.observe()
+        now = time.monotonic()
+        if self.arbiter.dirty or now >= self.next_power_check:
+            self.next_power_check = now + POWER_DRIFT_INTERVAL_S
+            self._apply_power()
+        with self.tick_cond:
+            self.ticks_arbitrated = self.ticks_started
+            self.tick_cond.notify_all()
+
+    def reload(self) -> bool:
+        reply = control_request("reload", timeout=RELOAD_TIMEOUT_S + 1)
+        if reply is not None:
+            if reply.get("ok"):
+                print(f"Configuração recarregada em {reply.get('ms')} ms")
+                return True
+            print(f"Erro: {reply.get('error')}")
+            return False
+        try:
+            with open(PID_FILE) as f:
+                pid = int(f.read().strip())
+            os.kill(pid, signal.SIGHUP)
+        except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError, OSError):
+            print("Erro: daemon não está rodando")
+            return False
+        print(f"SIGHUP enviado ao daemon (pid {pid})")
+        return True
+
+    def _wait(self, seconds: float):
+        self._publish_state()
+        if self.power_source is None:
+            time.sleep(seconds)
+            return
+        changed = self.power_source.wait(seconds, wake_fd=self._wake_r)
+        if self._wake_r is not None:
+            self._drain_wake()
+        if changed:
+            source = self.power_source.current
+            profile = self.config["power_source_profiles"].get(source)
+            label = "AC" if source == "ac" else "bateria"
+            print(f"Fonte de energia: {label}" + (f" -> perfil {profile}" if profile else ""))
+
+    def _update_pressure(self):
+        self.pressure_escalator.configure(self.config)
+        previous = self.pressure_escalator.level or self.pressure_escalator.base
+        target = self.pressure_escalator.update()
+        if target is not None:
+            cpu = self.pressure_escalator.pressure.get("cpu", {}).get("some_avg10", 0.0)
+            up = PROFILE_ORDER.index(target) > PROFILE_ORDER.index(previous)
+            direction = "escalando" if up else "reduzindo"
+            print(f"PSI cpu {cpu:.0f}%: {direction} para {target}")
+
+    def _update_throttle(self, temp: float) -> bool:
+        events = self.last_throttle.get("core_events", 0) + self.last_throttle.get("package_events", 0)
+        step = self.config.get("throttle_offset_step", 5)
+        now = time.monotonic()
+        if not self.config.get("throttle_boost", False) or events <= 0:
+            if self.throttle_extra and now >= self.throttle_until:
+                self.throttle_extra = max(0, self.throttle_extra - max(1, step))
+            return False
+        self.throttle_until = now + THROTTLE_HOLD_S
+        extra = min(self.config.get("throttle_offset_max", 20), self.throttle_extra + step)
+        if extra != self.throttle_extra:
+            print(f"[{temp:.0f}°C] Throttle térmico: {events} evento(s), "
+                  f"{self.last_throttle.get('throttled_ms', 0)} ms -> offset extra +{extra}%")
+        self.throttle_extra = extra
+        return True
+
+    def _record_scorecard(self):
+        now = time.monotonic()
+        util = self.cpu_sampler.utilization()
+        last, self.last_record = self.last_record, now
+        if last is None:
+            return
+        cpu_config = self._cpu_power_config()
+        profile = detect_power_profile(
+            cpu_config.get("cpu_governor"), cpu_config.get("cpu_turbo_enabled", True),
+            cpu_config.get("cpu_epp"), cpu_config.get("cpu_platform_profile") or "",
+        ) or "custom"
+        temp = self.monitor.get_cpu_temp()
+        if temp is not None and not MIN_SANE_TEMP <= temp <= MAX_SANE_TEMP:
+            temp = None
+        package = (self.last_power.get("package") or {}).get("now")
+        self.scorecard.record(profile, now - last, self.cpu_sampler.frequency_mhz(), util, package, temp)
+
+    def _stats_reset_request(self, request: Dict) -> Dict:
+        if not self.scorecard.reset():
+            raise OSError(f"não foi possível gravar {self.scorecard.path}")
+        return {}
+
+    def stats(self, as_json: bool = False, reset: bool = False) -> bool:
+        if reset:
+            reply = control_request("stats-reset")
+            if reply is not None and not reply.get("ok"):
+                print(f"Erro: {reply.get('error')}")
+                return False
+            if reply is None and not ProfileScorecard().reset():
+                print(f"Erro: não foi possível gravar {SCORECARD_FILE} (requer root)")
+                return False
+            print("Estatísticas por perfil zeradas")
+            return True
+        scorecard = ProfileScorecard()
+        summary = scorecard.summary()
+        if as_json:
+            print(json.dumps(summary, indent=2))
+            return True
+        if not summary:
+            print("Nenhuma estatística coletada ainda (o daemon registra enquanto roda)")
+            return True
+
+        def fmt(value, suffix=""):
+            return f"{value}{suffix}" if value is not None else "N/A"
+
+        order = {name: i for i, name in enumerate(PROFILE_ORDER)}
+        print(f"{'Perfil':<10} {'Tempo':>8} {'MHz':>6} {'Util':>6} {'W':>6} {'°C':>6} {'MHz/W':>7} {'°C/W':>6}")
+        for name, data in sorted(summary.items(), key=lambda kv: order.get(kv[0], len(order))):
+            print(f"{name:<10} {data['time_s'] / 60:>7.1f}m {fmt(data['avg_mhz']):>6} "
+                  f"{fmt(data['avg_util'], '%'):>6} {fmt(data['avg_w']):>6} {fmt(data['avg_temp']):>6} "
+                  f"{fmt(data['mhz_per_w']):>7} {fmt(data['c_per_w']):>6}")
+        for name, data in sorted(summary.items(), key=lambda kv: order.get(kv[0], len(order))):
+            residency = ", ".join(f"{bucket}+: {pct}%" for bucket, pct in data["freq_residency"].items())
+            if residency:
+                print(f"  {name} residência de frequência (MHz): {residency}")
+        return True
+
+    def power(self, source: Optional[str] = None, assignments: Optional[list] = None,
+              priority: int = PRIORITY_USER, as_json: bool = False) -> bool:
+        if source:
+            settings = {}
+            for assignment in assignments or []:
+                key, sep, raw = assignment.partition("=")
+                key = key if key.startswith("cpu_") else f"cpu_{key}"
+                if not sep:
+                    print(f"Erro: use CHAVE=VALOR ({assignment})")
+                    return False
+                try:
+                    settings[key] = json.loads(raw)
+                except json.JSONDecodeError:
+                    settings[key] = raw
+            reply = control_request("power-intent", timeout=TICK_TIMEOUT_S + 1, source=source,
+                                    settings=settings or None, priority=priority)
+        else:
+            reply = control_request("power")
+        if reply is None:
+            print("Erro: daemon não está rodando")
+            return False
+        if not reply.get("ok"):
+            print(f"Erro: {reply.get('error')}")
+            return False
+        if as_json:
+            print(json.dumps({key: value for key, value in reply.items() if key not in ("ok", "cmd")}, indent=2))
+            return True
+        if source:
+            for entry in reply.get("written", []):
+                print(f"{entry['key'][4:]}: {entry['old']} -> {entry['new']}" + ("" if entry["ok"] else " (falha)"))
+            if not reply.get("written"):
+                print("Nenhuma escrita necessária")
+            return True
+
+        print("Intenções:")
+        for name, intent in sorted(reply["intents"].items(), key=lambda kv: (-kv[1]["priority"], -kv[1]["seq"])):
+            settings = ", ".join(f"{key[4:]}={value}" for key, value in intent["settings"].items())
+            print(f"  {name:<10} prioridade {intent['priority']:>3} #{intent['seq']:<4} {settings}")
+        print("Alvo:")
+        for key, target in reply["target"].items():
+            print(f"  {key[4:]:<24} {str(target['value']):<20} ({target['source']})")
+        print("Escritas recentes:")
+        for entry in reply["journal"][-15:]:
+            stamp = time.strftime("%H:%M:%S", time.localtime(entry["time"]))
+            kind = "externo" if entry.get("external") else ("ok" if entry["ok"] else "falha")
+            print(f"  {stamp} {entry['source']:<10} {entry['key'][4:]:<24} {entry['old']} -> {entry['new']} ({kind})")
+        return True
+
+    def bench_profiles(self, profiles: Optional[str] = None, duration: Optional[float] = None,
+                       workers: Optional[int] = None, cooldown: Optional[float] = None,
+                       as_json: bool = False):
+        from profile_bench import run_profile_bench, parse_profiles, format_results, BENCH_DURATION_S, BENCH_COOLDOWN_S
+        duration = BENCH_DURATION_S if duration is None else duration
+        cooldown = BENCH_COOLDOWN_S if cooldown is None else cooldown
+        try:
+            names = parse_profiles(profiles)
+        except ValueError as e:
+            print(f"Erro: {e}")
+            sys.exit(1)
+        log = (lambda msg: print(msg, file=sys.stderr)) if as_json else print
+        apply = None
+        if control_request("ping") is not None:
+            log("Daemon ativo: perfis aplicados pelo arbiter (intenção 'bench')")
+
+            def apply(settings):
+                reply = control_request("power-intent", timeout=TICK_TIMEOUT_S + 1, source=BENCH_SOURCE,
+                                        settings=settings, priority=PRIORITY_MAX)
+                if reply is None or not reply.get("ok"):
+                    raise RuntimeError(reply.get("error") if reply else "daemon não respondeu")
+        try:
+            results = run_profile_bench(names, duration=duration, workers=workers,
+                                        cooldown=cooldown, log=log, apply=apply)
+        except RuntimeError as e:
+            print(f"Erro: {e}")
+            sys.exit(1)
+        log("Perfil original restaurado")
+        if as_json:
+            print(json.dumps(results, indent=2))
+        else:
+            print(format_results(results))
+
+    def bench(self, iterations: Optional[int] = None, fake: bool = False,
+              actuate: bool = False, only: Optional[str] = None, as_json: bool = False,
+              fake_cpus: int = 8):
+        global STATE_FILE, TELEMETRY_FILE
+        import tempfile
+        import bench
+        iterations = bench.BENCH_ITERATIONS if iterations is None else iterations
+        with tempfile.TemporaryDirectory(prefix="fan-aggressor-bench-") as tmp:
+            tmp = Path(tmp)
+            STATE_FILE = tmp / "state"
+            TELEMETRY_FILE = tmp / "telemetry"
+            monitor, nekroctl, config_path = self.monitor, self.nekroctl_path, self.config_path
+            if fake:
+                bench.use_fake_sysfs(tmp, cpus=fake_cpus)
+                nekroctl, nvidia_smi = bench.build_fake_actuators(tmp)
+                monitor = FanMonitor()
+                monitor._nvidia_smi = nvidia_smi
+                config_path = tmp / "config.json"
+                with open(config_path, "w") as f:
+                    json.dump(self.config, f)
+            aggressor = FanAggressor(config_path) if fake else self
+
+            cases = bench.sensor_cases(monitor)
+            if nekroctl:
+                cases.append(("nekroctl fan get", lambda: get_fan_speed(nekroctl), True))
+                if fake or actuate:
+                    cases.append(("nekroctl fan set", lambda: set_fan_speed(nekroctl, 40, 40), True))
+                    cases.append(("nekroctl fan auto", lambda: set_fan_auto(nekroctl), True))
+            cases += [
+                ("FanAggressor._load_config", aggressor._load_config, False),
+                ("write_state", lambda: write_state(True, 10, 10, 40, 40), False),
+                ("write_telemetry", lambda: write_telemetry({"time": time.time(), "power": {}}), False),
+                ("PowerMonitor.sample", aggressor.power_monitor.sample, False),
+                ("ThrottleMonitor.sample", aggressor.throttle_monitor.sample, False),
+            ]
+            results = bench.run_cases(cases, iterations, only)
+            daemon_running = not fake and control_request("ping") is not None
+            if not daemon_running:
+                results += bench.run_cpu_power_cases(iterations, only)
+            if nekroctl and actuate and not fake:
+                set_fan_auto(nekroctl)
+
+        if as_json:
+            print(json.dumps({"fake": fake, "results": results}, indent=2))
+        else:
+            if daemon_running:
+                print("Aviso: daemon ativo, setters de cpu_power omitidos para não competir com o arbiter; use --fake")
+            elif not fake and os.geteuid() != 0:
+                print("Aviso: sem root os setters de cpu_power falham cedo; use --fake ou sudo")
+            print(bench.format_results(results))
+
+    def _update_power_budget(self, cg_temps: Dict[str, Optional[float]]):
+        cpu_t = cg_temps.get("cpu")
+        if cpu_t is None:
+            _valid = [t for t in cg_temps.values() if t is not None]
+            cpu_t = max(_valid) if _valid else None
+        if cpu_t is not None and not MIN_SANE_TEMP <= cpu_t <= MAX_SANE_TEMP:
+            cpu_t = None
+        duty = None
+        if self.config.get("power_budget_mode") == "duty":
+            speeds = self.monitor.get_fan_speeds()
+            if speeds:
+                duty = max(rpm_to_duty(rpm) for rpm in speeds.values())
+        previous = self.power_budget.current_w
+        package = (self.last_power.get("package") or {}).get("now")
+        base_w = self.arbiter.base_value("cpu_rapl_pl1_w", PRIORITY_BUDGET)
+        new_w = self.power_budget.update(cpu_t, duty, package, base_w)
+        self._modulate()
+        if new_w is not None:
+            measured = f"{cpu_t:.0f}°C" if cpu_t is not None else "N/A"
+            if duty is not None:
+                measured += f", fan {duty}%"
+            print(f"[{measured}] Power budget: PL1 {previous}W -> {new_w}W "
+                  f"(alvo {self.power_budget.target:.0f}{'°C' if self.power_budget.mode == 'temp' else '%'})")
+
+    def _update_feedforward(self, temp: float, has_fixed: bool):
+        threshold = self.config.get("power_feedforward_w", 0)
+        package = (self.last_power.get("package") or {}).get("now")
+        now = time.monotonic()
+        if threshold <= 0 or package is None:
+            active = False
+        elif package >= threshold:
+            self.prespin_until = now + FEEDFORWARD_HOLD_S
+            active = True
+        elif self.is_prespinning and package >= threshold * FEEDFORWARD_RELEASE_RATIO:
+            self.prespin_until = now + FEEDFORWARD_HOLD_S
+            active = True
+        else:
+            active = now < self.prespin_until
+
+        if active and not self.is_prespinning:
+            speeds = self.monitor.get_fan_speeds()
+            current = max((rpm_to_duty(rpm) for rpm in speeds.values()), default=0)
+            self.prespin_duty = max(current, self.config.get("power_feedforward_duty", 50))
+            print(f"[{temp:.0f}°C] Pre-spin ATIVADO (pacote {package:.0f}W >= {threshold}W, fans {self.prespin_duty}%)")
+        elif not active and self.is_prespinning:
+            self.prespin_duty = 0
+            self.prespin_until = 0.0
+            if not has_fixed and self.last_cpu != -1:
+                set_fan_auto(self.nekroctl_path)
+                clear_state()
+                self.last_cpu = -1
+                self.last_gpu = -1
+            print(f"[{temp:.0f}°C] Pre-spin DESATIVADO, voltando ao {'fixed offset' if has_fixed else 'AUTO'}")
+        self.is_prespinning = active
+
+    def _apply_noise_cap(self, new_cpu: int, new_gpu: int, demand: Optional[int] = None,
+                         hot: bool = True, cool: bool = False) -> tuple:
+        if not self.noise_cap.enabled:
+            return new_cpu, new_gpu
+        if demand is None:
+            demand = max(new_cpu, new_gpu)
+        msg = self.noise_cap.update(demand, self.arbiter.base_value("cpu_max_freq_mhz", PRIORITY_NOISE_CAP),
+                                    self.arbiter.base_value("cpu_rapl_pl1_w", PRIORITY_NOISE_CAP),
+                                    adjust_pl1=not self.power_budget.active, hot=hot, cool=cool)
+        if msg:
+            print(msg)
+        self._modulate()
+        return self.noise_cap.clamp(new_cpu, new_gpu)
+
     def _acquire_pid_lock(self):
         self._pid_fd = os.open(PID_FILE, os.O_CREAT | os.O_RDWR, 0o644)
         try:
@@ -462,12 +1397,38 @@ class FanAggressor:
         print(f"CPU fixed offset: {self.config.get('cpu_fan_fixed_offset', 0)}%")
         print(f"GPU fixed offset: {self.config.get('gpu_fan_fixed_offset', 0)}%")
 
-        apply_cpu_power(self.config)
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._config_key = self._config_stat()
+        self.scorecard = ProfileScorecard()
+        if not self.control.start():
+            print(f"Aviso: socket de controle indisponível em {self.control.path}")
+        kb_guard = KeyboardGuard()
+        if kb_guard.start():
+            print("Teclado: restauração automática ao sair de low-power")
+        self.power_source = PowerSourceMonitor()
+        self.cpu_sampler = CpuSampler()
+        if self.power_source.current:
+            print(f"Fonte de energia: {'AC' if self.power_source.current == 'ac' else 'bateria'}")
+        self.config = self._apply_power_source(self.config)
+        self._update_process_rules()
+        self.arbiter.set_power_source(self.power_source.current)
+        self.arbiter.submit(CONFIG_SOURCE, config_settings(self._cpu_power_config()))
         self.last_cpu_power = self._get_cpu_power_state()
+        self._arbitrate()
         print(f"CPU Power: governor={self.config.get('cpu_governor')}, "
               f"turbo={'on' if self.config.get('cpu_turbo_enabled', True) else 'off'}, "
               f"epp={self.config.get('cpu_epp')}")
 
+        budget_mode = self.config.get("power_budget_mode", "off")
+        if 0 < self.config.get("fan_duty_cap", 0) < 100:
+            print(f"Noise cap: fans limitados a {self.config['fan_duty_cap']}%")
+        if budget_mode == "temp":
+            print(f"Power budget: alvo {self.config.get('power_budget_target_temp')}°C")
+        elif budget_mode == "duty":
+            print(f"Power budget: alvo fan {self.config.get('power_budget_target_duty')}%")
+
         if hybrid:
             print(f"Threshold engage: {self.config.get('temp_threshold_engage', 70)}°C")
             print(f"Threshold disengage: {self.config.get('temp_threshold_disengage', 65)}°C")
@@ -479,23 +1440,57 @@ class FanAggressor:
 
         signal.signal(signal.SIGTERM, self._signal_handler)
         signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGHUP, self._reload_handler)
 
         try:
             while self.running:
-                try:
-                    self.config = self._load_config()
-                except Exception:
-                    pass
+                self.ticks_started += 1
+                if self.reload_requested:
+                    self._reload()
+                else:
+                    config_key = self._config_stat()
+                    if config_key != self._config_key:
+                        self.arbiter.submit(PLATFORM_SOURCE, None)
+                    if config_key != self._config_key or config_key is None:
+                        self._config_key = config_key
+                        try:
+                            self.file_config = self._load_config()
+                        except Exception:
+                            pass
+                self.config = self._apply_power_source(self.file_config)
+                self.last_temps = None
                 self.nekroctl_path = _find_nekroctl(self.config)
                 hybrid = self.config.get('hybrid_mode', True)
 
+                self._update_process_rules()
+                self._update_pressure()
+                self.arbiter.set_power_source(self.power_source.current)
                 current_cpu_power = self._get_cpu_power_state()
                 if current_cpu_power != self.last_cpu_power:
-                    apply_cpu_power(self.config)
                     self.last_cpu_power = current_cpu_power
-                    print(f"CPU Power atualizado: governor={self.config.get('cpu_governor')}, "
-                          f"turbo={'on' if self.config.get('cpu_turbo_enabled', True) else 'off'}, "
-                          f"epp={self.config.get('cpu_epp')}")
+                    self.arbiter.submit(CONFIG_SOURCE, config_settings(self._cpu_power_config()))
+                self._arbitrate()
+
+                self.last_power = self.power_monitor.sample()
+                self.last_throttle = self.throttle_monitor.sample()
+                self._record_scorecard()
+                write_telemetry({
+                    "time": time.time(),
+                    "power": self.last_power,
+                    "rule_profile": self.process_rules.active_profile,
+                    "psi_profile": self.pressure_escalator.level,
+                    "power_source": self.power_source.current,
+                    "throttle": self.last_throttle,
+                    "pressure": self.pressure_escalator.pressure,
+                })
+
+                cg_temps = None
+                self.power_budget.configure(self._cpu_power_config())
+                self.noise_cap.configure(self.config)
+                self._modulate()
+                if self.config.get("power_budget_mode", "off") != "off":
+                    cg_temps = self.last_temps = self.monitor.get_cpu_gpu_temps()
+                    self._update_power_budget(cg_temps)
 
                 if not self.config["enabled"]:
                     if self.last_cpu != -1 or self.is_boosting:
@@ -506,19 +1501,21 @@ class FanAggressor:
                         self.last_gpu = -1
                         self.is_boosting = False
                         self.is_fixed_offset_active = False
+                        self.is_prespinning = False
                         self.fan_failures = 0
-                    time.sleep(1)
+                    self._wait(1)
                     continue
 
                 if not self.nekroctl_path:
                     if not self.nekroctl_missing_logged:
                         print("Erro: nekroctl não encontrado. Verifique 'nekroctl_path' no config ou variável NEKROCTL.")
                         self.nekroctl_missing_logged = True
-                    time.sleep(2)
+                    self._wait(2)
                     continue
                 self.nekroctl_missing_logged = False
 
-                cg_temps = self.monitor.get_cpu_gpu_temps()
+                if cg_temps is None:
+                    cg_temps = self.last_temps = self.monitor.get_cpu_gpu_temps()
                 _valid = [t for t in cg_temps.values() if t is not None]
                 temp = max(_valid) if _valid else None
                 if temp is None or temp < MIN_SANE_TEMP or temp > MAX_SANE_TEMP:
@@ -531,7 +1528,7 @@ class FanAggressor:
                         if not set_fan_auto(self.nekroctl_path):
                             print("Falha ao aplicar fail-safe AUTO")
                         clear_state()
-                    time.sleep(self.config["poll_interval"])
+                    self._wait(self.config["poll_interval"])
                     continue
                 cpu_offset = self.config["cpu_fan_offset"]
                 gpu_offset = self.config["gpu_fan_offset"]
@@ -545,7 +1542,10 @@ class FanAggressor:
                     gpu_fixed_offset = self.config.get("gpu_fan_fixed_offset", 0)
                     has_fixed = cpu_fixed_offset > 0 or gpu_fixed_offset > 0
 
-                    if not self.is_boosting and self.last_cpu != -1 and not has_fixed:
+                    if not self.is_boosting:
+                        self._update_feedforward(temp, has_fixed)
+
+                    if not self.is_boosting and self.last_cpu != -1 and not has_fixed and not self.is_prespinning:
                         set_fan_auto(self.nekroctl_path)
                         clear_state()
                         self.last_cpu = -1
@@ -553,7 +1553,8 @@ class FanAggressor:
                         self.is_fixed_offset_active = False
                         print("Fixed offset removido, voltando ao AUTO")
 
-                    if not self.is_boosting and temp >= threshold_engage:
+                    throttling = self._update_throttle(temp)
+                    if not self.is_boosting and (temp >= threshold_engage or throttling):
                         if self.is_fixed_offset_active:
                             self.snapshot_cpu = self.fixed_base_cpu
                             self.snapshot_gpu = self.fixed_base_gpu
@@ -564,12 +1565,16 @@ class FanAggressor:
                         self.snapshot_temp = temp
                         self.is_boosting = True
                         self.is_fixed_offset_active = False
+                        self.is_prespinning = False
+                        self.history.mark("engage")
                         cpu_t = cg_temps.get("cpu")
                         gpu_t = cg_temps.get("gpu")
                         temp_str = f"CPU {cpu_t:.0f}°C / GPU {gpu_t:.0f}°C" if cpu_t is not None and gpu_t is not None else f"{temp:.0f}°C"
                         print(f"[{temp_str}] Boost ATIVADO (base snapshot: CPU {self.snapshot_cpu}%, GPU {self.snapshot_gpu}%)")
-                    elif self.is_boosting and temp < threshold_disengage:
+                    elif self.is_boosting and temp < threshold_disengage and time.monotonic() >= self.throttle_until:
                         self.is_boosting = False
+                        self.history.mark("disengage")
+                        self.throttle_extra = 0
                         self.snapshot_cpu = 0
                         self.snapshot_gpu = 0
                         self.snapshot_temp = 0
@@ -584,11 +1589,13 @@ class FanAggressor:
                             print(f"[{temp_str}] Boost DESATIVADO, voltando ao fixed offset")
                         else:
                             print(f"[{temp_str}] Boost DESATIVADO, voltando ao AUTO")
-                        time.sleep(self.config["poll_interval"])
+                        self._wait(self.config["poll_interval"])
                         continue
                     if self.is_boosting:
-                        new_cpu = max(0, min(100, self.snapshot_cpu + cpu_offset))
-                        new_gpu = max(0, min(100, self.snapshot_gpu + gpu_offset))
+                        new_cpu = max(0, min(100, self.snapshot_cpu + cpu_offset + self.throttle_extra))
+                        new_gpu = max(0, min(100, self.snapshot_gpu + gpu_offset + self.throttle_extra))
+                        new_cpu, new_gpu = self._apply_noise_cap(
+                            new_cpu, new_gpu, hot=temp >= threshold_engage, cool=temp < threshold_disengage)
 
                         if new_cpu != self.last_cpu or new_gpu != self.last_gpu:
                             if set_fan_speed(self.nekroctl_path, new_cpu, new_gpu):
@@ -615,6 +1622,10 @@ class FanAggressor:
                         self.fixed_base_gpu = max(0, min(100, self.fixed_anchor_gpu + curve_delta))
                         new_cpu = max(0, min(100, self.fixed_base_cpu + cpu_fixed_offset))
                         new_gpu = max(0, min(100, self.fixed_base_gpu + gpu_fixed_offset))
+                        if self.is_prespinning:
+                            new_cpu = max(new_cpu, self.prespin_duty)
+                            new_gpu = max(new_gpu, self.prespin_duty)
+                        new_cpu, new_gpu = self._apply_noise_cap(new_cpu, new_gpu)
                         self.is_fixed_offset_active = True
                         if new_cpu != self.last_cpu or new_gpu != self.last_gpu:
                             if set_fan_speed(self.nekroctl_path, new_cpu, new_gpu):
@@ -629,13 +1640,31 @@ class FanAggressor:
                             else:
                                 self.fan_failures += 1
                                 print("Falha ao setar fans (fixed offset)")
+                    elif self.is_prespinning:
+                        new_cpu, new_gpu = self._apply_noise_cap(self.prespin_duty, self.prespin_duty)
+                        if new_cpu != self.last_cpu or new_gpu != self.last_gpu:
+                            if set_fan_speed(self.nekroctl_path, new_cpu, new_gpu):
+                                self.fan_failures = 0
+                                write_state(True, 0, 0, new_cpu, new_gpu, mode="prespin")
+                                self.last_cpu = new_cpu
+                                self.last_gpu = new_gpu
+                                print(f"[{temp:.0f}°C] Pre-spin: CPU {new_cpu}%, GPU {new_gpu}%")
+                            else:
+                                self.fan_failures += 1
+                                print("Falha ao setar fans (pre-spin)")
                     else:
-                        time.sleep(self.config["poll_interval"])
+                        if self.noise_cap.enabled:
+                            speeds = self.monitor.get_fan_speeds()
+                            measured = max((rpm_to_duty(rpm) for rpm in speeds.values()), default=None)
+                            self._apply_noise_cap(0, 0, demand=measured)
+                        self._wait(self.config["poll_interval"])
                         continue
                 else:
+                    self._update_throttle(temp)
                     base_duty = temp_to_duty(temp)
-                    new_cpu = max(0, min(100, base_duty + cpu_offset))
-                    new_gpu = max(0, min(100, base_duty + gpu_offset))
+                    new_cpu = max(0, min(100, base_duty + cpu_offset + self.throttle_extra))
+                    new_gpu = max(0, min(100, base_duty + gpu_offset + self.throttle_extra))
+                    new_cpu, new_gpu = self._apply_noise_cap(new_cpu, new_gpu)
 
                     if new_cpu != self.last_cpu or new_gpu != self.last_gpu:
                         if set_fan_speed(self.nekroctl_path, new_cpu, new_gpu):
@@ -655,22 +1684,40 @@ class FanAggressor:
                     self.last_gpu = -1
                     self.is_boosting = False
                     self.is_fixed_offset_active = False
-                    self.fixed_last_baseline_time = 0
+                    self.is_prespinning = False
                     self.fan_failures = 0
-                    time.sleep(5)
+                    self._wait(5)
                     continue
 
-                time.sleep(self.config["poll_interval"])
+                self._wait(self.config["poll_interval"])
 
         finally:
+            self.power_budget.release()
+            self.noise_cap.release()
+            self._modulate()
+            self.process_rules.stop()
+            self.power_source.close()
+            self.throttle_monitor.close()
+            self.control.stop()
+            kb_guard.stop()
+            self.scorecard.save()
             if self.nekroctl_path:
                 set_fan_auto(self.nekroctl_path)
             clear_state()
+            clear_telemetry()
             self._release_pid_lock()
+            for fd in (self._wake_r, self._wake_w):
+                os.close(fd)
+            self._wake_r = self._wake_w = None
             print("\nDaemon finalizado - modo auto restaurado")
 
     def _signal_handler(self, signum, frame):
         self.running = False
+        self._wake()
+
+    def _reload_handler(self, signum, frame):
+        self.reload_requested = True
+        self._wake()
 
 
 def main():
@@ -686,6 +1733,11 @@ Exemplos:
   fan_aggressor enable              Ativa controle
   fan_aggressor disable             Desativa (volta ao auto)
   fan_aggressor daemon              Inicia daemon (requer root)
+  fan_aggressor reload              Recarrega config sem reiniciar o daemon
+  fan_aggressor power               Intenções, alvo e escritas do árbitro de energia
+  fan_aggressor stats               Estatísticas por perfil de energia
+  fan_aggressor bench-profiles      Compara perfis com carga fixa (requer root)
+  fan_aggressor bench --fake        Micro-benchmarks dos caminhos de I/O
 
 MODO HIBRIDO (padrao):
   - Sistema fica em AUTO ate temperatura >= threshold_engage (70C)
@@ -719,10 +1771,38 @@ Config: /etc/fan-aggressor/config.json
 
     sub.add_parser("enable", help="Ativa controle")
     sub.add_parser("disable", help="Desativa controle")
-    sub.add_parser("status", help="Mostra status")
+    p_status = sub.add_parser("status", help="Mostra status")
+    p_status.add_argument("--json", action="store_true", help="Saída em JSON (esquema estável)")
     sub.add_parser("daemon", help="Executa daemon (root)")
+    sub.add_parser("reload", help="Recarrega config e backends do daemon sem reiniciar")
+    p_power = sub.add_parser("power", help="Mostra o árbitro de energia ou envia uma intenção (root)")
+    p_power.add_argument("--source", help="Nome da intenção a enviar (sem CHAVE=VALOR remove a intenção)")
+    p_power.add_argument("--priority", type=int, default=PRIORITY_USER, help="Prioridade da intenção (0-100)")
+    p_power.add_argument("--json", action="store_true", help="Saída em JSON")
+    p_power.add_argument("settings", nargs="*", metavar="CHAVE=VALOR", help="ex.: epp=power turbo_enabled=false")
+    p_bench = sub.add_parser("bench-profiles", help="Compara os perfis de energia com carga fixa (root)")
+    p_bench.add_argument("--profiles", help="Perfis separados por vírgula (padrão: todos)")
+    p_bench.add_argument("--duration", type=float, default=None, help="Segundos por perfil (padrão: 30)")
+    p_bench.add_argument("--workers", type=int, default=None, help="Processos de carga (padrão: nº de CPUs)")
+    p_bench.add_argument("--cooldown", type=float, default=None, help="Pausa entre perfis (s, padrão: 10)")
+    p_bench.add_argument("--json", action="store_true", help="Saída em JSON")
+    p_micro = sub.add_parser("bench", help="Mede latência e syscalls de cada caminho de I/O")
+    p_micro.add_argument("--iterations", type=int, default=None, help="Repetições por caminho (padrão: 200)")
+    p_micro.add_argument("--fake", action="store_true", help="Usa sysfs e atuadores falsos (sem root)")
+    p_micro.add_argument("--fake-cpus", type=int, default=8, help="CPUs da árvore falsa")
+    p_micro.add_argument("--actuate", action="store_true", help="Inclui nekroctl fan set/auto no hardware real")
+    p_micro.add_argument("--only", help="Roda apenas caminhos que contêm este texto")
+    p_micro.add_argument("--json", action="store_true", help="Saída em JSON")
+    p_stats = sub.add_parser("stats", help="Mostra estatísticas por perfil de energia")
+    p_stats.add_argument("--json", action="store_true", help="Saída em JSON")
+    p_stats.add_argument("--reset", action="store_true", help="Zera as estatísticas (root)")
 
     args = parser.parse_args()
+    if args.cmd == "status" and args.json:
+        status = daemon_status()
+        if status:
+            print(json.dumps(status, indent=2))
+            return
     aggressor = FanAggressor()
 
     if args.cmd == "set":
@@ -741,7 +1821,40 @@ Config: /etc/fan-aggressor/config.json
         print("Controle desativado")
 
     elif args.cmd == "status":
-        aggressor.status()
+        aggressor.status(as_json=args.json)
+
+    elif args.cmd == "stats":
+        if not aggressor.stats(as_json=args.json, reset=args.reset):
+            sys.exit(1)
+
+    elif args.cmd == "bench":
+        if args.iterations is not None and args.iterations <= 0:
+            print("Erro: iterations deve ser positivo")
+            sys.exit(1)
+        aggressor.bench(args.iterations, args.fake, args.actuate, args.only, args.json,
+                        max(1, args.fake_cpus))
+
+    elif args.cmd == "bench-profiles":
+        if os.geteuid() != 0:
+            print("Erro: bench-profiles requer root")
+            sys.exit(1)
+        if ((args.duration is not None and args.duration <= 0)
+                or (args.workers is not None and args.workers <= 0)):
+            print("Erro: duração e workers devem ser positivos")
+            sys.exit(1)
+        cooldown = None if args.cooldown is None else max(0.0, args.cooldown)
+        aggressor.bench_profiles(args.profiles, args.duration, args.workers, cooldown, args.json)
+
+    elif args.cmd == "reload":
+        if not aggressor.reload():
+            sys.exit(1)
+
+    elif args.cmd == "power":
+        if args.settings and not args.source:
+            print("Erro: CHAVE=VALOR requer --source")
+            sys.exit(1)
+        if not aggressor.power(args.source, args.settings, args.priority, args.json):
+            sys.exit(1)
 
     elif args.cmd == "daemon":
         if os.geteuid() != 0:
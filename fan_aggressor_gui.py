@@ -5,10 +5,12 @@ from __future__ import annotations
 import os
 import sys
 import json
+import select
 import subprocess
 import threading
+import time
 from pathlib import Path
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, List, NamedTuple
 
 for _p in [str(Path(__file__).parent), "/usr/local/lib/fan-aggressor"]:
     if _p not in sys.path:
@@ -26,37 +28,146 @@ except Exception as e:
     )
     raise
 
-from fan_monitor import FanMonitor, rpm_to_percent
+from fan_monitor import FanMonitor
+from power_monitor import PowerMonitor
+from control_socket import Subscription, request as control_request
+from history import HISTORY_POINTS
 from cpu_power import (
-    get_available_governors, get_current_governor,
-    get_available_epp, get_current_epp,
-    get_turbo_enabled, get_platform_profile,
+    get_available_governors, get_available_epp,
     set_governor, set_epp, set_turbo,
     get_rapl_pl1_watts, get_rapl_pl2_watts,
-    get_cpu_max_freq_mhz, get_cpu_hw_max_freq_mhz,
+    get_cpu_max_freq_mhz,
     set_rapl_pl1, set_rapl_pl2, set_cpu_max_freq,
-    save_kb_state, reset_kb_brightness, restore_kb_state,
+    set_rapl_time_window, set_rapl_domain_limits,
+    RAPL_LONG_TERM, RAPL_SHORT_TERM,
+    POWER_PROFILES, get_cpu_power_status,
     RAPL_PL1_MIN_W, RAPL_PL1_MAX_W,
     RAPL_PL2_MIN_W, RAPL_PL2_MAX_W,
-    CPU_FREQ_MIN_MHZ, CPU_FREQ_MAX_MHZ,
+    CPU_FREQ_MAX_MHZ,
 )
 
+DEFAULT_GOVERNORS = ["powersave", "performance"]
+DEFAULT_EPP = ["default", "performance", "balance_performance", "balance_power", "power"]
 FREQ_OPTIONS_MHZ = [800, 1200, 1600, 2000, 2400, 2800, 3200, 3600, 4000, 4400, 4800, 5100, 5300, 5500]
 
 CONFIG_FILE = Path("/etc/fan-aggressor/config.json")
 STATE_FILE = Path("/var/run/fan-aggressor.state")
+TELEMETRY_FILE = Path("/var/run/fan-aggressor.telemetry")
+TELEMETRY_MAX_AGE = 5
 PID_FILE = Path("/var/run/fan-aggressor.pid")
 HELPER = "/usr/local/lib/fan-aggressor/fan-aggressor-helper"
+HELPER_TIMEOUT_S = 15
+HELPER_AUTH_TIMEOUT_S = 120
+SAMPLE_MIN_S = 2.0
+SAMPLE_MAX_S = 10.0
+SAMPLE_BACKOFF = 1.5
+DAEMON_STALE_S = 10.0
+DAEMON_STALE_TICKS = 3
+HISTORY_REFRESH_MIN_S = 1.0
+COMMIT_QUIET_MS = 400
+COMMIT_CLOSE_TIMEOUT_S = 5.0
+RELOAD_TIMEOUT_S = 6.0
+APPLY_TIMEOUT_S = 6.0
+HISTORY_WINDOWS = [(60, "1 min"), (300, "5 min"), (900, "15 min"), (3600, "1 h"), (21600, "6 h"), (86400, "24 h")]
+CHART_HEIGHT = 90
+CHART_CPU_COLOR = (0.91, 0.36, 0.25)
+CHART_GPU_COLOR = (0.30, 0.60, 0.95)
+CHART_EVENT_COLORS = {"engage": (0.95, 0.60, 0.10), "disengage": (0.55, 0.55, 0.55)}
+
+
+class HelperSession:
+    def __init__(self, command: Optional[list] = None):
+        self.command = command or ["pkexec", HELPER, "serve"]
+        self.proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._buffer = b""
+
+    def _ensure(self) -> bool:
+        if self.proc is not None and self.proc.poll() is None:
+            return False
+        self._buffer = b""
+        self.proc = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, bufsize=1,
+        )
+        return True
 
+    def _readline(self, timeout: float) -> str:
+        deadline = time.monotonic() + timeout
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return ""
+            ready, _, _ = select.select([self.proc.stdout], [], [], remaining)
+            if not ready:
+                return ""
+            chunk = os.read(self.proc.stdout.fileno(), 65536)
+            if not chunk:
+                return ""
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line.decode(errors="replace") + "\n"
+
+    def _read_reply(self, request_id: int, timeout: float) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            line = self._readline(remaining)
+            if not line:
+                return None
+            try:
+                reply = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(reply, dict) and reply.get("id") == request_id:
+                return reply
+
+    def call(self, action: str, data: Any = None) -> Dict[str, Any]:
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                started = self._ensure()
+                self._next_id += 1
+                self.proc.stdin.write(json.dumps({"id": self._next_id, "action": action, "data": data}) + "\n")
+                self.proc.stdin.flush()
+                reply = self._read_reply(self._next_id, HELPER_AUTH_TIMEOUT_S if started else HELPER_TIMEOUT_S)
+            except (OSError, ValueError):
+                reply = None
+            if reply is None:
+                self._close(wait=False)
+                return {"ok": False, "action": action, "error": "helper unavailable or authentication refused"}
+            reply["rtt_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            return reply
+
+    def _close(self, wait: bool = True):
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        self._buffer = b""
+        for stream in (proc.stdin, proc.stdout):
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+        if wait:
+            try:
+                proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
 
-def run_helper(action: str, stdin_data: str = None, timeout: int = 15) -> subprocess.CompletedProcess:
-    return subprocess.run(
-        ["pkexec", HELPER, action],
-        input=stdin_data,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-    )
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+HELPER_SESSION = HelperSession()
+
+
+def run_helper(action: str, data: Any = None) -> Dict[str, Any]:
+    return HELPER_SESSION.call(action, data)
 
 
 def load_config() -> Dict[str, Any]:
@@ -78,8 +189,33 @@ def load_config() -> Dict[str, Any]:
         "cpu_rapl_pl1_w": None,
         "cpu_rapl_pl2_w": None,
         "cpu_max_freq_mhz": None,
+        "cpu_rapl_pl1_tau_s": None,
+        "cpu_rapl_pl2_tau_s": None,
+        "cpu_rapl_domain_limits": None,
+        "cpu_cluster_max_freq_mhz": None,
+        "cpu_cluster_epp": None,
         "cpu_fan_fixed_offset": 0,
-        "gpu_fan_fixed_offset": 0
+        "gpu_fan_fixed_offset": 0,
+        "power_budget_mode": "off",
+        "power_budget_target_temp": 85,
+        "power_budget_target_duty": 70,
+        "power_budget_max_w": None,
+        "fan_duty_cap": 0,
+        "power_feedforward_w": 0,
+        "power_feedforward_duty": 50,
+        "profile_rules": [],
+        "profile_rules_default": None,
+        "profile_rules_debounce_s": 3.0,
+        "psi_escalation": False,
+        "psi_escalate_pct": 40,
+        "psi_relax_pct": 10,
+        "psi_dwell_s": 30,
+        "psi_max_profile": "nitro",
+        "power_source_profiles": {},
+        "power_source_fan_config": {},
+        "throttle_boost": False,
+        "throttle_offset_step": 5,
+        "throttle_offset_max": 20
     }
     if CONFIG_FILE.exists():
         try:
@@ -105,15 +241,73 @@ def save_config(config: Dict[str, Any]) -> bool:
         return False
 
 
-def save_config_privileged(config: Dict[str, Any], callback: Callable[[bool], None]):
-    def _worker():
-        try:
-            proc = run_helper("save-config", json.dumps(config, indent=2))
-            GLib.idle_add(callback, proc.returncode == 0)
-        except Exception:
-            GLib.idle_add(callback, False)
+def apply_cpu_power_direct(config: Dict[str, Any]) -> bool:
+    gov = config.get("cpu_governor")
+    turbo = config.get("cpu_turbo_enabled", True)
+    epp = config.get("cpu_epp")
+    pp = config.get("cpu_platform_profile") or None
+    pl1 = config.get("cpu_rapl_pl1_w")
+    pl2 = config.get("cpu_rapl_pl2_w")
+    max_freq = config.get("cpu_max_freq_mhz")
+    pl1_tau = config.get("cpu_rapl_pl1_tau_s")
+    pl2_tau = config.get("cpu_rapl_pl2_tau_s")
+    domain_limits = config.get("cpu_rapl_domain_limits")
+    cluster_freq = config.get("cpu_cluster_max_freq_mhz") or {}
+    cluster_epp = config.get("cpu_cluster_epp") or {}
+
+    direct_ok = set_governor(gov) and set_turbo(turbo) and set_epp(epp, platform_profile=pp)
+    if pl1 is not None:
+        direct_ok = set_rapl_pl1(pl1) and direct_ok
+    if pl2 is not None:
+        direct_ok = set_rapl_pl2(pl2) and direct_ok
+    if max_freq is not None:
+        direct_ok = set_cpu_max_freq(max_freq) and direct_ok
+    if pl1_tau is not None:
+        direct_ok = set_rapl_time_window(pl1_tau, constraint=RAPL_LONG_TERM) and direct_ok
+    if pl2_tau is not None:
+        direct_ok = set_rapl_time_window(pl2_tau, constraint=RAPL_SHORT_TERM) and direct_ok
+    if domain_limits:
+        direct_ok = set_rapl_domain_limits(domain_limits) and direct_ok
+    for cluster, mhz in cluster_freq.items():
+        direct_ok = set_cpu_max_freq(mhz, cluster=cluster) and direct_ok
+    for cluster, pref in cluster_epp.items():
+        direct_ok = set_epp(pref, cluster=cluster) and direct_ok
+
+    return direct_ok
+
+
+def cpu_power_params(config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "governor": config.get("cpu_governor"),
+        "turbo": config.get("cpu_turbo_enabled", True),
+        "epp": config.get("cpu_epp"),
+        "platform_profile": config.get("cpu_platform_profile") or None,
+        "pl1_watts": config.get("cpu_rapl_pl1_w"),
+        "pl2_watts": config.get("cpu_rapl_pl2_w"),
+        "max_freq_mhz": config.get("cpu_max_freq_mhz"),
+        "pl1_tau_s": config.get("cpu_rapl_pl1_tau_s"),
+        "pl2_tau_s": config.get("cpu_rapl_pl2_tau_s"),
+        "domain_limits": config.get("cpu_rapl_domain_limits"),
+        "cluster_max_freq_mhz": config.get("cpu_cluster_max_freq_mhz") or {},
+        "cluster_epp": config.get("cpu_cluster_epp") or {},
+    }
 
-    threading.Thread(target=_worker, daemon=True).start()
+
+def commit(config: Dict[str, Any], cpu_power: bool = False) -> bool:
+    actions = []
+    if not save_config(config):
+        actions.append({"action": "save-config", "data": config})
+    daemon_applies = cpu_power and control_request("ping") is not None
+    if cpu_power and not daemon_applies and not apply_cpu_power_direct(config):
+        actions.append({"action": "apply-cpu-power", "data": cpu_power_params(config)})
+    if daemon_applies and os.geteuid() != 0:
+        actions.append({"action": "apply-daemon"})
+    if actions and not run_helper("batch", actions).get("ok"):
+        return False
+    if daemon_applies and os.geteuid() == 0:
+        reply = control_request("apply", timeout=APPLY_TIMEOUT_S)
+        return bool(reply and reply.get("ok"))
+    return True
 
 
 def get_state() -> Optional[Dict[str, Any]]:
@@ -130,6 +324,17 @@ def get_state() -> Optional[Dict[str, Any]]:
         return None
 
 
+def get_telemetry() -> Optional[Dict[str, Any]]:
+    try:
+        with open(TELEMETRY_FILE) as f:
+            telemetry = json.load(f)
+        if time.time() - telemetry.get("time", 0) > TELEMETRY_MAX_AGE:
+            return None
+        return telemetry
+    except (FileNotFoundError, json.JSONDecodeError, PermissionError, OSError, AttributeError):
+        return None
+
+
 def is_daemon_running() -> bool:
     if not PID_FILE.exists():
         return False
@@ -156,17 +361,419 @@ def get_service_status() -> str:
 def restart_service(callback: Callable[[bool, str], None]):
     def _worker():
         try:
-            proc = run_helper("restart-service")
-            if proc.returncode == 0:
+            reply = run_helper("restart-service")
+            if reply.get("ok"):
                 GLib.idle_add(callback, True, "Service restarted")
             else:
-                GLib.idle_add(callback, False, proc.stderr or "Failed to restart")
+                GLib.idle_add(callback, False, reply.get("error") or "Failed to restart")
         except Exception as e:
             GLib.idle_add(callback, False, str(e))
 
     threading.Thread(target=_worker, daemon=True).start()
 
 
+def reload_service(callback: Callable[[bool, str], None]):
+    def _worker():
+        reply = control_request("reload", timeout=RELOAD_TIMEOUT_S)
+        if reply is None:
+            GLib.idle_add(callback, False, "Daemon not reachable")
+        elif reply.get("ok"):
+            GLib.idle_add(callback, True, f"Reloaded in {reply.get('ms')} ms")
+        else:
+            GLib.idle_add(callback, False, reply.get("error") or "Failed to reload")
+
+    threading.Thread(target=_worker, daemon=True).start()
+
+
+class Snapshot(NamedTuple):
+    service_status: str
+    config: Dict[str, Any]
+    cpu_temp: Optional[float]
+    gpu_temp: Optional[float]
+    max_temp: Optional[float]
+    fan_speeds: Dict[str, int]
+    power: Optional[Dict[str, Any]]
+    state: Optional[Dict[str, Any]]
+    governors: List[str]
+    epps: List[str]
+    governor: Optional[str]
+    turbo: bool
+    epp: Optional[str]
+    hw_pl1: Optional[float]
+    hw_pl2: Optional[float]
+    hw_freq: int
+    platform_profile: Optional[str]
+    active_profile: Optional[str]
+
+
+def _snapshot(service_status: str, config: Dict[str, Any], temps: Dict[str, Optional[float]],
+              max_temp: Optional[float], fan_speeds: Dict[str, int], power: Optional[Dict[str, Any]],
+              state: Optional[Dict[str, Any]], cpu_power: Dict[str, Any]) -> Snapshot:
+    return Snapshot(
+        service_status=service_status,
+        config=config,
+        cpu_temp=temps.get("cpu"),
+        gpu_temp=temps.get("gpu"),
+        max_temp=max_temp,
+        fan_speeds=fan_speeds or {},
+        power=power,
+        state=state,
+        governors=cpu_power.get("governors") or DEFAULT_GOVERNORS,
+        epps=cpu_power.get("epps") or DEFAULT_EPP,
+        governor=cpu_power.get("governor"),
+        turbo=bool(cpu_power.get("turbo", True)),
+        epp=cpu_power.get("epp"),
+        hw_pl1=cpu_power.get("pl1_w"),
+        hw_pl2=cpu_power.get("pl2_w"),
+        hw_freq=cpu_power.get("max_freq_mhz") or CPU_FREQ_MAX_MHZ,
+        platform_profile=cpu_power.get("platform_profile"),
+        active_profile=cpu_power.get("profile"),
+    )
+
+
+def collect_snapshot(monitor: FanMonitor, power_monitor: PowerMonitor, config: Dict[str, Any]) -> Snapshot:
+    telemetry = get_telemetry()
+    return _snapshot(
+        get_service_status(), config, monitor.get_cpu_gpu_temps(), monitor.get_max_temp(),
+        monitor.get_fan_speeds(), telemetry.get("power") if telemetry else power_monitor.sample(),
+        get_state(), get_cpu_power_status(),
+    )
+
+
+def daemon_stale_timeout(config: Dict[str, Any]) -> float:
+    try:
+        interval = float(config.get("poll_interval", 1.0))
+    except (TypeError, ValueError):
+        interval = 1.0
+    return max(DAEMON_STALE_S, interval * DAEMON_STALE_TICKS)
+
+
+def snapshot_from_daemon(state: Dict[str, Any], config: Dict[str, Any]) -> Snapshot:
+    temps = state.get("temps") or {}
+    return _snapshot(
+        "active", config, temps, temps.get("max"),
+        state.get("fan_speeds"), state.get("power"), state.get("fan_state"), state.get("cpu_power") or {},
+    )
+
+
+class HistoryChart(Gtk.DrawingArea):
+    def __init__(self, title: str, unit: str, series: List[tuple], floor: Optional[float] = None,
+                 ceiling: Optional[float] = None):
+        super().__init__()
+        self.title = title
+        self.unit = unit
+        self.series = series
+        self.floor = floor
+        self.ceiling = ceiling
+        self.data: Optional[Dict[str, Any]] = None
+        self.set_content_height(CHART_HEIGHT)
+        self.set_hexpand(True)
+        self.set_draw_func(self._draw)
+
+    def set_data(self, data: Optional[Dict[str, Any]]):
+        self.data = data
+        self.queue_draw()
+
+    def _range(self) -> tuple:
+        values = []
+        for key, _, _ in self.series:
+            series = self.data["series"].get(key) or {}
+            values.extend(v for v in (series.get("min") or []) + (series.get("max") or []) if v is not None)
+        low = min(values + ([self.floor] if self.floor is not None else [])) if values or self.floor is not None else 0.0
+        high = max(values + ([self.ceiling] if self.ceiling is not None else [])) if values or self.ceiling is not None else 1.0
+        if high - low < 1:
+            high = low + 1
+        return low, high
+
+    def _draw(self, area, cr, width: int, height: int):
+        fg = self.get_color() if hasattr(self, "get_color") else self.get_style_context().get_color()
+        cr.set_font_size(10)
+        cr.set_source_rgba(fg.red, fg.green, fg.blue, 0.12)
+        cr.rectangle(0.5, 0.5, width - 1, height - 1)
+        cr.stroke()
+        cr.set_source_rgba(fg.red, fg.green, fg.blue, 0.8)
+        cr.move_to(6, 13)
+        cr.show_text(self.title)
+        x = 12 + cr.text_extents(self.title).x_advance
+        for _, label, color in self.series:
+            cr.set_source_rgb(*color)
+            cr.rectangle(x, 6, 8, 8)
+            cr.fill()
+            cr.set_source_rgba(fg.red, fg.green, fg.blue, 0.8)
+            cr.move_to(x + 11, 13)
+            cr.show_text(label)
+            x += 18 + cr.text_extents(label).x_advance
+
+        if not self.data:
+            cr.set_source_rgba(fg.red, fg.green, fg.blue, 0.5)
+            text = "No daemon history"
+            cr.move_to((width - cr.text_extents(text).width) / 2, height / 2 + 4)
+            cr.show_text(text)
+            return
+
+        low, high = self._range()
+        top, bottom = 18.0, height - 4.0
+
+        def y_of(value):
+            return bottom - (value - low) / (high - low) * (bottom - top)
+
+        span = max(1e-6, self.data["t1"] - self.data["t0"])
+        cr.set_line_width(1)
+        cr.set_dash([3, 3])
+        for t, event in self.data.get("events") or []:
+            ex = (t - self.data["t0"]) / span * width
+            cr.set_source_rgb(*CHART_EVENT_COLORS.get(event, CHART_EVENT_COLORS["disengage"]))
+            cr.move_to(ex, top)
+            cr.line_to(ex, bottom)
+            cr.stroke()
+        cr.set_dash([])
+
+        for key, _, color in self.series:
+            series = self.data["series"].get(key) or {}
+            lows, highs = series.get("min") or [], series.get("max") or []
+            count = len(highs)
+            if not count:
+                continue
+            step = width / count
+            segments, current = [], []
+            for i in range(count):
+                if highs[i] is None or lows[i] is None:
+                    if current:
+                        segments.append(current)
+                        current = []
+                    continue
+                current.append(((i + 0.5) * step, y_of(lows[i]), y_of(highs[i])))
+            if current:
+                segments.append(current)
+            for segment in segments:
+                cr.set_source_rgba(*color, 0.3)
+                cr.move_to(segment[0][0], segment[0][2])
+                for px, _, py in segment:
+                    cr.line_to(px, py)
+                for px, py, _ in reversed(segment):
+                    cr.line_to(px, py)
+                cr.close_path()
+                cr.fill()
+                cr.set_source_rgb(*color)
+                cr.set_line_width(1.5)
+                cr.move_to(segment[0][0], (segment[0][1] + segment[0][2]) / 2)
+                for px, py_low, py_high in segment:
+                    cr.line_to(px, (py_low + py_high) / 2)
+                cr.stroke()
+
+        cr.set_source_rgba(fg.red, fg.green, fg.blue, 0.6)
+        for value, ty in ((high, top + 9), (low, bottom - 2)):
+            text = f"{value:.0f} {self.unit}"
+            cr.move_to(width - cr.text_extents(text).x_advance - 6, ty)
+            cr.show_text(text)
+
+
+class SensorSampler:
+    def __init__(self, monitor: FanMonitor, power_monitor: PowerMonitor, callback: Callable[[Snapshot], bool],
+                 history_callback: Callable[[Optional[Dict[str, Any]]], bool]):
+        self.monitor = monitor
+        self.power_monitor = power_monitor
+        self.callback = callback
+        self.history_callback = history_callback
+        self.history_window = HISTORY_WINDOWS[0][0]
+        self._history_due = 0.0
+        self.interval = SAMPLE_MIN_S
+        self.live = False
+        self._active = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._subscription: Optional[Subscription] = None
+        self._stopped = False
+        self._config: Dict[str, Any] = {}
+        self._config_mtime: Optional[int] = None
+        self._thread = threading.Thread(target=self._loop, name="fan-aggressor-sampler", daemon=True)
+        self._thread.start()
+
+    def resume(self):
+        self.interval = SAMPLE_MIN_S
+        self._active.set()
+        self._wake.set()
+
+    def pause(self):
+        self._active.clear()
+        self._close_subscription()
+
+    def refresh(self):
+        self.interval = SAMPLE_MIN_S
+        self._wake.set()
+
+    def set_history_window(self, seconds: float):
+        self.history_window = seconds
+        self._history_due = 0.0
+        self._wake.set()
+
+    def shutdown(self):
+        self._stopped = True
+        self._active.set()
+        self._wake.set()
+        self._close_subscription()
+
+    def _close_subscription(self):
+        with self._lock:
+            subscription = self._subscription
+        if subscription is not None:
+            subscription.close()
+
+    def _load_config(self) -> Dict[str, Any]:
+        try:
+            mtime = CONFIG_FILE.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is None or mtime != self._config_mtime:
+            self._config = load_config()
+            self._config_mtime = mtime
+        return self._config
+
+    def _emit(self, snap: Snapshot):
+        if self._active.is_set() and not self._stopped:
+            GLib.idle_add(self.callback, snap)
+
+    def _fetch_history(self):
+        now = time.monotonic()
+        if now < self._history_due or not self._active.is_set():
+            return
+        window = self.history_window
+        self._history_due = now + max(HISTORY_REFRESH_MIN_S, window / HISTORY_POINTS)
+        reply = control_request("history", window_s=window, points=HISTORY_POINTS)
+        if reply and reply.get("ok") and window == self.history_window:
+            GLib.idle_add(self.history_callback, reply)
+
+    def _follow_daemon(self) -> bool:
+        try:
+            subscription = Subscription()
+        except (OSError, ConnectionError):
+            return False
+        with self._lock:
+            self._subscription = subscription
+        self.live = True
+        try:
+            config = self._load_config()
+            if subscription.state:
+                self._emit(snapshot_from_daemon(subscription.state, config))
+            self._history_due = 0.0
+            self._fetch_history()
+            subscription.settimeout(daemon_stale_timeout(config))
+            for state in subscription:
+                if not self._active.is_set() or self._stopped:
+                    break
+                config = self._load_config()
+                self._emit(snapshot_from_daemon(state, config))
+                subscription.settimeout(daemon_stale_timeout(config))
+                self._fetch_history()
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self._subscription = None
+            subscription.close()
+            self.live = False
+        return not self._active.is_set() or self._stopped
+
+    def _loop(self):
+        previous = None
+        while True:
+            self._active.wait()
+            if self._stopped:
+                return
+            if self._follow_daemon():
+                continue
+            try:
+                snap = collect_snapshot(self.monitor, self.power_monitor, self._load_config())
+            except Exception:
+                snap = None
+            if snap is not None:
+                self._emit(snap)
+                if self._active.is_set():
+                    GLib.idle_add(self.history_callback, None)
+                steady = previous is not None and snap._replace(power=None) == previous._replace(power=None)
+                self.interval = min(SAMPLE_MAX_S, self.interval * SAMPLE_BACKOFF) if steady else SAMPLE_MIN_S
+                previous = snap
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+class CommitPipeline:
+    def __init__(self, on_status: Callable[[str, Optional[float], int], bool]):
+        self.on_status = on_status
+        self._config: Optional[Dict[str, Any]] = None
+        self._cpu_power = False
+        self._edits = 0
+        self._last_edit = 0.0
+        self._timer_id = None
+        self._cond = threading.Condition()
+        self._job: Optional[tuple] = None
+        self._running = False
+        self._thread = threading.Thread(target=self._loop, name="fan-aggressor-commit", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        with self._cond:
+            return self._config is not None or self._job is not None or self._running
+
+    def schedule(self, config: Dict[str, Any], cpu_power: bool = False):
+        first = self._config is None
+        self._config = dict(config)
+        self._cpu_power = self._cpu_power or cpu_power
+        self._edits += 1
+        self._last_edit = time.monotonic()
+        if self._timer_id:
+            GLib.source_remove(self._timer_id)
+        self._timer_id = GLib.timeout_add(COMMIT_QUIET_MS, self._on_quiet)
+        if first:
+            self.on_status("pending", None, self._edits)
+
+    def _on_quiet(self) -> bool:
+        self._timer_id = None
+        self.flush()
+        return False
+
+    def flush(self):
+        if self._timer_id:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+        if self._config is None:
+            return
+        job = (self._config, self._cpu_power, self._edits, self._last_edit)
+        self._config, self._cpu_power, self._edits = None, False, 0
+        with self._cond:
+            if self._job is not None:
+                job = (job[0], job[1] or self._job[1], job[2] + self._job[2], job[3])
+            self._job = job
+            self._cond.notify_all()
+        self.on_status("applying", None, job[2])
+
+    def close(self, timeout: float = COMMIT_CLOSE_TIMEOUT_S):
+        self.flush()
+        with self._cond:
+            self._cond.wait_for(lambda: self._job is None and not self._running, timeout)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._job is not None)
+                config, cpu_power, edits, last_edit = self._job
+                self._job = None
+                self._running = True
+            try:
+                ok = commit(config, cpu_power)
+            except Exception as e:
+                sys.stderr.write(f"Commit failed: {e}\n")
+                ok = False
+            latency_ms = (time.monotonic() - last_edit) * 1000
+            with self._cond:
+                self._running = False
+                more = self._job is not None
+                self._cond.notify_all()
+            if not ok or not more:
+                GLib.idle_add(self.on_status, "applied" if ok else "failed", latency_ms, edits)
+
+
 class FanAggressorApp(Adw.Application):
     def __init__(self):
         super().__init__(
@@ -174,10 +781,13 @@ class FanAggressorApp(Adw.Application):
             flags=Gio.ApplicationFlags.FLAGS_NONE
         )
         self.monitor = FanMonitor()
+        self.power_monitor = PowerMonitor()
         self.config = load_config()
         self.updating = False
-        self.refresh_timeout_id = None
-        self._kb_restore_retries = 0
+        self.commits = CommitPipeline(self._on_commit_status)
+        self.sampler = SensorSampler(self.monitor, self.power_monitor, self._apply_snapshot, self._apply_history)
+        self.snapshot: Optional[Snapshot] = None
+        self.shown_config: Optional[Dict[str, Any]] = None
 
     def do_activate(self):
         win = self.props.active_window
@@ -201,6 +811,10 @@ class FanAggressorApp(Adw.Application):
 
         header = Adw.HeaderBar()
 
+        self.commit_label = Gtk.Label()
+        self.commit_label.add_css_class("dim-label")
+        header.pack_start(self.commit_label)
+
         refresh_btn = Gtk.Button(icon_name="view-refresh-symbolic")
         refresh_btn.set_tooltip_text("Refresh")
         refresh_btn.connect("clicked", lambda _: self._refresh_all())
@@ -229,6 +843,7 @@ class FanAggressorApp(Adw.Application):
         right_col = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
         self._build_cpu_power_group(right_col)
         self._build_power_profiles_group(right_col)
+        self._build_history_group(right_col)
         main_box.append(right_col)
 
         scroll.set_child(main_box)
@@ -236,16 +851,25 @@ class FanAggressorApp(Adw.Application):
         win.set_content(content)
 
         win.connect("close-request", self._on_close)
+        for prop in ("is-active", "visible", "suspended"):
+            if win.find_property(prop):
+                win.connect(f"notify::{prop}", self._on_window_state_changed)
 
         key_controller = Gtk.EventControllerKey()
         key_controller.connect("key-pressed", self._on_key_pressed)
         win.add_controller(key_controller)
 
-        self._refresh_all()
-        self.refresh_timeout_id = GLib.timeout_add(2000, self._auto_refresh)
+        self.sampler.resume()
 
         return win
 
+    def _on_window_state_changed(self, win, _):
+        suspended = win.find_property("suspended") and win.get_property("suspended")
+        if win.is_active() and win.get_visible() and not suspended:
+            self.sampler.resume()
+        else:
+            self.sampler.pause()
+
     def _on_key_pressed(self, controller, keyval, keycode, state):
         if keyval in (Gtk.accelerator_parse("q")[0], Gtk.accelerator_parse("Escape")[0]):
             self.props.active_window.close()
@@ -285,6 +909,12 @@ class FanAggressorApp(Adw.Application):
         self.fan_row.add_suffix(self.fan_label)
         group.add(self.fan_row)
 
+        self.power_row = Adw.ActionRow(title="Package Power")
+        self.power_label = Gtk.Label(xalign=1)
+        self.power_label.add_css_class("dim-label")
+        self.power_row.add_suffix(self.power_label)
+        group.add(self.power_row)
+
         self.boost_row = Adw.ActionRow(title="Boost Status")
         self.boost_label = Gtk.Label(xalign=1)
         self.boost_label.add_css_class("dim-label")
@@ -312,7 +942,10 @@ class FanAggressorApp(Adw.Application):
         self.hybrid_row.connect("notify::active", self._on_config_changed)
         group.add(self.hybrid_row)
 
-        restart_row = Adw.ActionRow(title="Restart Service")
+        restart_row = Adw.ActionRow(title="Service", subtitle="Reload re-reads config and backends without restarting")
+        reload_btn = Gtk.Button(label="Reload", valign=Gtk.Align.CENTER)
+        reload_btn.connect("clicked", self._on_reload_clicked)
+        restart_row.add_suffix(reload_btn)
         restart_btn = Gtk.Button(label="Restart", valign=Gtk.Align.CENTER)
         restart_btn.add_css_class("suggested-action")
         restart_btn.connect("clicked", self._on_restart_clicked)
@@ -412,13 +1045,13 @@ class FanAggressorApp(Adw.Application):
             title="CPU Power Management"
         )
 
-        self.governor_items = Gtk.StringList.new(get_available_governors() or ["powersave", "performance"])
+        self.governor_items = Gtk.StringList.new(get_available_governors() or DEFAULT_GOVERNORS)
         self.governor_row = Adw.ComboRow(
             title="Governor",
             model=self.governor_items
         )
         current_gov = self.config.get("cpu_governor", "powersave")
-        gov_list = get_available_governors() or ["powersave", "performance"]
+        gov_list = get_available_governors() or DEFAULT_GOVERNORS
         if current_gov in gov_list:
             self.governor_row.set_selected(gov_list.index(current_gov))
         self.governor_row.connect("notify::selected", self._on_cpu_power_changed)
@@ -432,10 +1065,7 @@ class FanAggressorApp(Adw.Application):
         self.turbo_row.connect("notify::active", self._on_cpu_power_changed)
         group.add(self.turbo_row)
 
-        epp_options = get_available_epp() or [
-            "default", "performance", "balance_performance",
-            "balance_power", "power"
-        ]
+        epp_options = get_available_epp() or DEFAULT_EPP
         self.epp_items = Gtk.StringList.new(epp_options)
         self.epp_row = Adw.ComboRow(
             title="Energy Performance",
@@ -494,29 +1124,15 @@ class FanAggressorApp(Adw.Application):
         self.profile_icons = {}
 
         profiles = [
-            ("deepsleep", "Deep Sleep", "Economia extrema, CPU no minimo absoluto",
-             {"cpu_governor": "powersave", "cpu_turbo_enabled": False, "cpu_epp": "power",
-              "cpu_platform_profile": "low-power",
-              "cpu_rapl_pl1_w": 15, "cpu_rapl_pl2_w": 20, "cpu_max_freq_mhz": 2000}),
-            ("stealth", "Stealth Mode", "Silencioso, sem turbo, economia total",
-             {"cpu_governor": "powersave", "cpu_turbo_enabled": False, "cpu_epp": "power",
-              "cpu_platform_profile": "",
-              "cpu_rapl_pl1_w": 25, "cpu_rapl_pl2_w": 35, "cpu_max_freq_mhz": 3200}),
-            ("cruise", "Cruise Control", "Equilibrado, turbo sob demanda",
-             {"cpu_governor": "powersave", "cpu_turbo_enabled": True, "cpu_epp": "balance_power",
-              "cpu_platform_profile": "",
-              "cpu_rapl_pl1_w": 45, "cpu_rapl_pl2_w": 65, "cpu_max_freq_mhz": 4400}),
-            ("boost", "Boost Drive", "Alta performance com eficiencia",
-             {"cpu_governor": "powersave", "cpu_turbo_enabled": True, "cpu_epp": "balance_performance",
-              "cpu_platform_profile": "",
-              "cpu_rapl_pl1_w": 65, "cpu_rapl_pl2_w": 100, "cpu_max_freq_mhz": 5300}),
-            ("nitro", "Nitro Overdrive", "Performance maxima, sem limites",
-             {"cpu_governor": "performance", "cpu_turbo_enabled": True, "cpu_epp": "performance",
-              "cpu_platform_profile": "",
-              "cpu_rapl_pl1_w": 125, "cpu_rapl_pl2_w": 157, "cpu_max_freq_mhz": 5500}),
+            ("deepsleep", "Deep Sleep", "Economia extrema, CPU no minimo absoluto"),
+            ("stealth", "Stealth Mode", "Silencioso, sem turbo, economia total"),
+            ("cruise", "Cruise Control", "Equilibrado, turbo sob demanda"),
+            ("boost", "Boost Drive", "Alta performance com eficiencia"),
+            ("nitro", "Nitro Overdrive", "Performance maxima, sem limites"),
         ]
 
-        for profile_id, title, subtitle, settings in profiles:
+        for profile_id, title, subtitle in profiles:
+            settings = POWER_PROFILES[profile_id]
             row = Adw.ActionRow(title=title, subtitle=subtitle)
 
             icon = Gtk.Image()
@@ -533,31 +1149,56 @@ class FanAggressorApp(Adw.Application):
             group.add(row)
 
         parent.append(group)
-        self._update_profile_indicator()
 
-    def _on_profile_clicked(self, button, profile_id, settings):
-        current_pp = get_platform_profile()
-        target_pp = settings.get("cpu_platform_profile", "")
+    def _build_history_group(self, parent: Gtk.Box):
+        group = Adw.PreferencesGroup(title="History")
 
-        entering_low_power = (target_pp == "low-power")
-        leaving_low_power = (current_pp == "low-power" and target_pp != "low-power")
+        self.history_window_row = Adw.ComboRow(
+            title="Window",
+            model=Gtk.StringList.new([label for _, label in HISTORY_WINDOWS])
+        )
+        self.history_window_row.connect("notify::selected", self._on_history_window_changed)
+        group.add(self.history_window_row)
+
+        self.history_charts = [
+            HistoryChart("Temperature", "°C", [("cpu_temp", "CPU", CHART_CPU_COLOR),
+                                               ("gpu_temp", "GPU", CHART_GPU_COLOR)], floor=30, ceiling=90),
+            HistoryChart("Fan Speed", "RPM", [("fan1_rpm", "CPU", CHART_CPU_COLOR),
+                                              ("fan2_rpm", "GPU", CHART_GPU_COLOR)], floor=0),
+            HistoryChart("Commanded Duty", "%", [("cpu_duty", "CPU", CHART_CPU_COLOR),
+                                                 ("gpu_duty", "GPU", CHART_GPU_COLOR)], floor=0, ceiling=100),
+            HistoryChart("Package Power", "W", [("package_w", "Package", CHART_CPU_COLOR)], floor=0),
+        ]
+        charts = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        charts.set_margin_top(6)
+        for chart in self.history_charts:
+            charts.append(chart)
+        group.add(charts)
 
-        if entering_low_power:
-            save_kb_state()
+        parent.append(group)
+
+    def _on_history_window_changed(self, row, _):
+        index = row.get_selected()
+        if 0 <= index < len(HISTORY_WINDOWS):
+            self.sampler.set_history_window(HISTORY_WINDOWS[index][0])
+
+    def _apply_history(self, history: Optional[Dict[str, Any]]) -> bool:
+        for chart in self.history_charts:
+            if history is not None or chart.data is not None:
+                chart.set_data(history)
+        return False
 
+    def _on_profile_clicked(self, button, profile_id, settings):
         self.updating = True
         for key, value in settings.items():
             self.config[key] = value
 
-        gov_list = get_available_governors() or ["powersave", "performance"]
+        gov_list = self.snapshot.governors if self.snapshot else DEFAULT_GOVERNORS
         gov = settings.get("cpu_governor", "powersave")
         if gov in gov_list:
             self.governor_row.set_selected(gov_list.index(gov))
         self.turbo_row.set_active(settings.get("cpu_turbo_enabled", True))
-        epp_list = get_available_epp() or [
-            "default", "performance", "balance_performance",
-            "balance_power", "power"
-        ]
+        epp_list = self.snapshot.epps if self.snapshot else DEFAULT_EPP
         epp = settings.get("cpu_epp", "balance_performance")
         if epp in epp_list:
             self.epp_row.set_selected(epp_list.index(epp))
@@ -575,51 +1216,9 @@ class FanAggressorApp(Adw.Application):
 
         self.updating = False
 
-        self._save_config()
-        self._apply_cpu_power()
-        self._update_profile_indicator()
-
-        if leaving_low_power:
-            self._schedule_kb_restore()
-
-    def _schedule_kb_restore(self):
-        self._kb_restore_retries = 0
-        GLib.timeout_add(800, self._try_restore_kb)
-
-    def _try_restore_kb(self):
-        self._kb_restore_retries += 1
-        if self._kb_restore_retries > 10:
-            return False
-        current_pp = get_platform_profile()
-        if current_pp == "low-power":
-            return True
-        reset_kb_brightness()
-        GLib.timeout_add(300, self._finish_restore_kb)
-        return False
-
-    def _finish_restore_kb(self):
-        restore_kb_state()
-        return False
-
-    def _update_profile_indicator(self):
-        current_gov = get_current_governor()
-        current_turbo = get_turbo_enabled()
-        current_epp = get_current_epp()
-        current_pp = get_platform_profile()
-
-        if current_gov == "powersave" and not current_turbo and current_epp == "power":
-            if current_pp == "low-power":
-                active = "deepsleep"
-            else:
-                active = "stealth"
-        else:
-            profile_map = {
-                ("powersave", True, "balance_power"): "cruise",
-                ("powersave", True, "balance_performance"): "boost",
-                ("performance", True, "performance"): "nitro",
-            }
-            active = profile_map.get((current_gov, current_turbo, current_epp))
+        self._save_config(cpu_power=True, immediate=True)
 
+    def _update_profile_indicator(self, active: Optional[str] = None):
         for pid, icon in self.profile_icons.items():
             btn = self.profile_buttons[pid]
             for css in ("success", "accent"):
@@ -641,10 +1240,6 @@ class FanAggressorApp(Adw.Application):
         if self.updating:
             return
 
-        leaving_low_power = (get_platform_profile() == "low-power")
-        if leaving_low_power:
-            save_kb_state()
-
         gov_idx = self.governor_row.get_selected()
         gov_item = self.governor_items.get_string(gov_idx)
         if gov_item:
@@ -673,49 +1268,7 @@ class FanAggressorApp(Adw.Application):
         if 0 <= freq_idx < len(FREQ_OPTIONS_MHZ):
             self.config["cpu_max_freq_mhz"] = FREQ_OPTIONS_MHZ[freq_idx]
 
-        self._save_config()
-        self._apply_cpu_power()
-        self._update_profile_indicator()
-
-        if leaving_low_power:
-            self._schedule_kb_restore()
-
-    def _apply_cpu_power(self):
-        gov = self.config.get("cpu_governor")
-        turbo = self.config.get("cpu_turbo_enabled", True)
-        epp = self.config.get("cpu_epp")
-        pp = self.config.get("cpu_platform_profile") or None
-        pl1 = self.config.get("cpu_rapl_pl1_w")
-        pl2 = self.config.get("cpu_rapl_pl2_w")
-        max_freq = self.config.get("cpu_max_freq_mhz")
-
-        direct_ok = set_governor(gov) and set_turbo(turbo) and set_epp(epp, platform_profile=pp)
-        if pl1 is not None:
-            direct_ok = set_rapl_pl1(pl1) and direct_ok
-        if pl2 is not None:
-            direct_ok = set_rapl_pl2(pl2) and direct_ok
-        if max_freq is not None:
-            direct_ok = set_cpu_max_freq(max_freq) and direct_ok
-
-        if direct_ok:
-            return
-
-        def _worker():
-            params = json.dumps({
-                "governor": gov,
-                "turbo": turbo,
-                "epp": epp,
-                "platform_profile": pp,
-                "pl1_watts": pl1,
-                "pl2_watts": pl2,
-                "max_freq_mhz": max_freq,
-            })
-            try:
-                run_helper("apply-cpu-power", params)
-            except Exception:
-                pass
-
-        threading.Thread(target=_worker, daemon=True).start()
+        self._save_config(cpu_power=True)
 
     def _sync_link_visibility(self):
         linked = self.link_offsets.get_active()
@@ -832,21 +1385,50 @@ class FanAggressorApp(Adw.Application):
 
         self._save_config()
 
-    def _save_config(self):
-        if save_config(self.config):
-            return
+    def _save_config(self, cpu_power: bool = False, immediate: bool = False):
+        self.commits.schedule(self.config, cpu_power)
+        if immediate:
+            self.commits.flush()
+
+    def _on_commit_status(self, status: str, latency_ms: Optional[float], edits: int) -> bool:
+        if status == "pending":
+            self.commit_label.set_text("Pending…")
+        elif status == "applying":
+            self.commit_label.set_text("Applying…")
+        elif status == "applied":
+            self.commit_label.set_text(f"Applied in {latency_ms:.0f} ms")
+            self.commit_label.set_tooltip_text(f"{edits} edit(s) coalesced into one commit")
+            self._refresh_all()
+        else:
+            self.commit_label.set_text("Apply failed")
+            dialog = Adw.MessageDialog(
+                transient_for=self.props.active_window,
+                heading="Error",
+                body="Failed to save configuration. Check PolicyKit authentication or file permissions."
+            )
+            dialog.add_response("ok", "OK")
+            dialog.present()
+        return False
+
+    def _on_reload_clicked(self, button):
+        button.set_sensitive(False)
+        button.set_label("Reloading...")
 
-        def on_saved(success):
+        def on_done(success, msg):
+            button.set_sensitive(True)
+            button.set_label("Reload")
+            self.commit_label.set_text(msg)
+            self.sampler.refresh()
             if not success:
                 dialog = Adw.MessageDialog(
                     transient_for=self.props.active_window,
-                    heading="Error",
-                    body="Failed to save configuration. Check PolicyKit authentication or file permissions."
+                    heading="Reload Failed",
+                    body=f"Could not reload service: {msg}"
                 )
                 dialog.add_response("ok", "OK")
                 dialog.present()
 
-        save_config_privileged(self.config, on_saved)
+        reload_service(on_done)
 
     def _on_restart_clicked(self, button):
         button.set_sensitive(False)
@@ -868,151 +1450,135 @@ class FanAggressorApp(Adw.Application):
         restart_service(on_done)
 
     def _refresh_all(self):
-        status = self._cached_service_status if hasattr(self, '_cached_service_status') else "unknown"
+        self.sampler.refresh()
 
-        def _fetch_status():
-            result = get_service_status()
-            GLib.idle_add(self._update_service_status_label, result)
+    def _set_text(self, label: Gtk.Label, text: str):
+        if label.get_text() != text:
+            label.set_text(text)
 
-        threading.Thread(target=_fetch_status, daemon=True).start()
+    def _set_css(self, widget: Gtk.Widget, add: str, remove: str):
+        if widget.has_css_class(remove):
+            widget.remove_css_class(remove)
+        if not widget.has_css_class(add):
+            widget.add_css_class(add)
 
-        if status == "active":
-            self.status_label.set_text("Running")
-            self.status_label.remove_css_class("error")
-            self.status_label.add_css_class("success")
-        else:
-            self.status_label.set_text("Stopped")
-            self.status_label.add_css_class("error")
-            self.status_label.remove_css_class("success")
+    def _set_active(self, row, active: bool):
+        if row.get_active() != active:
+            self.updating = True
+            row.set_active(active)
+            self.updating = False
 
-        self.config = load_config()
-        self.updating = True
-        self.enabled_row.set_active(self.config.get("enabled", False))
-        self.hybrid_row.set_active(self.config.get("hybrid_mode", True))
-        self.cpu_offset_row.set_value(self.config.get("cpu_fan_offset", 0))
-        self.gpu_offset_row.set_value(self.config.get("gpu_fan_offset", 0))
-        self.engage_row.set_value(self.config.get("temp_threshold_engage", 70))
-        self.disengage_row.set_value(self.config.get("temp_threshold_disengage", 65))
-        self.link_offsets.set_active(self.config.get("link_offsets", True))
-        self.cpu_fixed_offset_row.set_value(self.config.get("cpu_fan_fixed_offset", 0))
-        self.gpu_fixed_offset_row.set_value(self.config.get("gpu_fan_fixed_offset", 0))
+    def _set_value(self, row: Adw.SpinRow, value: float):
+        if row.get_value() != value:
+            self.updating = True
+            row.set_value(value)
+            self.updating = False
 
-        gov_list = get_available_governors() or ["powersave", "performance"]
-        config_gov = self.config.get("cpu_governor", "powersave")
-        if config_gov in gov_list:
-            self.governor_row.set_selected(gov_list.index(config_gov))
-        self.turbo_row.set_active(self.config.get("cpu_turbo_enabled", True))
-        epp_list = get_available_epp() or [
-            "default", "performance", "balance_performance",
-            "balance_power", "power"
-        ]
-        config_epp = self.config.get("cpu_epp", "balance_performance")
-        if config_epp in epp_list:
-            self.epp_row.set_selected(epp_list.index(config_epp))
+    def _set_selected(self, row: Adw.ComboRow, index: int):
+        if row.get_selected() != index:
+            self.updating = True
+            row.set_selected(index)
+            self.updating = False
 
-        self.updating = False
-        self._sync_link_visibility()
+    def _apply_snapshot(self, snap: Snapshot) -> bool:
+        previous, self.snapshot = self.snapshot, snap
+        if snap == previous:
+            return False
 
-        if self.config.get("hybrid_mode", True):
-            self.mode_label.set_text("Hybrid (temp-based)")
+        if snap.service_status == "active":
+            self._set_text(self.status_label, "Running")
+            self._set_css(self.status_label, "success", "error")
+        else:
+            self._set_text(self.status_label, "Stopped")
+            self._set_css(self.status_label, "error", "success")
+
+        editing = self.commits.busy
+        if not editing and snap.config != self.shown_config:
+            self.shown_config = snap.config
+            self.config = dict(snap.config)
+            self._set_active(self.enabled_row, self.config.get("enabled", False))
+            self._set_active(self.hybrid_row, self.config.get("hybrid_mode", True))
+            self._set_value(self.cpu_offset_row, self.config.get("cpu_fan_offset", 0))
+            self._set_value(self.gpu_offset_row, self.config.get("gpu_fan_offset", 0))
+            self._set_value(self.engage_row, self.config.get("temp_threshold_engage", 70))
+            self._set_value(self.disengage_row, self.config.get("temp_threshold_disengage", 65))
+            self._set_active(self.link_offsets, self.config.get("link_offsets", True))
+            self._set_value(self.cpu_fixed_offset_row, self.config.get("cpu_fan_fixed_offset", 0))
+            self._set_value(self.gpu_fixed_offset_row, self.config.get("gpu_fan_fixed_offset", 0))
+            self._sync_link_visibility()
+            self._set_text(self.mode_label, "Hybrid (temp-based)" if self.config.get("hybrid_mode", True) else "Fixed Curve")
+
+        if snap.cpu_temp is not None:
+            self._set_text(self.temp_label, f"{snap.cpu_temp:.0f}°C")
+        elif snap.max_temp is not None:
+            self._set_text(self.temp_label, f"{snap.max_temp:.0f}°C")
         else:
-            self.mode_label.set_text("Fixed Curve")
-
-        cg = self.monitor.get_cpu_gpu_temps()
-        cpu_t = cg["cpu"]
-        gpu_t = cg["gpu"]
-        temp = self.monitor.get_max_temp()
-        if cpu_t is not None:
-            self.temp_label.set_text(f"{cpu_t:.0f}°C")
-        elif temp is not None:
-            self.temp_label.set_text(f"{temp:.0f}°C")
+            self._set_text(self.temp_label, "N/A")
+        self._set_text(self.gpu_temp_label, f"{snap.gpu_temp:.0f}°C" if snap.gpu_temp is not None else "N/A")
+
+        if snap.fan_speeds:
+            fan1 = snap.fan_speeds.get('fan1', 0)
+            fan2 = snap.fan_speeds.get('fan2', 0)
+            self._set_text(self.fan_label, f"CPU: {fan1} RPM | GPU: {fan2} RPM")
         else:
-            self.temp_label.set_text("N/A")
-        self.gpu_temp_label.set_text(f"{gpu_t:.0f}°C" if gpu_t is not None else "N/A")
-
-        speeds = self.monitor.get_fan_speeds()
-        if speeds:
-            fan1 = speeds.get('fan1', 0)
-            fan2 = speeds.get('fan2', 0)
-            p1 = rpm_to_percent(fan1)
-            p2 = rpm_to_percent(fan2)
-            self.fan_label.set_text(f"CPU: {fan1} RPM | GPU: {fan2} RPM")
+            self._set_text(self.fan_label, "N/A")
+
+        package = snap.power.get("package") if snap.power else None
+        if package:
+            text = f"{package['now']:.1f} W (avg {package['avg']:.1f} W)"
+            core = snap.power.get("core")
+            if core:
+                text += f" | core {core['now']:.1f} W"
+            if snap.hw_pl1 is not None and package["avg"] >= snap.hw_pl1 * 0.95:
+                text += " | PL1 limit"
+            self._set_text(self.power_label, text)
         else:
-            self.fan_label.set_text("N/A")
+            self._set_text(self.power_label, "N/A")
 
-        state = get_state()
+        state = snap.state
         if state and state.get("active"):
             mode = state.get("mode", "boost")
             offset = state.get("cpu_offset", 0)
             base = state.get("base_cpu", 0)
             total = min(100, base + offset)
             if mode == "fixed":
-                self.boost_label.set_text(f"Curve base {base}% + fixed {offset}% = {total}%")
+                self._set_text(self.boost_label, f"Curve base {base}% + fixed {offset}% = {total}%")
+            elif mode == "prespin":
+                self._set_text(self.boost_label, f"Pre-spin {base}% (power feed-forward)")
             else:
-                self.boost_label.set_text(f"Active: base {base}% + offset {offset}% = {total}%")
-            self.boost_label.remove_css_class("dim-label")
-            self.boost_label.add_css_class("accent")
+                self._set_text(self.boost_label, f"Active: base {base}% + offset {offset}% = {total}%")
+            self._set_css(self.boost_label, "accent", "dim-label")
         else:
             engage = self.config.get("temp_threshold_engage", 70)
-            if temp is None:
-                self.boost_label.set_text("Inactive (temp N/A)")
-            elif temp < engage:
-                self.boost_label.set_text(f"Inactive (temp < {engage}°C)")
+            if snap.max_temp is None:
+                self._set_text(self.boost_label, "Inactive (temp N/A)")
+            elif snap.max_temp < engage:
+                self._set_text(self.boost_label, f"Inactive (temp < {engage}°C)")
             else:
-                self.boost_label.set_text("Waiting...")
-            self.boost_label.remove_css_class("accent")
-            self.boost_label.add_css_class("dim-label")
-
-        current_gov = get_current_governor()
-        current_turbo = get_turbo_enabled()
-        current_epp = get_current_epp()
-
-        self.updating = True
-        gov_list = get_available_governors() or ["powersave", "performance"]
-        if current_gov in gov_list:
-            self.governor_row.set_selected(gov_list.index(current_gov))
-        self.turbo_row.set_active(current_turbo)
-        epp_list = get_available_epp() or [
-            "default", "performance", "balance_performance",
-            "balance_power", "power"
-        ]
-        if current_epp in epp_list:
-            self.epp_row.set_selected(epp_list.index(current_epp))
-
-        hw_pl1 = get_rapl_pl1_watts()
-        self.pl1_row.set_value(hw_pl1 if hw_pl1 is not None else RAPL_PL1_MAX_W)
-
-        hw_pl2 = get_rapl_pl2_watts()
-        self.pl2_row.set_value(hw_pl2 if hw_pl2 is not None else 157)
-
-        hw_freq = get_cpu_max_freq_mhz() or CPU_FREQ_MAX_MHZ
-        closest_idx = min(range(len(FREQ_OPTIONS_MHZ)), key=lambda i: abs(FREQ_OPTIONS_MHZ[i] - hw_freq))
-        self.freq_row.set_selected(closest_idx)
-
-        self.updating = False
-
-        self._update_profile_indicator()
-
-    def _update_service_status_label(self, status: str):
-        self._cached_service_status = status
-        if status == "active":
-            self.status_label.set_text("Running")
-            self.status_label.remove_css_class("error")
-            self.status_label.add_css_class("success")
-        else:
-            self.status_label.set_text("Stopped")
-            self.status_label.add_css_class("error")
-            self.status_label.remove_css_class("success")
-
-    def _auto_refresh(self) -> bool:
-        if self.props.active_window:
-            self._refresh_all()
-        return True
+                self._set_text(self.boost_label, "Waiting...")
+            self._set_css(self.boost_label, "dim-label", "accent")
+
+        if not editing:
+            current_gov = snap.governor if snap.governor in snap.governors else self.config.get("cpu_governor", "powersave")
+            if current_gov in snap.governors:
+                self._set_selected(self.governor_row, snap.governors.index(current_gov))
+            self._set_active(self.turbo_row, snap.turbo)
+            current_epp = snap.epp if snap.epp in snap.epps else self.config.get("cpu_epp", "balance_performance")
+            if current_epp in snap.epps:
+                self._set_selected(self.epp_row, snap.epps.index(current_epp))
+            self._set_value(self.pl1_row, snap.hw_pl1 if snap.hw_pl1 is not None else RAPL_PL1_MAX_W)
+            self._set_value(self.pl2_row, snap.hw_pl2 if snap.hw_pl2 is not None else 157)
+            closest_idx = min(range(len(FREQ_OPTIONS_MHZ)), key=lambda i: abs(FREQ_OPTIONS_MHZ[i] - snap.hw_freq))
+            self._set_selected(self.freq_row, closest_idx)
+
+        if previous is None or snap.active_profile != previous.active_profile:
+            self._update_profile_indicator(snap.active_profile)
+        return False
 
     def _on_close(self, window):
-        if self.refresh_timeout_id:
-            GLib.source_remove(self.refresh_timeout_id)
-            self.refresh_timeout_id = None
+        self.sampler.shutdown()
+        self.commits.close()
+        HELPER_SESSION.close()
         return False
 
 
@@ -1,15 +1,24 @@
 #!/usr/bin/env python3
 
+import os
 import shutil
 import subprocess
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+from sysfs import resolve
 
 FAN_RPM_MIN = 0
 FAN_RPM_MAX = 7500
 
 NVIDIA_SMI_TIMEOUT = 2
 
+HWMON_BASE = "/sys/class/hwmon"
+CPU_BASE = Path("/sys/devices/system/cpu")
+THROTTLE_COUNTERS = ("core_throttle_count", "core_throttle_total_time_ms",
+                     "package_throttle_count", "package_throttle_total_time_ms")
+
 
 class FanMonitor:
     def __init__(self):
@@ -19,7 +28,7 @@ class FanMonitor:
         self._find_hwmon_devices()
 
     def _find_hwmon_devices(self):
-        hwmon_base = Path("/sys/class/hwmon")
+        hwmon_base = Path(resolve(HWMON_BASE))
         if not hwmon_base.exists():
             return
         for device in hwmon_base.iterdir():
@@ -85,7 +94,7 @@ class FanMonitor:
             pass
         return None
 
-    def get_cpu_gpu_temps(self) -> Dict[str, Optional[float]]:
+    def get_cpu_gpu_temps(self, allow_spawn: bool = True) -> Dict[str, Optional[float]]:
         temps = self.get_temps()
         cpu_temp = temps.get("temp1")
         if cpu_temp is None and not self.hwmon_path and temps:
@@ -93,15 +102,108 @@ class FanMonitor:
 
         gpu_temp = temps.get("temp2")
         if gpu_temp is None or gpu_temp <= 0:
-            gpu_temp = self._get_nvidia_gpu_temp()
+            gpu_temp = self._get_nvidia_gpu_temp() if allow_spawn else None
 
         return {"cpu": cpu_temp, "gpu": gpu_temp}
 
+    def get_cpu_temp(self) -> Optional[float]:
+        temps = self.get_temps()
+        cpu_temp = temps.get("temp1")
+        if cpu_temp is None and not self.hwmon_path and temps:
+            cpu_temp = max(temps.values())
+        return cpu_temp
+
     def get_max_temp(self) -> Optional[float]:
         temps = self.get_temps()
         return max(temps.values()) if temps else None
 
 
+class ThrottleMonitor:
+    def __init__(self):
+        self._fds: Dict[str, List[int]] = {name: [] for name in THROTTLE_COUNTERS}
+        self._last: Optional[tuple] = None
+        self._open_counters()
+
+    def _open_counters(self):
+        seen_cores = set()
+        seen_packages = set()
+        cpu_base = Path(resolve(CPU_BASE))
+        for cpu_dir in sorted(cpu_base.glob("cpu[0-9]*"), key=lambda p: int(p.name[3:])):
+            throttle = cpu_dir / "thermal_throttle"
+            if not throttle.is_dir():
+                continue
+            topology = cpu_dir / "topology"
+            package = self._read_id(topology / "physical_package_id")
+            core = (package, self._read_id(topology / "core_id"))
+            for name in THROTTLE_COUNTERS:
+                if name.startswith("package"):
+                    if package in seen_packages:
+                        continue
+                elif core in seen_cores:
+                    continue
+                try:
+                    self._fds[name].append(os.open(throttle / name, os.O_RDONLY))
+                except OSError:
+                    pass
+            seen_cores.add(core)
+            seen_packages.add(package)
+
+    @staticmethod
+    def _read_id(path: Path) -> str:
+        try:
+            return path.read_text().strip()
+        except (FileNotFoundError, PermissionError, OSError):
+            return ""
+
+    @property
+    def available(self) -> bool:
+        return any(self._fds.values())
+
+    def _read_counters(self) -> Dict[str, List[int]]:
+        values = {}
+        for name, fds in self._fds.items():
+            values[name] = []
+            for fd in fds:
+                try:
+                    values[name].append(int(os.pread(fd, 32, 0)))
+                except (ValueError, OSError):
+                    values[name].append(0)
+        return values
+
+    def sample(self) -> Dict[str, float]:
+        if not self.available:
+            return {}
+        now = time.monotonic()
+        values = self._read_counters()
+        last, self._last = self._last, (now, values)
+        if last is None:
+            return {"events_per_s": 0.0, "throttled_ms": 0, "core_events": 0, "package_events": 0}
+        dt = max(now - last[0], 1e-3)
+
+        def delta(name):
+            return [max(0, v - p) for v, p in zip(values[name], last[1][name])]
+
+        core_events = sum(delta("core_throttle_count"))
+        package_events = sum(delta("package_throttle_count"))
+        throttled_ms = max(delta("core_throttle_total_time_ms") + delta("package_throttle_total_time_ms"),
+                           default=0)
+        return {
+            "events_per_s": round((core_events + package_events) / dt, 2),
+            "throttled_ms": throttled_ms,
+            "core_events": core_events,
+            "package_events": package_events,
+        }
+
+    def close(self):
+        for fds in self._fds.values():
+            for fd in fds:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            fds.clear()
+
+
 def rpm_to_percent(rpm: int) -> int:
     if rpm <= FAN_RPM_MIN:
         return 0
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+HISTORY_SERIES = ("cpu_temp", "gpu_temp", "fan1_rpm", "fan2_rpm", "cpu_duty", "gpu_duty", "package_w")
+HISTORY_RAW_S = 3600
+HISTORY_BUCKET_S = 60
+HISTORY_SPAN_S = 86400
+HISTORY_POINTS = 300
+HISTORY_MAX_POINTS = 2000
+HISTORY_EVENTS = 2000
+
+
+class History:
+    def __init__(self, series: Sequence[str] = HISTORY_SERIES):
+        self.series = tuple(series)
+        self.raw: deque = deque(maxlen=HISTORY_RAW_S)
+        self.buckets: deque = deque(maxlen=HISTORY_SPAN_S // HISTORY_BUCKET_S)
+        self.events: deque = deque(maxlen=HISTORY_EVENTS)
+        self._bucket: Optional[list] = None
+        self._lock = threading.Lock()
+
+    def record(self, values: Dict[str, Optional[float]], now: Optional[float] = None):
+        now = time.time() if now is None else now
+        sample = tuple(None if values.get(name) is None else float(values[name]) for name in self.series)
+        start = now - now % HISTORY_BUCKET_S
+        with self._lock:
+            self.raw.append((now, sample))
+            if self._bucket is None or self._bucket[0] != start:
+                self._bucket = [start, list(sample), list(sample)]
+                self.buckets.append(self._bucket)
+                return
+            lows, highs = self._bucket[1], self._bucket[2]
+            for i, value in enumerate(sample):
+                if value is None:
+                    continue
+                if lows[i] is None or value < lows[i]:
+                    lows[i] = value
+                if highs[i] is None or value > highs[i]:
+                    highs[i] = value
+
+    def mark(self, event: str, now: Optional[float] = None):
+        with self._lock:
+            self.events.append((time.time() if now is None else now, event))
+
+    def query(self, window_s: float, points: int = HISTORY_POINTS, now: Optional[float] = None) -> Dict:
+        now = time.time() if now is None else now
+        window_s = max(1.0, min(float(window_s), HISTORY_SPAN_S))
+        points = max(1, min(int(points), HISTORY_MAX_POINTS))
+        t0 = now - window_s
+        step = window_s / points
+        with self._lock:
+            use_raw = len(self.raw) < HISTORY_RAW_S or self.raw[0][0] <= t0
+            if use_raw:
+                source = [(t, sample, sample) for t, sample in self.raw if t >= t0]
+            else:
+                source = [(start, list(lows), list(highs)) for start, lows, highs in self.buckets
+                          if start + HISTORY_BUCKET_S >= t0]
+            events = [[t, event] for t, event in self.events if t >= t0]
+        lows: List[List[Optional[float]]] = [[None] * points for _ in self.series]
+        highs: List[List[Optional[float]]] = [[None] * points for _ in self.series]
+        for t, sample_lows, sample_highs in source:
+            index = min(points - 1, max(0, int((t - t0) / step)))
+            for i in range(len(self.series)):
+                low, high = sample_lows[i], sample_highs[i]
+                if low is None:
+                    continue
+                if lows[i][index] is None or low < lows[i][index]:
+                    lows[i][index] = low
+                if highs[i][index] is None or high > highs[i][index]:
+                    highs[i][index] = high
+        return {
+            "t0": t0,
+            "t1": now,
+            "step": step,
+            "resolution_s": 0 if use_raw else HISTORY_BUCKET_S,
+            "series": {
+                name: {"min": [_round(v) for v in lows[i]], "max": [_round(v) for v in highs[i]]}
+                for i, name in enumerate(self.series)
+            },
+            "events": events,
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    if value is None or math.isnan(value):
+        return None
+    return round(value, 1)
@@ -20,6 +20,20 @@ chmod +x /usr/local/bin/fan-aggressor-gui
 mkdir -p /usr/local/lib/fan-aggressor
 cp fan_monitor.py /usr/local/lib/fan-aggressor/
 cp cpu_power.py /usr/local/lib/fan-aggressor/
+cp power_budget.py /usr/local/lib/fan-aggressor/
+cp power_monitor.py /usr/local/lib/fan-aggressor/
+cp process_rules.py /usr/local/lib/fan-aggressor/
+cp pressure.py /usr/local/lib/fan-aggressor/
+cp power_source.py /usr/local/lib/fan-aggressor/
+cp scorecard.py /usr/local/lib/fan-aggressor/
+cp profile_bench.py /usr/local/lib/fan-aggressor/
+cp bench.py /usr/local/lib/fan-aggressor/
+cp sysfs.py /usr/local/lib/fan-aggressor/
+cp sysfs_fixture.py /usr/local/lib/fan-aggressor/
+cp control_socket.py /usr/local/lib/fan-aggressor/
+cp history.py /usr/local/lib/fan-aggressor/
+cp kb_guard.py /usr/local/lib/fan-aggressor/
+cp power_arbiter.py /usr/local/lib/fan-aggressor/
 cp fan-aggressor-helper /usr/local/lib/fan-aggressor/fan-aggressor-helper
 chmod +x /usr/local/lib/fan-aggressor/fan-aggressor-helper
 cp com.fancontrol.aggressor.policy /usr/share/polkit-1/actions/
@@ -38,6 +52,7 @@ ExecStartPre=-/sbin/modprobe ec_sys write_support=1
 Environment=PYTHONPATH=/usr/local/lib/fan-aggressor
 Environment=PYTHONUNBUFFERED=1
 ExecStart=/usr/local/bin/fan_aggressor daemon
+ExecReload=/bin/kill -HUP $MAINPID
 Restart=on-failure
 RestartSec=5
 StandardOutput=journal
@@ -46,6 +61,7 @@ NoNewPrivileges=true
 PrivateTmp=true
 ProtectSystem=full
 ReadWritePaths=/etc/fan-aggressor /var/run
+StateDirectory=fan-aggressor
 ProtectHome=no
 ProtectControlGroups=true
 ProtectClock=true
@@ -66,6 +82,7 @@ After=power-profiles-daemon.service
 
 [Service]
 Type=simple
+Environment=PYTHONPATH=/usr/local/lib/fan-aggressor
 Environment=PYTHONUNBUFFERED=1
 ExecStart=/usr/local/bin/epp_override
 Restart=on-failure
@@ -139,6 +156,7 @@ echo "  fan_aggressor status          - Ver status e backends disponíveis"
 echo "  fan_aggressor set both +10    - Ajustar offset dos fans"
 echo "  fan_aggressor enable          - Ativar controle"
 echo "  fan_aggressor disable         - Desativar controle"
+echo "  fan_aggressor stats           - Estatísticas por perfil de energia"
 echo ""
 echo "Logs:"
 echo "  journalctl -u fan-aggressor -f"
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import os
+import select
+import threading
+import time
+from typing import Optional
+
+from cpu_power import PLATFORM_PROFILE, get_kb_state, load_kb_state, reset_kb_brightness, restore_kb_state, save_kb_state
+from sysfs import resolve
+
+LOW_POWER_PROFILE = "low-power"
+KB_SNAPSHOT_S = 2.0
+KB_SETTLE_S = 0.3
+KB_RESTORE_ATTEMPTS = 5
+
+
+class KeyboardGuard:
+    def __init__(self):
+        self.profile = ""
+        self.state: Optional[dict] = load_kb_state()
+        self.restores = 0
+        self._fd = -1
+        self._wake_r, self._wake_w = -1, -1
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        if get_kb_state() is None:
+            return False
+        try:
+            self._fd = os.open(resolve(PLATFORM_PROFILE), os.O_RDONLY)
+        except OSError:
+            return False
+        self.profile = self._read_profile()
+        if self.profile != LOW_POWER_PROFILE:
+            self._snapshot()
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="fan-aggressor-kb", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+        self._thread.join(timeout=KB_SETTLE_S * KB_RESTORE_ATTEMPTS + 1)
+        self._thread = None
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            os.close(fd)
+        self._fd, self._wake_r, self._wake_w = -1, -1, -1
+
+    def _read_profile(self) -> str:
+        try:
+            return os.pread(self._fd, 64, 0).decode().strip()
+        except (OSError, UnicodeDecodeError):
+            return ""
+
+    def _snapshot(self):
+        state = get_kb_state()
+        if state and state != self.state:
+            self.state = state
+            save_kb_state(state)
+
+    def _run(self):
+        poller = select.poll()
+        poller.register(self._fd, select.POLLPRI | select.POLLERR)
+        poller.register(self._wake_r, select.POLLIN)
+        while not self._stopping.is_set():
+            events = poller.poll(KB_SNAPSHOT_S * 1000)
+            if any(fd == self._wake_r for fd, _ in events):
+                return
+            profile = self._read_profile()
+            previous, self.profile = self.profile, profile
+            if not profile or profile == LOW_POWER_PROFILE:
+                continue
+            if previous == LOW_POWER_PROFILE:
+                self._restore(previous, profile)
+            else:
+                self._snapshot()
+
+    def _restore(self, previous: str, profile: str):
+        per_zone = (self.state or {}).get("per_zone_mode")
+        if not per_zone:
+            return
+        start = time.monotonic()
+        for attempt in range(1, KB_RESTORE_ATTEMPTS + 1):
+            reset_kb_brightness()
+            if self._stopping.wait(KB_SETTLE_S) or self._read_profile() == LOW_POWER_PROFILE:
+                return
+            restore_kb_state(self.state)
+            if (get_kb_state() or {}).get("per_zone_mode") == per_zone:
+                self.restores += 1
+                elapsed_ms = (time.monotonic() - start) * 1000
+                print(f"Teclado restaurado ({previous} -> {profile}) em {elapsed_ms:.0f} ms, tentativa {attempt}")
+                return
+        print(f"Aviso: teclado não confirmou o estado salvo após {KB_RESTORE_ATTEMPTS} tentativas")
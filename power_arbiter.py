@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from cpu_power import (
+    EPP_TO_PROFILE, RAPL_LONG_TERM, RAPL_SHORT_TERM,
+    RAPL_PL1_MIN_W, RAPL_PL1_MAX_W, RAPL_PL2_MIN_W, RAPL_PL2_MAX_W,
+    get_cpu_max_freq_mhz, get_current_epp, get_current_governor, get_platform_profile,
+    get_rapl_pl1_watts, get_rapl_pl2_watts, get_rapl_time_window_s, get_turbo_enabled,
+    set_cpu_max_freq, set_epp, set_governor, set_platform_profile, set_rapl_domain_limits,
+    set_rapl_pl1, set_rapl_pl2, set_rapl_time_window, set_turbo,
+)
+
+PRIORITY_USER = 50
+PRIORITY_BUDGET = 70
+PRIORITY_NOISE_CAP = 80
+PRIORITY_MAX = 100
+CONFIG_SOURCE = "config"
+PLATFORM_SOURCE = "platform"
+BUDGET_SOURCE = "budget"
+NOISE_CAP_SOURCE = "noisecap"
+BENCH_SOURCE = "bench"
+BASELINE_SOURCE = "baseline"
+JOURNAL_SIZE = 200
+UNKNOWN = "unknown"
+
+PROFILE_TO_EPP = {
+    "low-power": "power",
+    "quiet": "power",
+    "balanced": "balance_power",
+    "balanced-performance": "balance_performance",
+    "performance": "performance",
+}
+
+PROFILE_TURBO = {
+    "low-power": False,
+    "quiet": False,
+    "balanced": True,
+    "balanced-performance": True,
+    "performance": True,
+}
+
+PROFILE_GOVERNOR = {
+    "low-power": "powersave",
+    "quiet": "powersave",
+    "balanced": "powersave",
+    "balanced-performance": "powersave",
+    "performance": "performance",
+}
+
+PROFILE_RAPL = {
+    "low-power": (15, 20),
+    "quiet": (25, 35),
+    "balanced": (45, 65),
+    "balanced-performance": (65, 100),
+    "performance": (125, 157),
+}
+
+PROFILE_MAX_FREQ_MHZ = {
+    "low-power": 2000,
+    "quiet": 3200,
+    "balanced": 4400,
+    "balanced-performance": 5300,
+    "performance": 5500,
+}
+
+BATTERY_RAPL_CAP = (45, 65)
+BATTERY_MAX_FREQ_MHZ = 4400
+
+CPU_POWER_KEYS = (
+    "cpu_platform_profile",
+    "cpu_governor",
+    "cpu_turbo_enabled",
+    "cpu_epp",
+    "cpu_rapl_pl1_w",
+    "cpu_rapl_pl2_w",
+    "cpu_rapl_pl1_tau_s",
+    "cpu_rapl_pl2_tau_s",
+    "cpu_rapl_domain_limits",
+    "cpu_max_freq_mhz",
+    "cpu_cluster_max_freq_mhz",
+    "cpu_cluster_epp",
+)
+
+DEPENDENT_KEYS = {
+    "cpu_platform_profile": ("cpu_cluster_epp",),
+    "cpu_governor": ("cpu_cluster_epp",),
+    "cpu_epp": ("cpu_cluster_epp",),
+    "cpu_rapl_pl1_w": ("cpu_rapl_domain_limits",),
+    "cpu_rapl_pl2_w": ("cpu_rapl_domain_limits",),
+    "cpu_max_freq_mhz": ("cpu_cluster_max_freq_mhz",),
+}
+
+
+def _set_cluster_max_freq(value: Dict[str, int]) -> bool:
+    return all([set_cpu_max_freq(mhz, cluster=cluster) for cluster, mhz in value.items()])
+
+
+def _set_cluster_epp(value: Dict[str, str]) -> bool:
+    return all([set_epp(pref, cluster=cluster) for cluster, pref in value.items()])
+
+
+WRITERS = {
+    "cpu_platform_profile": set_platform_profile,
+    "cpu_governor": set_governor,
+    "cpu_turbo_enabled": set_turbo,
+    "cpu_epp": lambda pref: set_epp(pref, sync_profile=False),
+    "cpu_rapl_pl1_w": set_rapl_pl1,
+    "cpu_rapl_pl2_w": set_rapl_pl2,
+    "cpu_rapl_pl1_tau_s": lambda seconds: set_rapl_time_window(seconds, constraint=RAPL_LONG_TERM),
+    "cpu_rapl_pl2_tau_s": lambda seconds: set_rapl_time_window(seconds, constraint=RAPL_SHORT_TERM),
+    "cpu_rapl_domain_limits": set_rapl_domain_limits,
+    "cpu_max_freq_mhz": set_cpu_max_freq,
+    "cpu_cluster_max_freq_mhz": _set_cluster_max_freq,
+    "cpu_cluster_epp": _set_cluster_epp,
+}
+
+READERS = {
+    "cpu_platform_profile": get_platform_profile,
+    "cpu_governor": get_current_governor,
+    "cpu_turbo_enabled": get_turbo_enabled,
+    "cpu_epp": get_current_epp,
+    "cpu_rapl_pl1_w": get_rapl_pl1_watts,
+    "cpu_rapl_pl2_w": get_rapl_pl2_watts,
+    "cpu_rapl_pl1_tau_s": lambda: get_rapl_time_window_s(constraint=RAPL_LONG_TERM),
+    "cpu_rapl_pl2_tau_s": lambda: get_rapl_time_window_s(constraint=RAPL_SHORT_TERM),
+    "cpu_max_freq_mhz": get_cpu_max_freq_mhz,
+}
+
+NORMALIZERS = {
+    "cpu_turbo_enabled": bool,
+    "cpu_rapl_pl1_w": lambda w: max(RAPL_PL1_MIN_W, min(RAPL_PL1_MAX_W, int(w))),
+    "cpu_rapl_pl2_w": lambda w: max(RAPL_PL2_MIN_W, min(RAPL_PL2_MAX_W, int(w))),
+    "cpu_max_freq_mhz": int,
+}
+
+
+def platform_settings(profile: str, source: Optional[str] = None) -> Dict:
+    if profile not in PROFILE_TO_EPP:
+        return {"cpu_platform_profile": profile}
+    pl1, pl2 = PROFILE_RAPL[profile]
+    max_freq = PROFILE_MAX_FREQ_MHZ[profile]
+    if source == "battery":
+        pl1, pl2 = min(pl1, BATTERY_RAPL_CAP[0]), min(pl2, BATTERY_RAPL_CAP[1])
+        max_freq = min(max_freq, BATTERY_MAX_FREQ_MHZ)
+    return {
+        "cpu_platform_profile": profile,
+        "cpu_governor": PROFILE_GOVERNOR[profile],
+        "cpu_turbo_enabled": PROFILE_TURBO[profile],
+        "cpu_epp": PROFILE_TO_EPP[profile],
+        "cpu_rapl_pl1_w": pl1,
+        "cpu_rapl_pl2_w": pl2,
+        "cpu_max_freq_mhz": max_freq,
+    }
+
+
+def config_settings(config: Dict) -> Dict:
+    settings = {key: config.get(key) for key in CPU_POWER_KEYS}
+    if not settings["cpu_platform_profile"] and settings["cpu_epp"]:
+        settings["cpu_platform_profile"] = EPP_TO_PROFILE.get(settings["cpu_epp"])
+    return settings
+
+
+def _clean(settings: Optional[Dict]) -> Dict:
+    return {key: value for key, value in (settings or {}).items()
+            if key in CPU_POWER_KEYS and value is not None and value != "" and value != {}}
+
+
+class PowerArbiter:
+    def __init__(self):
+        self.intents: Dict[str, Dict] = {}
+        self.applied: Dict[str, object] = {}
+        self.failed: Dict[str, object] = {}
+        self.baseline: Dict[str, object] = {}
+        self.settled: Dict[str, Tuple[object, object]] = {}
+        self.journal: deque = deque(maxlen=JOURNAL_SIZE)
+        self.power_source: Optional[str] = None
+        self.observed_profile: Optional[str] = None
+        self.journal_seq = 0
+        self._seq = 0
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def submit(self, source: str, settings: Optional[Dict], priority: int = PRIORITY_USER) -> bool:
+        settings = _clean(settings)
+        with self._lock:
+            current = self.intents.get(source)
+            if not settings:
+                changed = self.intents.pop(source, None) is not None
+            elif current and current["settings"] == settings and current["priority"] == priority:
+                changed = False
+            else:
+                self._seq += 1
+                self.intents[source] = {"priority": priority, "seq": self._seq,
+                                        "time": time.time(), "settings": settings}
+                changed = True
+            self._dirty = self._dirty or changed
+        return changed
+
+    def set_power_source(self, power_source: Optional[str]):
+        if power_source == self.power_source:
+            return
+        self.power_source = power_source
+        with self._lock:
+            intent = self.intents.get(PLATFORM_SOURCE)
+            if intent:
+                intent["settings"] = platform_settings(intent["settings"]["cpu_platform_profile"], power_source)
+                self._dirty = True
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            for key in keys or CPU_POWER_KEYS:
+                self.applied.pop(key, None)
+                self.failed.pop(key, None)
+            self._dirty = True
+
+    def base_value(self, key: str, below: int) -> object:
+        with self._lock:
+            candidates = sorted((intent["priority"], intent["seq"], intent["settings"][key])
+                                for intent in self.intents.values()
+                                if intent["priority"] < below and key in intent["settings"])
+        if candidates:
+            return NORMALIZERS.get(key, lambda v: v)(candidates[-1][2])
+        if key in self.baseline:
+            return self.baseline[key]
+        reader = READERS.get(key)
+        value = reader() if reader else None
+        return None if value == UNKNOWN else value
+
+    def resolve(self) -> Dict[str, Tuple[object, str]]:
+        with self._lock:
+            ordered = sorted(self.intents.items(), key=lambda item: (item[1]["priority"], item[1]["seq"]))
+        target = {}
+        for source, intent in ordered:
+            for key, value in intent["settings"].items():
+                target[key] = (NORMALIZERS.get(key, lambda v: v)(value), source)
+        return target
+
+    def apply(self) -> List[Dict]:
+        readings: Dict[str, object] = {}
+        with self._lock:
+            self._dirty = False
+        written = []
+        target = self.resolve()
+        for key, (value, source) in sorted(target.items(), key=lambda item: CPU_POWER_KEYS.index(item[0])):
+            if self.failed.get(key) == value:
+                continue
+            current = self._read(key, readings)
+            if key in READERS and key not in self.applied and key not in self.baseline and current is not None:
+                self.baseline[key] = current
+            if self._settled(key, value, current):
+                self.applied[key] = value
+                continue
+            written.append(self._write(source, key, current, value))
+        for key in [key for key in self.baseline if key not in target]:
+            value = self.baseline.pop(key)
+            self.applied.pop(key, None)
+            current = self._read(key, readings)
+            if current is not None and not self._settled(key, value, current):
+                written.append(self._write(BASELINE_SOURCE, key, current, value))
+            self.applied.pop(key, None)
+            self.failed.pop(key, None)
+        return written
+
+    def _settled(self, key: str, value: object, current: object) -> bool:
+        return current == value or self.settled.get(key) == (value, current)
+
+    def _write(self, source: str, key: str, current: object, value: object) -> Dict:
+        ok = WRITERS[key](value)
+        if ok:
+            self.applied[key] = value
+            self.failed.pop(key, None)
+            reader = READERS.get(key)
+            if reader:
+                self.settled[key] = (value, reader())
+            if key == "cpu_platform_profile" and self.settled[key][1] != UNKNOWN:
+                self.observed_profile = self.settled[key][1]
+        else:
+            self.failed[key] = value
+        for dependent in DEPENDENT_KEYS.get(key, ()):
+            self.settled.pop(dependent, None)
+            if self.applied.pop(dependent, None) is not None:
+                with self._lock:
+                    self._dirty = True
+        return self._record(source, key, current, value, ok)
+
+    def journal_since(self, seq: int) -> List[Dict]:
+        with self._lock:
+            return [entry for entry in self.journal if entry["seq"] > seq]
+
+    def describe(self, limit: int = 50) -> Dict:
+        with self._lock:
+            intents = {source: dict(intent) for source, intent in self.intents.items()}
+            journal = list(self.journal)[-limit:]
+        return {
+            "intents": intents,
+            "target": {key: {"value": value, "source": source} for key, (value, source) in self.resolve().items()},
+            "baseline": dict(self.baseline),
+            "journal": journal,
+        }
+
+    def _read(self, key: str, readings: Dict[str, object]) -> object:
+        if key not in readings:
+            reader = READERS.get(key)
+            value = reader() if reader else None
+            readings[key] = self.applied.get(key) if value in (None, UNKNOWN) else value
+        return readings[key]
+
+    def observe(self) -> bool:
+        current = get_platform_profile()
+        if current in (None, UNKNOWN):
+            return False
+        last, self.observed_profile = self.observed_profile, current
+        if last is None or current == last:
+            return False
+        self.applied["cpu_platform_profile"] = current
+        self._record(PLATFORM_SOURCE, "cpu_platform_profile", last, current, True, external=True)
+        return self.submit(PLATFORM_SOURCE, platform_settings(current, self.power_source))
+
+    def _record(self, source: str, key: str, old: object, new: object, ok: bool, external: bool = False) -> Dict:
+        with self._lock:
+            self.journal_seq += 1
+            entry = {"seq": self.journal_seq, "time": time.time(), "source": source,
+                     "key": key, "old": old, "new": new, "ok": ok, "external": external}
+            self.journal.append(entry)
+        return entry
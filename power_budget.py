@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+
+import time
+from typing import Dict, Optional
+
+from cpu_power import RAPL_PL1_MIN_W, RAPL_PL1_MAX_W
+
+BUDGET_MODES = ("off", "temp", "duty")
+BUDGET_INTERVAL_S = 3.0
+BUDGET_DEADBAND_C = 2.0
+BUDGET_DEADBAND_DUTY = 3.0
+BUDGET_STEP_UP_W = 2
+BUDGET_GAIN_DOWN_W = 1.5
+BUDGET_MAX_STEP_DOWN_W = 10
+BUDGET_SATURATION_RATIO = 0.9
+
+NOISE_CAP_INTERVAL_S = 2.0
+NOISE_CAP_RESTORE_MARGIN = 5
+NOISE_CAP_FREQ_STEP_MHZ = 200
+NOISE_CAP_PL1_STEP_W = 5
+NOISE_CAP_MIN_FREQ_MHZ = 1600
+
+
+class ThermalBudget:
+    def __init__(self):
+        self.mode = "off"
+        self.target = 0.0
+        self.max_w = RAPL_PL1_MAX_W
+        self.current_w: Optional[int] = None
+        self.baseline_w: Optional[int] = None
+        self.last_update = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.mode != "off" and self.current_w is not None
+
+    def configure(self, config: dict) -> None:
+        mode = config.get("power_budget_mode", "off")
+        if mode == "off":
+            self.release()
+            return
+        if self.mode != mode:
+            self.current_w = None
+        self.mode = mode
+        if mode == "temp":
+            self.target = float(config.get("power_budget_target_temp", 85))
+        else:
+            self.target = float(config.get("power_budget_target_duty", 70))
+        self.max_w = config.get("power_budget_max_w") or RAPL_PL1_MAX_W
+
+    def settings(self) -> Optional[Dict]:
+        if not self.active:
+            return None
+        return {"cpu_rapl_pl1_w": self.current_w}
+
+    def release(self) -> None:
+        if self.active and self.baseline_w is not None and self.baseline_w != self.current_w:
+            print(f"Power budget desativado: PL1 restaurado para {self.baseline_w}W")
+        self.mode = "off"
+        self.current_w = None
+        self.baseline_w = None
+
+    def update(self, temp: Optional[float], duty: Optional[int], package_w: Optional[float] = None,
+               base_w: Optional[int] = None, now: float = None) -> Optional[int]:
+        if self.mode == "off":
+            return None
+        now = time.monotonic() if now is None else now
+
+        if base_w != self.baseline_w:
+            self.baseline_w = base_w
+            self.current_w = None
+        if self.current_w is None:
+            if base_w is None:
+                return None
+            self.current_w = base_w
+            self.last_update = now
+            return None
+
+        if now - self.last_update < BUDGET_INTERVAL_S:
+            return None
+
+        if self.mode == "temp":
+            measured, deadband = temp, BUDGET_DEADBAND_C
+        else:
+            measured, deadband = duty, BUDGET_DEADBAND_DUTY
+        if measured is None:
+            return None
+        self.last_update = now
+
+        error = measured - self.target
+        if error > deadband:
+            step = min(BUDGET_MAX_STEP_DOWN_W, max(1, int(error * BUDGET_GAIN_DOWN_W)))
+            new_w = self.current_w - step
+        elif error < -deadband:
+            if package_w is None:
+                ceiling = self.baseline_w or self.current_w
+            elif package_w >= self.current_w * BUDGET_SATURATION_RATIO:
+                ceiling = self.max_w
+            else:
+                return None
+            new_w = min(ceiling, self.current_w + BUDGET_STEP_UP_W)
+            if new_w <= self.current_w:
+                return None
+        else:
+            return None
+
+        new_w = max(RAPL_PL1_MIN_W, min(self.max_w, RAPL_PL1_MAX_W, new_w))
+        if new_w == self.current_w:
+            return None
+        self.current_w = new_w
+        return new_w
+
+
+class NoiseCap:
+    def __init__(self):
+        self.cap = 0
+        self.base_freq: Optional[int] = None
+        self.base_pl1: Optional[int] = None
+        self.freq_mhz: Optional[int] = None
+        self.pl1_w: Optional[int] = None
+        self.last_step = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return 0 < self.cap < 100
+
+    @property
+    def throttled(self) -> bool:
+        return ((self.freq_mhz is not None and self.freq_mhz != self.base_freq)
+                or (self.pl1_w is not None and self.pl1_w != self.base_pl1))
+
+    def configure(self, config: dict) -> None:
+        cap = config.get("fan_duty_cap", 0)
+        if not 0 < cap < 100:
+            self.release()
+        self.cap = cap
+
+    def clamp(self, cpu: int, gpu: int) -> tuple:
+        if not self.enabled:
+            return cpu, gpu
+        return min(cpu, self.cap), min(gpu, self.cap)
+
+    def settings(self) -> Optional[Dict]:
+        settings = {}
+        if self.freq_mhz is not None and self.freq_mhz != self.base_freq:
+            settings["cpu_max_freq_mhz"] = self.freq_mhz
+        if self.pl1_w is not None and self.pl1_w != self.base_pl1:
+            settings["cpu_rapl_pl1_w"] = self.pl1_w
+        return settings or None
+
+    def release(self) -> None:
+        if self.throttled:
+            print(f"Noise cap desativado: limites restaurados "
+                  f"({self.base_freq} MHz, {self.base_pl1 if self.base_pl1 is not None else 'N/A'}W)")
+        self.base_freq = None
+        self.base_pl1 = None
+        self.freq_mhz = None
+        self.pl1_w = None
+
+    def cost(self) -> tuple:
+        mhz = (self.base_freq - self.freq_mhz) if self.freq_mhz is not None and self.base_freq else 0
+        watts = (self.base_pl1 - self.pl1_w) if self.pl1_w is not None and self.base_pl1 else 0
+        return mhz, watts
+
+    def update(self, demand: Optional[int], base_freq: Optional[int], base_pl1: Optional[int],
+               adjust_pl1: bool = True, hot: bool = True, cool: bool = False,
+               now: float = None) -> Optional[str]:
+        if not self.enabled or demand is None:
+            return None
+        if base_freq != self.base_freq:
+            self.base_freq = base_freq
+            self.freq_mhz = base_freq
+        if base_pl1 != self.base_pl1 and (adjust_pl1 or self.pl1_w is not None):
+            self.base_pl1 = base_pl1
+            self.pl1_w = base_pl1
+        now = time.monotonic() if now is None else now
+        if now - self.last_step < NOISE_CAP_INTERVAL_S:
+            return None
+
+        if demand > self.cap and hot:
+            direction = -1
+        elif self.throttled and (cool or demand <= self.cap - NOISE_CAP_RESTORE_MARGIN):
+            direction = 1
+        else:
+            return None
+
+        changed = False
+        if self.freq_mhz is not None:
+            floor = min(NOISE_CAP_MIN_FREQ_MHZ, self.base_freq)
+            new_freq = max(floor, min(self.base_freq, self.freq_mhz + direction * NOISE_CAP_FREQ_STEP_MHZ))
+            if new_freq != self.freq_mhz:
+                self.freq_mhz = new_freq
+                changed = True
+        if self.pl1_w is not None and (adjust_pl1 or direction > 0):
+            new_pl1 = max(RAPL_PL1_MIN_W, min(self.base_pl1, self.pl1_w + direction * NOISE_CAP_PL1_STEP_W))
+            if new_pl1 != self.pl1_w:
+                self.pl1_w = new_pl1
+                changed = True
+
+        if not changed:
+            return None
+        self.last_step = now
+        mhz, watts = self.cost()
+        action = "reduzindo" if direction < 0 else "restaurando"
+        return (f"Noise cap {self.cap}% (demanda {demand}%): {action} limites, "
+                f"cedendo {mhz} MHz / {watts} W")
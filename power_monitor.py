@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional
+
+from sysfs import resolve
+
+RAPL_PACKAGE_PATH = "/sys/class/powercap/intel-rapl:0"
+POWER_WINDOW_S = 10.0
+
+RAPL_DOMAIN_NAMES = {
+    "package-0": "package",
+}
+
+
+class PowerMonitor:
+    def __init__(self, window: float = POWER_WINDOW_S):
+        self.window = window
+        self.domains: Dict[str, Path] = {}
+        self._max_range: Dict[str, int] = {}
+        self._last: Dict[str, tuple] = {}
+        self._history: Dict[str, deque] = {}
+        self._find_rapl_domains()
+
+    def _find_rapl_domains(self):
+        package = Path(resolve(RAPL_PACKAGE_PATH))
+        if not package.exists():
+            return
+        for zone in [package] + sorted(package.glob("intel-rapl:0:*")):
+            try:
+                with open(zone / "name") as f:
+                    name = f.read().strip()
+            except (PermissionError, OSError):
+                continue
+            name = RAPL_DOMAIN_NAMES.get(name, name)
+            self.domains[name] = zone / "energy_uj"
+            self._history[name] = deque()
+            try:
+                with open(zone / "max_energy_range_uj") as f:
+                    self._max_range[name] = int(f.read().strip())
+            except (ValueError, PermissionError, OSError):
+                pass
+
+    @property
+    def available(self) -> bool:
+        return bool(self.domains)
+
+    def _read_energy(self, name: str) -> Optional[int]:
+        try:
+            with open(self.domains[name]) as f:
+                return int(f.read().strip())
+        except (ValueError, PermissionError, OSError):
+            return None
+
+    def sample(self) -> Dict[str, Dict[str, float]]:
+        now = time.monotonic()
+        result = {}
+        for name in self.domains:
+            energy = self._read_energy(name)
+            if energy is None:
+                continue
+            last = self._last.get(name)
+            self._last[name] = (now, energy)
+            if last is None:
+                continue
+            dt = now - last[0]
+            if dt <= 0:
+                continue
+            delta = energy - last[1]
+            if delta < 0:
+                max_range = self._max_range.get(name)
+                if not max_range:
+                    continue
+                delta += max_range + 1
+            joules = delta / 1_000_000
+
+            history = self._history[name]
+            history.append((now, dt, joules))
+            while history and now - history[0][0] > self.window:
+                history.popleft()
+            total_t = sum(h[1] for h in history)
+            total_j = sum(h[2] for h in history)
+
+            result[name] = {
+                "now": round(joules / dt, 2),
+                "avg": round(total_j / total_t, 2) if total_t > 0 else round(joules / dt, 2),
+            }
+        return result
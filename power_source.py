@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+import errno
+import select
+import socket
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sysfs import resolve
+
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_GROUP_KERNEL = 1
+UEVENT_BUFFER = 16384
+MAINS_TYPES = ("Mains", "USB")
+POWER_SOURCES = ("ac", "battery")
+
+
+def _read_attr(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except (FileNotFoundError, PermissionError, OSError):
+        return None
+
+
+def read_ac_online(exclude=()) -> Optional[bool]:
+    found = False
+    for supply in sorted(Path(resolve(POWER_SUPPLY_DIR)).glob("*")):
+        if supply.name in exclude or _read_attr(supply / "type") not in MAINS_TYPES:
+            continue
+        online = _read_attr(supply / "online")
+        if online is None:
+            continue
+        found = True
+        if online == "1":
+            return True
+    return False if found else None
+
+
+def parse_uevent(data: bytes) -> Dict[str, str]:
+    fields = data.split(b"\0")
+    if not fields or b"@" not in fields[0]:
+        return {}
+    event = {}
+    for field in fields[1:]:
+        key, sep, value = field.partition(b"=")
+        if sep:
+            event[key.decode(errors="replace")] = value.decode(errors="replace")
+    return event
+
+
+class UeventSource:
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        self.sock.bind((0, UEVENT_GROUP_KERNEL))
+        self.sock.setblocking(False)
+        self.overrun = False
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def recv(self) -> List[Dict[str, str]]:
+        events = []
+        while True:
+            try:
+                data = self.sock.recv(UEVENT_BUFFER)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    self.overrun = True
+                    continue
+                break
+            event = parse_uevent(data)
+            if event:
+                events.append(event)
+        return events
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class FakeUeventSource(UeventSource):
+    def __init__(self):
+        self.sock, self._writer = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.overrun = False
+
+    def emit(self, online: bool, name: str = "AC", supply_type: str = "Mains"):
+        fields = [
+            f"change@/devices/platform/{name}/power_supply/{name}",
+            "ACTION=change",
+            "SUBSYSTEM=power_supply",
+            f"POWER_SUPPLY_NAME={name}",
+            f"POWER_SUPPLY_TYPE={supply_type}",
+            f"POWER_SUPPLY_ONLINE={1 if online else 0}",
+        ]
+        self._writer.send("\0".join(fields).encode() + b"\0")
+
+    def close(self):
+        super().close()
+        try:
+            self._writer.close()
+        except OSError:
+            pass
+
+
+class PowerSourceMonitor:
+    def __init__(self, source: Optional[UeventSource] = None):
+        if source is None:
+            try:
+                source = UeventSource()
+            except (AttributeError, OSError):
+                source = None
+        self.source = source
+        self.online: Dict[str, bool] = {}
+        self.ac: Optional[bool] = read_ac_online()
+
+    @property
+    def current(self) -> Optional[str]:
+        if self.ac is None:
+            return None
+        return "ac" if self.ac else "battery"
+
+    def _apply(self, event: Dict[str, str]) -> bool:
+        if event.get("SUBSYSTEM") != "power_supply":
+            return False
+        name = event.get("POWER_SUPPLY_NAME")
+        online = event.get("POWER_SUPPLY_ONLINE")
+        if name and online is not None and event.get("POWER_SUPPLY_TYPE") in MAINS_TYPES:
+            self.online[name] = online == "1"
+            ac = any(self.online.values()) or bool(read_ac_online(exclude=self.online))
+        else:
+            ac = read_ac_online()
+        if ac is None or ac == self.ac:
+            return False
+        self.ac = ac
+        return True
+
+    def poll(self) -> bool:
+        if self.source is None:
+            ac = read_ac_online()
+            changed = ac is not None and ac != self.ac
+            if changed:
+                self.ac = ac
+            return changed
+        changed = False
+        for event in self.source.recv():
+            changed = self._apply(event) or changed
+        if self.source.overrun:
+            self.source.overrun = False
+            self.online.clear()
+            ac = read_ac_online()
+            if ac is not None and ac != self.ac:
+                self.ac = ac
+                changed = True
+        return changed
+
+    def wait(self, timeout: float, wake_fd: Optional[int] = None) -> bool:
+        watched = [fd for fd in (self.source, wake_fd) if fd is not None]
+        if self.source is None and not watched:
+            time.sleep(max(0.0, timeout))
+            return self.poll()
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self.source is None and self.poll()
+            try:
+                ready, _, _ = select.select(watched, [], [], remaining)
+            except (OSError, ValueError):
+                time.sleep(remaining)
+                return False
+            if wake_fd is not None and wake_fd in ready:
+                return False
+            if ready and self.poll():
+                return True
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+            self.source = None
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import time
+from typing import Dict, Optional
+
+from cpu_power import POWER_PROFILES, PROFILE_ORDER, detect_power_profile
+
+PSI_DIR = "/proc/pressure"
+PSI_RESOURCES = ("cpu", "memory", "io")
+PSI_STALL_VETO_PCT = 20.0
+
+
+def _profile_floor(config: dict) -> Optional[str]:
+    try:
+        pl1 = int(config.get("cpu_rapl_pl1_w"))
+    except (TypeError, ValueError):
+        return None
+    floor = None
+    for name in PROFILE_ORDER:
+        if POWER_PROFILES[name]["cpu_rapl_pl1_w"] <= pl1:
+            floor = name
+    return floor
+
+
+def read_pressure(resource: str) -> Optional[Dict[str, float]]:
+    try:
+        with open(f"{PSI_DIR}/{resource}") as f:
+            lines = f.read().splitlines()
+    except (FileNotFoundError, PermissionError, OSError):
+        return None
+    result = {}
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
+        kind = parts[0]
+        for field in parts[1:]:
+            key, _, value = field.partition("=")
+            if key.startswith("avg"):
+                try:
+                    result[f"{kind}_{key}"] = float(value)
+                except ValueError:
+                    pass
+    return result
+
+
+def read_all_pressure() -> Dict[str, Dict[str, float]]:
+    pressure = {}
+    for resource in PSI_RESOURCES:
+        values = read_pressure(resource)
+        if values is not None:
+            pressure[resource] = values
+    return pressure
+
+
+class PressureEscalator:
+    def __init__(self):
+        self.enabled = False
+        self.escalate_pct = 40.0
+        self.relax_pct = 10.0
+        self.dwell = 30.0
+        self.base: Optional[str] = None
+        self.ceiling: str = PROFILE_ORDER[-1]
+        self.level: Optional[str] = None
+        self.last_change = 0.0
+        self.pressure: Dict[str, Dict[str, float]] = {}
+
+    def configure(self, config: dict) -> None:
+        self.enabled = bool(config.get("psi_escalation", False))
+        if not self.enabled:
+            self.level = None
+            self.pressure = {}
+            return
+        self.escalate_pct = float(config.get("psi_escalate_pct", 40))
+        self.relax_pct = float(config.get("psi_relax_pct", 10))
+        self.dwell = float(config.get("psi_dwell_s", 30))
+        ceiling = config.get("psi_max_profile", PROFILE_ORDER[-1])
+        self.ceiling = ceiling if ceiling in POWER_PROFILES else PROFILE_ORDER[-1]
+        self.base = detect_power_profile(
+            config.get("cpu_governor"), config.get("cpu_turbo_enabled", True),
+            config.get("cpu_epp"), config.get("cpu_platform_profile") or "",
+        ) or _profile_floor(config)
+        if self.base is None or (self.level is not None
+                                 and PROFILE_ORDER.index(self.level) <= PROFILE_ORDER.index(self.base)):
+            self.level = None
+
+    def _current(self) -> str:
+        return self.level or self.base
+
+    def update(self, now: float = None) -> Optional[str]:
+        if not self.enabled or self.base is None:
+            return None
+        now = time.monotonic() if now is None else now
+        self.pressure = read_all_pressure()
+        cpu = self.pressure.get("cpu", {}).get("some_avg10")
+        if cpu is None or now - self.last_change < self.dwell:
+            return None
+
+        stalled = max(
+            self.pressure.get("memory", {}).get("full_avg10", 0.0),
+            self.pressure.get("io", {}).get("full_avg10", 0.0),
+        )
+        index = PROFILE_ORDER.index(self._current())
+        if cpu >= self.escalate_pct and stalled < PSI_STALL_VETO_PCT:
+            if index >= PROFILE_ORDER.index(self.ceiling):
+                return None
+            target = PROFILE_ORDER[index + 1]
+        elif cpu <= self.relax_pct and self.level is not None:
+            target = PROFILE_ORDER[index - 1]
+        else:
+            return None
+
+        self.level = None if PROFILE_ORDER.index(target) <= PROFILE_ORDER.index(self.base) else target
+        self.last_change = now
+        return target
+
+    def overrides(self) -> dict:
+        if not self.enabled or self.level is None:
+            return {}
+        return POWER_PROFILES[self.level]
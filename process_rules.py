@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+import errno
+import os
+import re
+import socket
+import struct
+import time
+from typing import Dict, List, Optional
+
+from cpu_power import POWER_PROFILES, PROFILE_ORDER
+
+PROC_DIR = "/proc"
+
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+NLMSG_DONE = 3
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+NLMSG_HDR = struct.Struct("=IHHII")
+CN_MSG_HDR = struct.Struct("=IIIIHH")
+PROC_EVENT_HDR = struct.Struct("=IIQ")
+PROC_EVENT_IDS = struct.Struct("=II")
+
+RULES_DEBOUNCE_S = 3.0
+
+
+def _read_comm(pid: int) -> Optional[str]:
+    try:
+        with open(f"{PROC_DIR}/{pid}/comm") as f:
+            return f.read().strip()
+    except (FileNotFoundError, ProcessLookupError, PermissionError, OSError):
+        return None
+
+
+def _read_cgroup(pid: int) -> str:
+    try:
+        with open(f"{PROC_DIR}/{pid}/cgroup") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    return line[3:].strip()
+    except (FileNotFoundError, ProcessLookupError, PermissionError, OSError):
+        pass
+    return ""
+
+
+def _list_pids() -> List[int]:
+    try:
+        return [int(name) for name in os.listdir(PROC_DIR) if name.isdigit()]
+    except OSError:
+        return []
+
+
+class ProcessWatcher:
+    def __init__(self, use_connector: bool = True):
+        self.processes: Dict[int, tuple] = {}
+        self.sock = self._open_connector() if use_connector else None
+        self.full_scan()
+
+    @property
+    def mode(self) -> str:
+        return "netlink" if self.sock else "scan"
+
+    def _open_connector(self) -> Optional[socket.socket]:
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+            sock.bind((os.getpid(), CN_IDX_PROC))
+            payload = struct.pack("=I", PROC_CN_MCAST_LISTEN)
+            cn_msg = CN_MSG_HDR.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+            header = NLMSG_HDR.pack(NLMSG_HDR.size + len(cn_msg), NLMSG_DONE, 0, 0, os.getpid())
+            sock.send(header + cn_msg)
+            sock.setblocking(False)
+            return sock
+        except (AttributeError, OSError):
+            return None
+
+    def close(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def _track(self, pid: int) -> bool:
+        comm = _read_comm(pid)
+        if comm is None:
+            return self.processes.pop(pid, None) is not None
+        entry = (comm, _read_cgroup(pid))
+        changed = self.processes.get(pid) != entry
+        self.processes[pid] = entry
+        return changed
+
+    def full_scan(self) -> bool:
+        pids = _list_pids()
+        changed = False
+        alive = set(pids)
+        for pid in list(self.processes):
+            if pid not in alive:
+                del self.processes[pid]
+                changed = True
+        for pid in pids:
+            changed = self._track(pid) or changed
+        return changed
+
+    def _drain_connector(self) -> bool:
+        changed = False
+        while True:
+            try:
+                data = self.sock.recv(4096)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    self.full_scan()
+                    changed = True
+                    continue
+                self.close()
+                return self.full_scan() or True
+            offset = 0
+            while offset + NLMSG_HDR.size <= len(data):
+                msg_len = NLMSG_HDR.unpack_from(data, offset)[0]
+                if msg_len < NLMSG_HDR.size:
+                    break
+                event_off = offset + NLMSG_HDR.size + CN_MSG_HDR.size
+                if event_off + PROC_EVENT_HDR.size + PROC_EVENT_IDS.size <= len(data):
+                    what = PROC_EVENT_HDR.unpack_from(data, event_off)[0]
+                    pid, tgid = PROC_EVENT_IDS.unpack_from(data, event_off + PROC_EVENT_HDR.size)
+                    if pid == tgid:
+                        if what == PROC_EVENT_EXEC:
+                            changed = self._track(tgid) or changed
+                        elif what == PROC_EVENT_EXIT:
+                            changed = self.processes.pop(tgid, None) is not None or changed
+                offset += (msg_len + 3) & ~3
+        return changed
+
+    def poll(self) -> bool:
+        if self.sock:
+            return self._drain_connector()
+        return self.full_scan()
+
+
+class ProcessRules:
+    def __init__(self, watcher_factory=ProcessWatcher):
+        self.watcher_factory = watcher_factory
+        self.watcher: Optional[ProcessWatcher] = None
+        self.rules: List[tuple] = []
+        self.default: Optional[str] = None
+        self.debounce = RULES_DEBOUNCE_S
+        self.active_profile: Optional[str] = None
+        self.match_reason: Optional[str] = None
+        self._pending: Optional[str] = None
+        self._pending_since = 0.0
+        self._desired: Optional[str] = None
+        self._desired_reason: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rules) or self.default is not None
+
+    def configure(self, config: dict) -> None:
+        rules = []
+        for rule in config.get("profile_rules") or []:
+            profile = rule.get("profile")
+            if profile not in POWER_PROFILES:
+                continue
+            try:
+                comm = re.compile(rule["match"]) if rule.get("match") else None
+                cgroup = re.compile(rule["cgroup"]) if rule.get("cgroup") else None
+            except re.error:
+                continue
+            if comm or cgroup:
+                rules.append((comm, cgroup, profile))
+        self.rules = rules
+        default = config.get("profile_rules_default")
+        self.default = default if default in POWER_PROFILES else None
+        self.debounce = config.get("profile_rules_debounce_s", RULES_DEBOUNCE_S)
+
+        if not self.enabled:
+            self.stop()
+            return
+        if self.watcher is None:
+            self.watcher = self.watcher_factory()
+        self._evaluate()
+
+    def stop(self) -> None:
+        if self.watcher:
+            self.watcher.close()
+        self.watcher = None
+        self.active_profile = None
+        self.match_reason = None
+        self._pending = None
+
+    def _evaluate(self) -> None:
+        best, reason = None, None
+        for comm, cgroup in self.watcher.processes.values():
+            for comm_re, cgroup_re, profile in self.rules:
+                if comm_re and not comm_re.search(comm):
+                    continue
+                if cgroup_re and not cgroup_re.search(cgroup):
+                    continue
+                if best is None or PROFILE_ORDER.index(profile) > PROFILE_ORDER.index(best):
+                    best, reason = profile, comm
+        if best is None:
+            best = self.default
+        self._desired, self._desired_reason = best, reason
+
+    def update(self, now: float = None) -> bool:
+        if not self.enabled or self.watcher is None:
+            return False
+        now = time.monotonic() if now is None else now
+        if self.watcher.poll():
+            self._evaluate()
+
+        desired = self._desired
+        if desired == self.active_profile:
+            self._pending = None
+            return False
+        if desired != self._pending:
+            self._pending = desired
+            self._pending_since = now
+            return False
+        if now - self._pending_since < self.debounce:
+            return False
+        self.active_profile = desired
+        self.match_reason = self._desired_reason
+        self._pending = None
+        return True
+
+    def overrides(self) -> dict:
+        if self.active_profile is None:
+            return {}
+        return POWER_PROFILES[self.active_profile]
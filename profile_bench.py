@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from cpu_power import POWER_PROFILES, PROFILE_ORDER, apply_cpu_power, snapshot_cpu_power
+from fan_monitor import FanMonitor
+from power_monitor import PowerMonitor
+from scorecard import CpuSampler
+
+BENCH_DURATION_S = 30
+BENCH_COOLDOWN_S = 10
+BENCH_SAMPLE_S = 0.5
+BENCH_SETTLE_S = 1.0
+BENCH_CHUNK = 10000
+
+
+def _burn(duration: float) -> int:
+    end = time.monotonic() + duration
+    ops = 0
+    x = 1
+    while time.monotonic() < end:
+        for _ in range(BENCH_CHUNK):
+            x = (x * 1103515245 + 12345) & 0x7FFFFFFF
+        ops += BENCH_CHUNK
+    return ops
+
+
+def _direct_apply() -> Callable[[Optional[Dict]], None]:
+    restore_config = snapshot_cpu_power()
+    return lambda settings: apply_cpu_power(restore_config if settings is None else settings)
+
+
+def _run_profile(name: str, duration: float, workers: int, monitor: FanMonitor,
+                 apply: Callable[[Optional[Dict]], None]) -> Dict:
+    apply(POWER_PROFILES[name])
+    time.sleep(BENCH_SETTLE_S)
+
+    power = PowerMonitor()
+    sampler = CpuSampler()
+    power.sample()
+    freqs: List[float] = []
+    energy_j = 0.0
+    peak_temp: Optional[float] = None
+    peak_rpm = 0
+
+    start = time.monotonic()
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        result = pool.map_async(_burn, [duration] * workers)
+        last = time.monotonic()
+        while not result.ready():
+            result.wait(BENCH_SAMPLE_S)
+            now = time.monotonic()
+            package = power.sample().get("package")
+            if package:
+                energy_j += package["now"] * (now - last)
+            last = now
+            freq = sampler.frequency_mhz()
+            if freq is not None:
+                freqs.append(freq)
+            temp = monitor.get_cpu_temp()
+            if temp is not None:
+                peak_temp = temp if peak_temp is None else max(peak_temp, temp)
+            speeds = monitor.get_fan_speeds()
+            if speeds:
+                peak_rpm = max(peak_rpm, max(speeds.values()))
+        ops = sum(result.get())
+    elapsed = time.monotonic() - start
+
+    throughput = ops / elapsed / 1_000_000
+    return {
+        "profile": name,
+        "duration_s": round(elapsed, 1),
+        "mops": round(throughput, 2),
+        "avg_mhz": round(sum(freqs) / len(freqs)) if freqs else None,
+        "peak_mhz": round(max(freqs)) if freqs else None,
+        "energy_j": round(energy_j, 1) if power.available else None,
+        "avg_w": round(energy_j / elapsed, 1) if power.available else None,
+        "mops_per_j": round(ops / 1_000_000 / energy_j, 3) if energy_j > 0 else None,
+        "peak_temp": peak_temp,
+        "peak_rpm": peak_rpm or None,
+    }
+
+
+def run_profile_bench(profiles: List[str], duration: float = BENCH_DURATION_S,
+                      workers: Optional[int] = None, cooldown: float = BENCH_COOLDOWN_S,
+                      log=print, apply: Optional[Callable[[Optional[Dict]], None]] = None) -> List[Dict]:
+    workers = workers or os.cpu_count() or 1
+    monitor = FanMonitor()
+    apply = apply or _direct_apply()
+    results = []
+    try:
+        for i, name in enumerate(profiles):
+            if i and cooldown > 0:
+                log(f"Resfriando por {cooldown:g}s...")
+                apply(None)
+                time.sleep(cooldown)
+            log(f"Perfil {name}: {workers} worker(s) por {duration:g}s...")
+            results.append(_run_profile(name, duration, workers, monitor, apply))
+    finally:
+        apply(None)
+    return results
+
+
+def parse_profiles(value: Optional[str]) -> List[str]:
+    if not value:
+        return [name for name in PROFILE_ORDER if name in POWER_PROFILES]
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in POWER_PROFILES]
+    if unknown:
+        raise ValueError(f"Perfis desconhecidos: {', '.join(unknown)}")
+    return names
+
+
+def format_results(results: List[Dict]) -> str:
+    def fmt(value):
+        return str(value) if value is not None else "N/A"
+
+    lines = [f"{'Perfil':<10} {'Mops/s':>8} {'MHz':>6} {'Pico':>6} {'J':>8} {'W':>6} "
+             f"{'Mops/J':>7} {'°C':>5} {'RPM':>5}"]
+    for r in results:
+        lines.append(f"{r['profile']:<10} {r['mops']:>8} {fmt(r['avg_mhz']):>6} {fmt(r['peak_mhz']):>6} "
+                     f"{fmt(r['energy_j']):>8} {fmt(r['avg_w']):>6} {fmt(r['mops_per_j']):>7} "
+                     f"{fmt(r['peak_temp']):>5} {fmt(r['peak_rpm']):>5}")
+    return "\n".join(lines)
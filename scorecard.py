@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sysfs import resolve
+
+SCORECARD_FILE = Path("/var/lib/fan-aggressor/scorecard.json")
+SCORECARD_SAVE_S = 60.0
+FREQ_BUCKET_MHZ = 500
+TEMP_BUCKET_C = 5
+PROC_STAT = "/proc/stat"
+CPU_BASE = Path("/sys/devices/system/cpu")
+
+
+def read_cpu_times() -> Optional[tuple]:
+    try:
+        with open(PROC_STAT) as f:
+            fields = f.readline().split()
+    except (FileNotFoundError, PermissionError, OSError):
+        return None
+    if not fields or fields[0] != "cpu":
+        return None
+    try:
+        values = [int(v) for v in fields[1:9]]
+    except ValueError:
+        return None
+    idle = values[3] + (values[4] if len(values) > 4 else 0)
+    return sum(values), idle
+
+
+class CpuSampler:
+    def __init__(self):
+        self._freq_files: List[Path] = sorted(Path(resolve(CPU_BASE)).glob("cpu[0-9]*/cpufreq/scaling_cur_freq"))
+        self._last_times: Optional[tuple] = None
+
+    def frequency_mhz(self) -> Optional[float]:
+        total, count = 0, 0
+        for freq_file in self._freq_files:
+            try:
+                with open(freq_file) as f:
+                    total += int(f.read().strip())
+                count += 1
+            except (ValueError, PermissionError, OSError):
+                continue
+        return round(total / count / 1000, 0) if count else None
+
+    def utilization(self) -> Optional[float]:
+        times = read_cpu_times()
+        last, self._last_times = self._last_times, times
+        if times is None or last is None:
+            return None
+        total = times[0] - last[0]
+        idle = times[1] - last[1]
+        if total <= 0:
+            return None
+        return round(100.0 * (total - idle) / total, 1)
+
+
+def _new_entry() -> Dict:
+    return {
+        "time_s": 0.0,
+        "freq_s": 0.0, "freq_sum": 0.0,
+        "util_s": 0.0, "util_sum": 0.0,
+        "power_s": 0.0, "power_sum": 0.0,
+        "temp_s": 0.0, "temp_sum": 0.0,
+        "fit": [0.0, 0.0, 0.0, 0.0, 0.0],
+        "freq_hist": {},
+        "temp_hist": {},
+    }
+
+
+class ProfileScorecard:
+    def __init__(self, path: Path = SCORECARD_FILE):
+        self.path = path
+        self.profiles: Dict[str, Dict] = {}
+        self.last_save = time.monotonic()
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, PermissionError, OSError, json.JSONDecodeError):
+            return
+        if isinstance(data, dict):
+            self.profiles = {name: {**_new_entry(), **entry} for name, entry in data.items()
+                             if isinstance(entry, dict)}
+
+    def save(self) -> bool:
+        with self._lock:
+            self.last_save = time.monotonic()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(".tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(self.profiles, f)
+                os.replace(tmp_path, self.path)
+                return True
+            except (PermissionError, OSError):
+                return False
+
+    def reset(self) -> bool:
+        self.profiles = {}
+        return self.save()
+
+    def record(self, profile: str, dt: float, freq_mhz: Optional[float], util: Optional[float],
+               power_w: Optional[float], temp: Optional[float]):
+        if dt <= 0:
+            return
+        entry = self.profiles.setdefault(profile, _new_entry())
+        entry["time_s"] += dt
+        for key, value in (("freq", freq_mhz), ("util", util), ("power", power_w), ("temp", temp)):
+            if value is not None:
+                entry[f"{key}_s"] += dt
+                entry[f"{key}_sum"] += value * dt
+        if freq_mhz is not None:
+            bucket = str(int(freq_mhz // FREQ_BUCKET_MHZ * FREQ_BUCKET_MHZ))
+            entry["freq_hist"][bucket] = entry["freq_hist"].get(bucket, 0.0) + dt
+        if temp is not None:
+            bucket = str(int(temp // TEMP_BUCKET_C * TEMP_BUCKET_C))
+            entry["temp_hist"][bucket] = entry["temp_hist"].get(bucket, 0.0) + dt
+        if power_w is not None and temp is not None:
+            fit = entry["fit"]
+            fit[0] += dt
+            fit[1] += power_w * dt
+            fit[2] += temp * dt
+            fit[3] += power_w * power_w * dt
+            fit[4] += power_w * temp * dt
+        if time.monotonic() - self.last_save >= SCORECARD_SAVE_S:
+            self.save()
+
+    @staticmethod
+    def _summarize(entry: Dict) -> Dict:
+        def avg(key):
+            return entry[f"{key}_sum"] / entry[f"{key}_s"] if entry[f"{key}_s"] > 0 else None
+
+        freq, util, power, temp = avg("freq"), avg("util"), avg("power"), avg("temp")
+        n, sw, st, sww, swt = entry["fit"]
+        c_per_w = None
+        if n > 0:
+            variance = sww / n - (sw / n) ** 2
+            if variance > 1.0:
+                c_per_w = (swt / n - (sw / n) * (st / n)) / variance
+
+        def residency(hist):
+            total = sum(hist.values())
+            return {bucket: round(100.0 * secs / total, 1)
+                    for bucket, secs in sorted(hist.items(), key=lambda kv: int(kv[0]))} if total else {}
+
+        return {
+            "time_s": round(entry["time_s"], 1),
+            "avg_mhz": round(freq) if freq is not None else None,
+            "avg_util": round(util, 1) if util is not None else None,
+            "avg_w": round(power, 1) if power is not None else None,
+            "avg_temp": round(temp, 1) if temp is not None else None,
+            "mhz_per_w": round(freq / power, 1) if freq is not None and power else None,
+            "c_per_w": round(c_per_w, 2) if c_per_w is not None else None,
+            "freq_residency": residency(entry["freq_hist"]),
+            "temp_residency": residency(entry["temp_hist"]),
+        }
+
+    def summary(self) -> Dict[str, Dict]:
+        return {name: self._summarize(entry) for name, entry in self.profiles.items()}
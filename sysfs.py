@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+
+import os
+from pathlib import Path
+from typing import Union
+
+SYSFS_ROOT_ENV = "FAN_AGGRESSOR_SYSFS_ROOT"
+SYSFS_PREFIX = "/sys/"
+
+_root = os.environ.get(SYSFS_ROOT_ENV, "").rstrip("/")
+
+
+def get_root() -> str:
+    return _root
+
+
+def set_root(root: Union[str, Path, None]) -> None:
+    global _root
+    _root = str(root).rstrip("/") if root else ""
+
+
+def resolve(path: Union[str, Path]) -> str:
+    path = str(path)
+    if not _root or not path.startswith(SYSFS_PREFIX) or path.startswith(_root + "/"):
+        return path
+    return _root + path
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from pathlib import Path
+
+P_CORE_MAX_KHZ = 5400000
+E_CORE_MAX_KHZ = 4000000
+P_CORE_CAPACITY = 1024
+E_CORE_CAPACITY = 640
+EPP_CHOICES = "default performance balance_performance balance_power power"
+HWMON_KINDS = ("acer", "coretemp", "none")
+
+
+def _write(path: Path, value) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"{value}\n")
+
+
+def _build_cpus(root: Path, cpus: int, p_cores: int) -> None:
+    cpu_base = root / "sys/devices/system/cpu"
+    hybrid = 0 < p_cores < cpus
+    for n in range(cpus):
+        performance = not hybrid or n < p_cores
+        max_khz = P_CORE_MAX_KHZ if performance else E_CORE_MAX_KHZ
+        cpu = cpu_base / f"cpu{n}"
+        cpufreq = cpu / "cpufreq"
+        _write(cpufreq / "scaling_governor", "powersave")
+        _write(cpufreq / "scaling_available_governors", "performance powersave")
+        _write(cpufreq / "energy_performance_preference", "balance_performance")
+        _write(cpufreq / "energy_performance_available_preferences", EPP_CHOICES)
+        _write(cpufreq / "scaling_driver", "intel_pstate")
+        _write(cpufreq / "scaling_max_freq", max_khz)
+        _write(cpufreq / "cpuinfo_max_freq", max_khz)
+        _write(cpufreq / "scaling_cur_freq", max_khz * 3 // 5)
+        _write(cpu / "topology/physical_package_id", 0)
+        _write(cpu / "topology/core_id", n)
+        if hybrid:
+            _write(cpu / "cpu_capacity", P_CORE_CAPACITY if performance else E_CORE_CAPACITY)
+            _write(cpu / "topology/cluster_id", n if performance else 100 + (n - p_cores) // 4)
+        for counter in ("core_throttle_count", "core_throttle_total_time_ms",
+                        "package_throttle_count", "package_throttle_total_time_ms"):
+            _write(cpu / "thermal_throttle" / counter, 0)
+    _write(cpu_base / "intel_pstate/no_turbo", 0)
+    _write(cpu_base / "intel_pstate/status", "active")
+    _write(cpu_base / "intel_pstate/max_perf_pct", 100)
+    _write(cpu_base / "intel_pstate/min_perf_pct", 8)
+
+
+def _build_hwmon(root: Path, kind: str) -> None:
+    hwmon = root / "sys/class/hwmon/hwmon0"
+    if kind == "acer":
+        _write(hwmon / "name", "acer")
+        _write(hwmon / "fan1_input", 3000)
+        _write(hwmon / "fan2_input", 2800)
+        for i, temp in enumerate((62000, 55000, 48000), start=1):
+            _write(hwmon / f"temp{i}_input", temp)
+    elif kind == "coretemp":
+        _write(hwmon / "name", "coretemp")
+        for i, temp in enumerate((64000, 61000, 59000), start=1):
+            _write(hwmon / f"temp{i}_input", temp)
+
+
+def _build_rapl(root: Path) -> None:
+    powercap = root / "sys/class/powercap"
+    zones = (
+        ("intel-rapl:0", "package-0", (("long_term", 45000000, 28000000), ("short_term", 65000000, 2440))),
+        ("intel-rapl:0/intel-rapl:0:0", "core", (("long_term", 0, 976),)),
+        ("intel-rapl:0/intel-rapl:0:1", "uncore", (("long_term", 0, 976),)),
+        ("intel-rapl:1", "psys", (("long_term", 0, 27983872), ("short_term", 0, 976))),
+    )
+    for rel, name, constraints in zones:
+        zone = powercap / rel
+        _write(zone / "name", name)
+        _write(zone / "energy_uj", 1000000)
+        _write(zone / "max_energy_range_uj", 262143328850)
+        for index, (cname, limit, window) in enumerate(constraints):
+            _write(zone / f"constraint_{index}_name", cname)
+            _write(zone / f"constraint_{index}_power_limit_uw", limit)
+            _write(zone / f"constraint_{index}_time_window_us", window)
+    for rel in ("intel-rapl:0:0", "intel-rapl:0:1"):
+        link = powercap / rel
+        if not link.exists():
+            link.symlink_to(powercap / "intel-rapl:0" / rel)
+
+
+def _build_platform(root: Path, ac_online: bool) -> None:
+    _write(root / "sys/firmware/acpi/platform_profile", "balanced")
+    _write(root / "sys/firmware/acpi/platform_profile_choices", "low-power quiet balanced balanced-performance performance")
+    acer = root / "sys/devices/platform/acer-wmi"
+    _write(acer / "four_zoned_kb/per_zone_mode", "4aa3ff,4aa3ff,4aa3ff,4aa3ff,100")
+    _write(acer / "four_zoned_kb/four_zone_mode", "0,100,1,0,0,0,0")
+    _write(acer / "predator_sense/backlight_timeout", 0)
+    supply = root / "sys/class/power_supply"
+    _write(supply / "ADP1/type", "Mains")
+    _write(supply / "ADP1/online", 1 if ac_online else 0)
+    _write(supply / "BAT1/type", "Battery")
+    _write(supply / "BAT1/status", "Charging" if ac_online else "Discharging")
+
+
+def build_machine(root, cpus: int = 8, p_cores: int = 0, hwmon: str = "acer",
+                  rapl: bool = True, ac_online: bool = True) -> Path:
+    root = Path(root)
+    _build_cpus(root, cpus, p_cores)
+    _build_hwmon(root, hwmon)
+    if rapl:
+        _build_rapl(root)
+    _build_platform(root, ac_online)
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera uma árvore sysfs falsa para testes e benchmarks")
+    parser.add_argument("root", help="Diretório de destino (use FAN_AGGRESSOR_SYSFS_ROOT=<root>)")
+    parser.add_argument("--cpus", type=int, default=8, help="Número de CPUs lógicas")
+    parser.add_argument("--p-cores", type=int, default=0, help="CPUs de performance numa topologia híbrida")
+    parser.add_argument("--hwmon", choices=HWMON_KINDS, default="acer", help="Dispositivo hwmon")
+    parser.add_argument("--no-rapl", action="store_true", help="Sem zonas powercap")
+    parser.add_argument("--battery", action="store_true", help="Simula a máquina na bateria")
+    args = parser.parse_args()
+    if args.cpus <= 0 or not 0 <= args.p_cores <= args.cpus:
+        print("Erro: --cpus deve ser positivo e --p-cores entre 0 e --cpus")
+        sys.exit(1)
+    build_machine(args.root, args.cpus, args.p_cores, args.hwmon, not args.no_rapl, not args.battery)
+    print(f"Árvore sysfs criada em {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,13 +44,15 @@ update-desktop-database "$REAL_HOME/.local/share/applications/" 2>/dev/null || t
 echo "8. Removendo PID e state files..."
 rm -f /var/run/fan-aggressor.pid
 rm -f /var/run/fan-aggressor.state
+rm -f /var/run/fan-aggressor.telemetry
 
 echo ""
 read -p "Remover configuração (/etc/fan-aggressor)? [s/N] " -n 1 -r
 echo
 if [[ $REPLY =~ ^[Ss]$ ]]; then
     rm -rf /etc/fan-aggressor
-    echo "   Configuração removida"
+    rm -rf /var/lib/fan-aggressor
+    echo "   Configuração e estatísticas removidas"
 else
     echo "   Configuração mantida em /etc/fan-aggressor/"
 fi